@@ -0,0 +1,36 @@
+"""
+Operational/admin API routes.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.schemas import EmbeddingStatsResponse
+from app.models import User
+from app.dependencies import get_current_admin
+from app.services.embedding_service import (
+    get_embedding_service,
+    embedding_service_stats,
+    is_embedding_service_initialized,
+    get_embedding_registry,
+    get_embedding_storage,
+)
+
+# Server-wide data: every route here requires an administrator (ADMIN_EMAILS)
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/embedding/stats", response_model=EmbeddingStatsResponse)
+def embedding_stats(current_user: User = Depends(get_current_admin)):
+    """Cache size, hit/miss/eviction/expiration counters and provider of the shared embedding service."""
+    # The model loads in the background after startup (see /readyz); never wait for it here.
+    # Sync handler: FastAPI runs it in the threadpool, so nothing here blocks the event loop.
+    if not is_embedding_service_initialized():
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, "Embedding service is still loading")
+    embedding_service = get_embedding_service()
+    return EmbeddingStatsResponse(
+        provider=embedding_service.provider_type,
+        model=embedding_service.model_name,
+        cache=embedding_service_stats(),
+        registry=get_embedding_registry().stats(),
+        storage=get_embedding_storage().describe(),
+    )
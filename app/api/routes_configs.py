@@ -128,7 +128,7 @@ async def create_config(
             "max_iters": 21,
             "bias": [],
             "stance": "",
-            "embedding_model": "onnx_minilm",
+            "embedding_model": None,  # Server default (EMBEDDING_PROVIDER)
             "embedding_config": {}
         }
         
@@ -536,7 +536,7 @@ async def analyze_simulation(
     analytics_service = AnalyticsService()
     
     # Use short-lived session pattern
-    analytics = analytics_service.get_or_compute_analytics(run_uuid, db)
+    analytics = await analytics_service.get_or_compute_analytics(run_uuid, db)
     
     if analytics is None:
         raise HTTPException(404, "Simulation not found")
@@ -46,9 +46,10 @@ class CreateSimRequest(BaseModel):
     max_iters: int = 21
     bias: Optional[List[float]] = None
     stance: str = ""
-    embedding_model: str = "onnx_minilm"  # "openrouter" or "onnx_minilm"
-    embedding_config: Optional[dict] = None  # Additional config for the embedding model
+    embedding_model: Optional[str] = None  # "onnx", "huggingface", "openrouter"; None = server default (EMBEDDING_PROVIDER)
+    embedding_config: Optional[dict] = None  # Per-run model settings, e.g. {"model": "..."} (see embedding_service.registry)
     max_interventions_per_agent: Optional[int] = None  # Maximum number of times each agent can speak
+    speculative_speaker: bool = False  # Start the likely next speaker's generation early (lower latency, extra tokens)
 
 class RunResponse(BaseModel):
     simulation_id: str
@@ -264,3 +265,12 @@ class RecallToolConfig(BaseModel):
     documents_tool: Optional[Dict[str, Any]] = None
     notes_tool: Optional[Dict[str, Any]] = None
     document_ids: Optional[List[str]] = Field(default=[], description="List of document IDs accessible to this agent")
+
+
+class EmbeddingStatsResponse(BaseModel):
+    """Embedding service and cache statistics, for sizing caches from data"""
+    provider: str
+    model: str
+    cache: Optional[Dict[str, Any]] = Field(default=None, description="Cache statistics, or null when caching is disabled")
+    registry: Optional[Dict[str, Any]] = Field(default=None, description="Per-run embedding services pooled besides the shared one")
+    storage: Optional[Dict[str, Any]] = Field(default=None, description="Stored vector width, element type and reduction")
@@ -154,6 +154,7 @@ class PoliAgent(dspy.Module):
         refine_threshold: float = 0.05,
         max_interventions: Optional[int] = None,
         tools: Optional[list[callable]] = None,
+        embedding_service=None,
     ):
         super().__init__()
         self.id = agent_id
@@ -170,7 +171,8 @@ class PoliAgent(dspy.Module):
 
         # Tool setup
         self.last_tool_usage = None  # Initialize tool usage tracking
-        self.tools = tools or []
+        self.tools = [t for t in (tools or []) if t is not None]  # Agents without a tool get None
+        self.embedding_service = embedding_service  # The run's embedding model (None = shared service)
 
 
         if model:
@@ -195,7 +197,7 @@ class PoliAgent(dspy.Module):
             # Fallback to default behavior when no model provided
             self.intent_module = dspy.Predict(AgentIntentSignature)
             self.respond_module = dspy.ReAct(
-                signature=AgentRespondSignature, tools=tools, max_iters=6
+                signature=AgentRespondSignature, tools=self.tools, max_iters=6
             )
             self.vote_module = dspy.ChainOfThought(AgentVoteSignature)
             self.summarize = dspy.Predict(AgentSummarySignature)
@@ -205,12 +207,14 @@ class PoliAgent(dspy.Module):
         def _reward_novelty_persona(inputs: Dict[str, Any], outputs: Dict[str, Any]) -> float:
             from app.services.embedding_service import get_embedding_service
             
-            embedding_service = get_embedding_service()
+            embedding_service = self.embedding_service or get_embedding_service()
             draft = getattr(outputs, "response", "") or ""
             prev = self.last_opinion or ""
             persona = inputs.get("persona_description", "") or ""
-            novelty = 1.0 - float(embedding_service.text_similarity_score(draft, prev))
-            persona_fit = float(embedding_service.text_similarity_score(draft, persona))
+            # One batched encode for the draft, previous opinion and persona
+            similarity_to_prev, similarity_to_persona = embedding_service.similarity_pairs([draft], [prev, persona])[0]
+            novelty = 1.0 - float(similarity_to_prev)
+            persona_fit = float(similarity_to_persona)
             return 0.6 * novelty + 0.4 * persona_fit
 
         self._use_refiner = refine_N and refine_N > 0
@@ -377,7 +381,15 @@ class PoliAgent(dspy.Module):
 
     def talk(self, last_speaker: str = "", last_opinion: str = "") -> str:
         """Produce full ReAct-based debate response, refined and critiqued."""
-        
+        result = self.generate_response(last_speaker=last_speaker, last_opinion=last_opinion)
+        return self.commit_response(result)
+
+    def generate_response(self, last_speaker: str = "", last_opinion: str = "") -> Dict[str, Any]:
+        """
+        Run the expensive generation (ReAct/refine + critique) without touching
+        memory or intervention counters, so the result can be discarded
+        (used by speculative next-speaker generation).
+        """
         full_context = self.memory.to_text()  # full, untruncated for ReAct
 
         inputs = dict(
@@ -397,17 +409,25 @@ class PoliAgent(dspy.Module):
             out = self.respond_module(**inputs)
 
         draft = out.response
-        
-        # Extract tool usage and metadata from prediction
-        self.last_tool_usage = self._extract_tool_usage_from_prediction(out)
-        self.last_prediction_metadata = self._extract_prediction_metadata(out)
 
         # Step 2: Critique / persona consistency pass
         crit = self.critique(
             persona_description=self.persona_description,
             response=draft
         )
-        final_response = crit.corrected_response or draft
+
+        return {
+            "response": crit.corrected_response or draft,
+            # Extract tool usage and metadata from prediction
+            "tool_usage": self._extract_tool_usage_from_prediction(out),
+            "prediction_metadata": self._extract_prediction_metadata(out),
+        }
+
+    def commit_response(self, result: Dict[str, Any]) -> str:
+        """Apply a generated response to the agent state and return its text."""
+        final_response = result["response"]
+        self.last_tool_usage = result["tool_usage"]
+        self.last_prediction_metadata = result["prediction_metadata"]
 
         # Step 3: Memory update and intervention tracking
         self.memory.enqueue(final_response)
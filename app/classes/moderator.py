@@ -1,7 +1,6 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import random
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from .agents import PoliAgent
 
 
@@ -19,6 +18,7 @@ class Moderator:
         stance: str = "",
         bias: Optional[List[float]] = None,
         max_interventions_per_agent: Optional[int] = None,
+        embedding_service=None,
     ):
         self.agents = agents
         self._requests: List[PoliAgent] = []
@@ -30,6 +30,7 @@ class Moderator:
         self.bias = bias if bias is not None else [1.0] * len(agents)
         self.stance = stance
         self.max_interventions_per_agent = max_interventions_per_agent
+        self.embedding_service = embedding_service  # The run's embedding model (None = shared service)
 
         # Temporary desire weights during current round
         self._desire_weights: List[float] = []
@@ -98,6 +99,38 @@ class Moderator:
         combined = combined / combined.sum()
         self.weights = combined.tolist()
 
+    def leading_candidate(
+        self,
+        requests: List[Tuple[PoliAgent, float]],
+        pending: List[PoliAgent],
+    ) -> Optional[PoliAgent]:
+        """
+        Return the requester that `update()` would give the highest weight, as
+        soon as none of the `pending` proposals could overtake it (even with
+        the maximum desire of 1.0). Returns None while the leader is unclear.
+
+        Does not touch engagement stats, so it can be called while proposals
+        are still arriving.
+        """
+        if not requests:
+            return None
+
+        scores = [
+            self._fairness_score(agent) * float(np.clip(desire, 0.01, 1.0))
+            for agent, desire in requests
+        ]
+        best = int(np.argmax(scores))
+
+        if pending and max(self._fairness_score(agent) for agent in pending) >= scores[best]:
+            return None
+        return requests[best][0]
+
+    def _fairness_score(self, agent: PoliAgent) -> float:
+        """Unnormalized fairness weight of `agent` if it raises its hand this round (see `update`)."""
+        bias = float(self.bias[agent.id]) or 1.0
+        exponent = (self.hands_raised[agent.id] + 1) - (1 / bias) * self.interventions[agent.id]
+        return float(np.exp(np.clip(exponent, -500, 500)))
+
     # -----------------------------------------------------------------------
     # Speaker selection
     # -----------------------------------------------------------------------
@@ -140,9 +173,8 @@ class Moderator:
         if len(last_opinions) < 2:
             return False
 
-        embedding_service = get_embedding_service()
-        embeddings = embedding_service.encode(last_opinions)
-        similarity_matrix = cosine_similarity(embeddings)
+        embedding_service = self.embedding_service or get_embedding_service()
+        similarity_matrix = embedding_service.similarity_matrix(last_opinions)
         n = len(last_opinions)
         total = similarity_matrix.sum() - np.trace(similarity_matrix)
         num_pairs = n * (n - 1)
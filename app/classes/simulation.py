@@ -1,7 +1,9 @@
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 from uuid import UUID
+import threading
+import time
 import dspy
 
 from .agents import PoliAgent
@@ -27,6 +29,29 @@ class InternalAgentConfig:
     recall_tools: Optional[Dict[str, Any]] = None  # Recall tools configuration
 
 
+@dataclass
+class _Speculation:
+    """A next-speaker response generated ahead of speaker selection."""
+    agent: PoliAgent
+    last_speaker: str
+    last_opinion: str
+    future: Future
+    started_at: float = field(default_factory=time.perf_counter)
+
+
+def _generate_with_usage(agent: PoliAgent, last_speaker: str, last_opinion: str) -> Tuple[Dict[str, Any], int, float]:
+    """Run `agent.generate_response`, returning the result, LM tokens consumed and elapsed seconds."""
+    started = time.perf_counter()
+    with dspy.track_usage() as tracker:
+        result = agent.generate_response(last_speaker=last_speaker, last_opinion=last_opinion)
+    tokens = 0
+    for usage in tracker.get_total_tokens().values():
+        tokens += usage.get("total_tokens") or (
+            (usage.get("prompt_tokens") or 0) + (usage.get("completion_tokens") or 0)
+        )
+    return result, tokens, time.perf_counter() - started
+
+
 @dataclass
 class Simulation:
     topic: str
@@ -40,6 +65,8 @@ class Simulation:
     bias: Optional[List[float]] = None
     stance: str = ""
     max_interventions_per_agent: Optional[int] = None
+    speculative: bool = False  # Start the likely next speaker's generation before selection
+    embedding_service: Any = None  # The run's embedding model (None = shared service)
 
     iters: int = 0
     intervenciones: List[str] = field(default_factory=list)
@@ -53,6 +80,12 @@ class Simulation:
     _started: bool = field(default=False, init=False)
     _finished: bool = field(default=False, init=False)
 
+    # Speculative next-speaker generation
+    speculation_stats: Dict[str, Any] = field(default_factory=dict, init=False)
+    _speculation: Optional[_Speculation] = field(default=None, init=False)
+    _speculation_executor: Optional[ThreadPoolExecutor] = field(default=None, init=False)
+    _speculation_lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
     # -----------------------------------------------------------------------
     # Initialization
     # -----------------------------------------------------------------------
@@ -73,14 +106,18 @@ class Simulation:
 
         # Step 2: Create recall tools for all agents
         recall_configs = {}
+        recall_agent_names = []
         for idx, agent_config in enumerate(self.agent_configs):
             if agent_config.recall_tools:
-                recall_configs[f"agent_{idx}"] = agent_config.recall_tools
+                recall_configs[agent_config.name] = agent_config.recall_tools
+                recall_agent_names.append(agent_config.name)
                 print(f"🔧 Agent {idx} ({agent_config.name}) has recall tools: {agent_config.recall_tools}")
             else:
                 print(f"❌ Agent {idx} ({agent_config.name}) has no recall tools")
 
-        recall_tools = create_recall_tools_for_agents(recall_configs)
+        recall_tools = create_recall_tools_for_agents(
+            recall_configs, recall_agent_names, self.run_id, self.db_engine, self.embedding_service
+        )
 
         # Step 3: Create agents with their tools and models
         for idx, agent_config in enumerate(self.agent_configs):
@@ -109,7 +146,7 @@ class Simulation:
 
             # Get web search tool for this agent
             web_search_tool = web_search_tools.get(f"agent_{idx}")
-            recall_tool = recall_tools.get(f"agent_{idx}")
+            recall_tool = recall_tools.get(agent_config.name)
 
             # Create agent with its individual LM and web search tool
             a = PoliAgent(
@@ -119,7 +156,8 @@ class Simulation:
                 topic=self.topic,
                 model=agent_model,
                 max_interventions=self.max_interventions_per_agent,
-                tools=[web_search_tool, recall_tool]
+                tools=[web_search_tool, recall_tool],
+                embedding_service=self.embedding_service,
             )
             objs.append(a)
         return objs
@@ -136,9 +174,10 @@ class Simulation:
             if agent_config.recall_tools:
                 recall_configs[agent_config.name] = agent_config.recall_tools
         
-        # Assign documents in database
-        recall_service = RecallDocumentService(self.db_engine)
-        recall_service.assign_documents_to_run(recall_configs, agent_names, self.run_id)
+        # Assign documents in database (skipped for database-less runs, e.g. benchmarks)
+        if self.db_engine is not None:
+            recall_service = RecallDocumentService(self.db_engine, self.embedding_service)
+            recall_service.assign_documents_to_run(recall_configs, agent_names, self.run_id)
         
         self._agents = self._build_agents()
         global agents
@@ -152,6 +191,7 @@ class Simulation:
             stance=self.stance,
             bias=self.bias,
             max_interventions_per_agent=self.max_interventions_per_agent,
+            embedding_service=self.embedding_service,
         )
         self._locutor = self._mod.opening_commenter()
 
@@ -161,6 +201,14 @@ class Simulation:
         self.intervenciones.clear()
         self.engagement_log.clear()
         self.opiniones.clear()
+        self.speculation_stats = {
+            "attempts": 0,
+            "hits": 0,
+            "misses": 0,
+            "used_tokens": 0,
+            "wasted_tokens": 0,
+            "latency_saved_s": 0.0,
+        }
         # Agent intervention counts are now handled by individual agents
 
     # -----------------------------------------------------------------------
@@ -180,7 +228,11 @@ class Simulation:
         last_speaker = self.intervenciones[-1] if self.intervenciones else ""
         last_opinion = self.opiniones[-1] if self.opiniones else ""
         
-        opinion = self._locutor.talk(last_speaker=last_speaker, last_opinion=last_opinion)  # full ReAct phase
+        speculative_result = self._take_speculation(last_speaker, last_opinion)
+        if speculative_result is not None:
+            opinion = self._locutor.commit_response(speculative_result)
+        else:
+            opinion = self._locutor.talk(last_speaker=last_speaker, last_opinion=last_opinion)  # full ReAct phase
 
         self.opiniones.append(opinion)
         self.intervenciones.append(self._locutor.name)
@@ -209,8 +261,11 @@ class Simulation:
                     ex.submit(agent.propose, self._locutor.name, opinion): agent
                     for agent in eligible_agents
                 }
-                for f in as_completed(futures):
-                    agent = futures[f]
+                if self._can_speculate():
+                    self._speculate_while_proposing(futures, self._locutor.name, opinion)
+                # Register requests in agent order (not completion order) so that
+                # speaker selection is reproducible for a given random seed
+                for f, agent in futures.items():
                     try:
                         proposal = f.result()
                         proposals[agent.name] = proposal
@@ -244,8 +299,12 @@ class Simulation:
             elif self.iters + 1 >= self.max_iters:
                 stopped_reason = "Maximum iterations limit reached"
 
+        if self._speculation is not None and (stopped_reason or self._speculation.agent is not next_locutor):
+            self._discard_speculation()
+
         if stopped_reason:
             self._finished = True
+            self._shutdown_speculation()
             # Release documents when simulation finishes
             self._cleanup_documents()
         else:
@@ -266,6 +325,125 @@ class Simulation:
             "stopped_reason": stopped_reason,
         }
 
+    # -----------------------------------------------------------------------
+    # Speculative Next-Speaker Generation
+    # -----------------------------------------------------------------------
+
+    def _can_speculate(self) -> bool:
+        """
+        Speculate only when the next step's `talk` would see exactly the state the
+        speculative generation sees: not on the last step, and not when memory
+        summarization runs before the next turn.
+        """
+        if not self.speculative:
+            return False
+        next_iter = self.iters + 1
+        return next_iter < self.max_iters and next_iter % 3 != 0
+
+    def _speculate_while_proposing(self, futures: Dict[Future, PoliAgent], last_speaker: str, last_opinion: str) -> None:
+        """
+        Wait for proposals as they complete and, as soon as the proposal leader is
+        clear (see `Moderator.leading_candidate`), start its generation in the background.
+        """
+        requests: List[Tuple[PoliAgent, float]] = []
+        pending = set(futures.values())
+        for f in as_completed(futures):
+            agent = futures[f]
+            pending.discard(agent)
+            try:
+                proposal = f.result()
+            except Exception:
+                continue  # Reported when proposals are registered
+            if proposal.get("raise_hand"):
+                requests.append((agent, proposal.get("desire_to_speak", 0.0)))
+
+            if self._speculation is None:
+                leader = self._mod.leading_candidate(requests, list(pending))
+                if leader is not None:
+                    if self._speculation_executor is None:
+                        self._speculation_executor = ThreadPoolExecutor(max_workers=1)
+                    self._speculation = _Speculation(
+                        agent=leader,
+                        last_speaker=last_speaker,
+                        last_opinion=last_opinion,
+                        future=self._speculation_executor.submit(
+                            _generate_with_usage, leader, last_speaker, last_opinion
+                        ),
+                    )
+                    self.speculation_stats["attempts"] += 1
+
+    def _take_speculation(self, last_speaker: str, last_opinion: str) -> Optional[Dict[str, Any]]:
+        """Return the speculative response for the current speaker, if one was started for this turn."""
+        spec = self._speculation
+        self._speculation = None
+        if spec is None:
+            return None
+        if spec.agent is not self._locutor or spec.last_speaker != last_speaker or spec.last_opinion != last_opinion:
+            self._speculation = spec
+            self._discard_speculation()
+            return None
+
+        waited_from = time.perf_counter()
+        try:
+            result, tokens, elapsed = spec.future.result()
+        except Exception as e:
+            print(f"[Simulation] Speculative generation for {spec.agent.name} failed: {e}")
+            with self._speculation_lock:
+                self.speculation_stats["misses"] += 1
+            return None
+
+        with self._speculation_lock:
+            self.speculation_stats["hits"] += 1
+            self.speculation_stats["used_tokens"] += tokens
+            # Generation time that overlapped the rest of the previous step
+            self.speculation_stats["latency_saved_s"] += min(waited_from - spec.started_at, elapsed)
+        return result
+
+    def _discard_speculation(self) -> None:
+        """Drop the in-flight speculation; its tokens are counted as wasted once it completes."""
+        spec = self._speculation
+        self._speculation = None
+        if spec is None:
+            return
+        with self._speculation_lock:
+            self.speculation_stats["misses"] += 1
+
+        def _count_waste(f: Future) -> None:
+            if f.cancelled() or f.exception() is not None:
+                return
+            _, tokens, _ = f.result()
+            with self._speculation_lock:
+                self.speculation_stats["wasted_tokens"] += tokens
+
+        if not spec.future.cancel():
+            spec.future.add_done_callback(_count_waste)
+
+    def _shutdown_speculation(self) -> None:
+        self._discard_speculation()
+        if self._speculation_executor is not None:
+            self._speculation_executor.shutdown(wait=False, cancel_futures=True)
+            self._speculation_executor = None
+
+    def close(self) -> None:
+        """
+        Stop speculative generation (runs stopped by the user or by an error).
+
+        A queued speculation is cancelled; one already generating finishes in
+        the background and its tokens are counted as wasted. Safe to call more
+        than once and after the debate finished.
+        """
+        self._shutdown_speculation()
+
+    def speculation_report(self) -> Dict[str, Any]:
+        """Hit rate, wasted tokens and latency saved by speculative generation."""
+        with self._speculation_lock:
+            stats = dict(self.speculation_stats)
+        decided = stats.get("hits", 0) + stats.get("misses", 0)
+        stats["enabled"] = self.speculative
+        stats["hit_rate"] = round(stats.get("hits", 0) / decided, 3) if decided else None
+        stats["latency_saved_s"] = round(stats.get("latency_saved_s", 0.0), 3)
+        return stats
+
     # -----------------------------------------------------------------------
     # Run and Vote
     # -----------------------------------------------------------------------
@@ -296,6 +474,8 @@ class Simulation:
 
     def _cleanup_documents(self) -> None:
         """Release documents assigned to agents when simulation finishes."""
+        if self.db_engine is None:
+            return
         try:
             recall_service = RecallDocumentService(self.db_engine)
             recall_service.release_documents_from_run(self.run_id)
@@ -325,7 +505,9 @@ class Simulation:
                     "intervention_count": agent.interventions_used,
                     "max_interventions": agent.max_interventions,
                     "can_intervene": agent.can_intervene(),
-                    "has_web_search": agent.web_search_tool is not None,
+                    "has_web_search": any(
+                        getattr(t, "__name__", "").startswith("web_search") for t in agent.tools
+                    ),
                     "last_tool_usage": getattr(agent, 'last_tool_usage', None),
                 }
                 for agent in self._agents
@@ -340,4 +522,5 @@ class Simulation:
                 "weight": getattr(self._mod, "weights", []),
                 "bias": self.bias,
             },
+            "speculation": self.speculation_report(),
         }
@@ -0,0 +1,416 @@
+"""
+Deterministic language models for benchmarking and CI.
+
+Provides two drop-in replacements for `dspy.LM`:
+
+- `StubLM`: a local model that returns schema-valid outputs for every DSPy
+  signature used by the debate engine (intent, ReAct, vote, summary, critique),
+  with configurable latency. Lets benchmarks measure engine overhead without
+  network noise.
+- `CassetteLM`: wraps a real LM and records its traffic to a JSONL cassette,
+  or replays a previously recorded cassette byte-for-byte.
+
+Both are selectable at startup via `wrap_lm_from_env` (see `DEBATE_LM_MODE`).
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import dspy
+
+
+# ---------------------------------------------------------------------------
+#  Latency models
+# ---------------------------------------------------------------------------
+
+@dataclass
+class LatencyModel:
+    """
+    Latency distribution (in seconds) applied to each stub LM call.
+
+    kind:
+      - "constant": always `a`
+      - "uniform": uniformly distributed in [a, b]
+      - "lognormal": log-normal with median `a` and shape (sigma) `b`
+    """
+    kind: str = "constant"
+    a: float = 0.0
+    b: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "constant":
+            return max(0.0, self.a)
+        if self.kind == "uniform":
+            return max(0.0, rng.uniform(self.a, self.b))
+        if self.kind == "lognormal":
+            if self.a <= 0:
+                return 0.0
+            return rng.lognormvariate(math.log(self.a), self.b)
+        raise ValueError(f"Unknown latency model: {self.kind}")
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> "LatencyModel":
+        """
+        Parse a compact spec such as "0", "0.25", "uniform:0.1:0.5" or "lognormal:0.8:0.4".
+        """
+        if not spec:
+            return cls()
+        parts = spec.split(":")
+        if len(parts) == 1:
+            return cls("constant", float(parts[0]))
+        kind = parts[0].lower()
+        a = float(parts[1]) if len(parts) > 1 else 0.0
+        b = float(parts[2]) if len(parts) > 2 else 0.0
+        return cls(kind, a, b)
+
+
+# ---------------------------------------------------------------------------
+#  OpenAI-shaped response objects (what dspy's legacy LM contract expects)
+# ---------------------------------------------------------------------------
+
+class _Message:
+    def __init__(self, content: str):
+        self.content = content
+        self.role = "assistant"
+        self.tool_calls = None
+        self.reasoning_content = None
+
+
+class _Choice:
+    def __init__(self, content: str, index: int = 0):
+        self.index = index
+        self.message = _Message(content)
+        self.finish_reason = "stop"
+        self.logprobs = None
+
+
+class _Response:
+    def __init__(self, contents: List[str], model: str, usage: Dict[str, int]):
+        self.choices = [_Choice(c, i) for i, c in enumerate(contents)]
+        self.model = model
+        self.usage = usage
+        self.cache_hit = False
+        self._hidden_params = {}
+
+
+def _approx_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars per token)."""
+    return max(1, len(text) // 4)
+
+
+def _usage_for(messages: Optional[List[Dict[str, Any]]], prompt: Optional[str], contents: List[str]) -> Dict[str, int]:
+    prompt_text = prompt or "".join(str(m.get("content", "")) for m in (messages or []))
+    prompt_tokens = _approx_tokens(prompt_text)
+    completion_tokens = sum(_approx_tokens(c) for c in contents)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def request_key(model: str, prompt: Optional[str], messages: Optional[List[Dict[str, Any]]], kwargs: Dict[str, Any]) -> str:
+    """Stable hash of an LM request, ignoring credentials."""
+    safe_kwargs = {k: v for k, v in kwargs.items() if not k.startswith("api_")}
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "messages": messages, "kwargs": safe_kwargs},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+#  Stub LM
+# ---------------------------------------------------------------------------
+
+_OUTPUT_FIELD_RE = re.compile(r"^\d+\. `(\w+)` \((.+?)\)(?::|$)")
+
+_WORDS = (
+    "policy evidence society freedom economy justice community growth risk "
+    "fairness tradition reform market state citizens rights future trust "
+    "history welfare balance argument principle consequence value"
+).split()
+
+# Fields that carry the long free-text body of a turn
+_LONG_TEXT_FIELDS = {"response", "corrected_response", "summary", "reasoning", "next_thought"}
+
+
+class StubLM(dspy.BaseLM):
+    """
+    Local, deterministic `dspy.LM` replacement.
+
+    Reads the output-field section of the DSPy adapter prompt and returns a
+    well-formed value for each field (str, bool, float, Literal, dict), so every
+    signature in `app.classes.agents` parses without retries. Outputs depend only
+    on `seed` and the request, never on thread scheduling.
+    """
+
+    def __init__(
+        self,
+        model: str = "stub/debate",
+        *,
+        seed: int = 0,
+        latency: Optional[LatencyModel] = None,
+        raise_hand_rate: float = 0.7,
+        tool_call_rate: float = 0.0,
+        response_words: int = 40,
+        **kwargs,
+    ):
+        """
+        Initialize the stub LM.
+
+        Args:
+            model: Model identifier reported in history and usage
+            seed: Seed mixed into every per-request RNG
+            latency: Latency distribution applied to each call (default: none)
+            raise_hand_rate: Probability that boolean fields (e.g. raise_hand) are True
+            tool_call_rate: Probability that a ReAct step calls a tool instead of `finish`
+            response_words: Length of long text fields such as `response`
+        """
+        super().__init__(model=model, cache=False, **kwargs)
+        self.seed = seed
+        self.latency = latency or LatencyModel()
+        self.raise_hand_rate = raise_hand_rate
+        self.tool_call_rate = tool_call_rate
+        self.response_words = response_words
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        key = request_key(self.model, prompt, messages, kwargs)
+        rng = random.Random(f"{self.seed}:{key}")
+
+        delay = self.latency.sample(rng)
+        if delay > 0:
+            time.sleep(delay)
+
+        content = self._render(messages or [{"role": "user", "content": prompt or ""}], rng)
+        with self._calls_lock:
+            self.calls += 1
+        return _Response([content], self.model, _usage_for(messages, prompt, [content]))
+
+    async def aforward(self, prompt=None, messages=None, **kwargs):
+        import asyncio
+
+        key = request_key(self.model, prompt, messages, kwargs)
+        rng = random.Random(f"{self.seed}:{key}")
+
+        delay = self.latency.sample(rng)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        content = self._render(messages or [{"role": "user", "content": prompt or ""}], rng)
+        with self._calls_lock:
+            self.calls += 1
+        return _Response([content], self.model, _usage_for(messages, prompt, [content]))
+
+    # -----------------------------------------------------------------------
+    # Rendering
+    # -----------------------------------------------------------------------
+
+    def _render(self, messages: List[Dict[str, Any]], rng: random.Random) -> str:
+        system = next((str(m.get("content", "")) for m in messages if m.get("role") == "system"), "")
+        fields = self._parse_output_fields(system)
+        values = self._generate_values(fields, rng)
+
+        if "[[ ## completed ## ]]" in system or not system:
+            parts = [f"[[ ## {name} ## ]]\n{self._format_chat(value)}" for name, value in values]
+            parts.append("[[ ## completed ## ]]")
+            return "\n\n".join(parts)
+        return json.dumps(dict(values))
+
+    @staticmethod
+    def _parse_output_fields(system: str) -> List[Tuple[str, str]]:
+        """Extract (name, type) pairs from the adapter's 'Your output fields are:' section."""
+        fields: List[Tuple[str, str]] = []
+        in_outputs = False
+        for line in system.splitlines():
+            if line.startswith("Your output fields are:"):
+                in_outputs = True
+                continue
+            if not in_outputs:
+                continue
+            if line.startswith("All interactions will be structured"):
+                break
+            match = _OUTPUT_FIELD_RE.match(line.strip())
+            if match:
+                fields.append((match.group(1), match.group(2).strip()))
+        return fields
+
+    def _generate_values(self, fields: List[Tuple[str, str]], rng: random.Random) -> List[Tuple[str, Any]]:
+        values: List[Tuple[str, Any]] = []
+        chosen_tool: Optional[str] = None
+
+        for name, type_str in fields:
+            if type_str.startswith("Literal["):
+                options = self._literal_options(type_str)
+                if "finish" in options:
+                    tools = [o for o in options if o != "finish"]
+                    use_tool = tools and rng.random() < self.tool_call_rate
+                    value = rng.choice(tools) if use_tool else "finish"
+                    chosen_tool = value if value != "finish" else None
+                else:
+                    value = options[0] if options else ""
+            elif type_str == "bool":
+                value = rng.random() < self.raise_hand_rate
+            elif type_str == "float":
+                value = round(rng.random(), 2)
+            elif type_str == "int":
+                value = rng.randint(0, 10)
+            elif type_str.startswith("dict"):
+                value = {"query": self._words(rng, 5)} if chosen_tool else {}
+            elif type_str.startswith("list"):
+                value = []
+            else:
+                length = self.response_words if name in _LONG_TEXT_FIELDS else 6
+                value = self._words(rng, length)
+            values.append((name, value))
+
+        return values
+
+    @staticmethod
+    def _literal_options(type_str: str) -> List[str]:
+        inner = type_str[len("Literal["):-1]
+        try:
+            parsed = ast.literal_eval(f"[{inner}]")
+            return [str(o) for o in parsed]
+        except (ValueError, SyntaxError):
+            return []
+
+    @staticmethod
+    def _words(rng: random.Random, n: int) -> str:
+        return " ".join(rng.choice(_WORDS) for _ in range(n)).capitalize() + "."
+
+    @staticmethod
+    def _format_chat(value: Any) -> str:
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return str(value)
+
+
+# ---------------------------------------------------------------------------
+#  Record / replay
+# ---------------------------------------------------------------------------
+
+class CassetteMissError(RuntimeError):
+    """Raised in replay mode when a request was not recorded in the cassette."""
+
+
+class CassetteLM(dspy.BaseLM):
+    """
+    Record/replay wrapper around a real LM.
+
+    - mode="record": forwards to `inner` and appends each exchange to `path` (JSONL).
+    - mode="replay": serves responses from `path` without touching the network.
+
+    Requests are matched by a hash of (model, prompt, messages, kwargs). Identical
+    requests are replayed in the order they were recorded, so concurrent agents
+    issuing the same prompt still get deterministic results.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", inner: Optional[dspy.BaseLM] = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if mode == "record" and inner is None:
+            raise ValueError("Record mode requires an inner LM")
+
+        model = getattr(inner, "model", "cassette")
+        super().__init__(model=model, cache=False)
+        self.path = path
+        self.mode = mode
+        self.inner = inner
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+
+        if mode == "replay":
+            self._load()
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+                    if self.inner is None and self.model == "cassette":
+                        # Keys embed the recorded model name; adopt it when replaying standalone
+                        self.model = entry.get("lm_model", self.model)
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        key = request_key(self.model, prompt, messages, kwargs)
+        if self.mode == "replay":
+            return self._replay(key)
+        response = self.inner.forward(prompt=prompt, messages=messages, **kwargs)
+        return self._record(key, response)
+
+    async def aforward(self, prompt=None, messages=None, **kwargs):
+        key = request_key(self.model, prompt, messages, kwargs)
+        if self.mode == "replay":
+            return self._replay(key)
+        response = await self.inner.aforward(prompt=prompt, messages=messages, **kwargs)
+        return self._record(key, response)
+
+    def _replay(self, key: str) -> _Response:
+        with self._lock:
+            queue = self._entries.get(key)
+            if not queue:
+                raise CassetteMissError(f"No recorded response for request {key[:12]} in {self.path}")
+            entry = queue.popleft() if len(queue) > 1 else queue[0]
+        return _Response(entry["outputs"], entry.get("model", self.model), entry.get("usage", {}))
+
+    def _record(self, key: str, response):
+        outputs = [choice.message.content for choice in response.choices]
+        usage = dict(getattr(response, "usage", {}) or {})
+        entry = {
+            "key": key,
+            "lm_model": self.model,
+            "model": getattr(response, "model", self.model),
+            "outputs": outputs,
+            "usage": {k: v for k, v in usage.items() if isinstance(v, (int, float))},
+        }
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        return response
+
+
+# ---------------------------------------------------------------------------
+#  Environment wiring
+# ---------------------------------------------------------------------------
+
+def wrap_lm_from_env(lm: dspy.BaseLM) -> dspy.BaseLM:
+    """
+    Optionally replace or wrap the application LM based on environment variables.
+
+    DEBATE_LM_MODE:
+      - unset / "live": return `lm` unchanged
+      - "stub": return a StubLM (latency from DEBATE_LM_STUB_LATENCY, seed from DEBATE_LM_STUB_SEED)
+      - "record": wrap `lm` and record traffic to DEBATE_LM_CASSETTE
+      - "replay": replay traffic from DEBATE_LM_CASSETTE
+    """
+    mode = os.getenv("DEBATE_LM_MODE", "live").lower()
+    if mode == "live":
+        return lm
+    if mode == "stub":
+        return StubLM(
+            seed=int(os.getenv("DEBATE_LM_STUB_SEED", "0")),
+            latency=LatencyModel.parse(os.getenv("DEBATE_LM_STUB_LATENCY")),
+        )
+    if mode in ("record", "replay"):
+        path = os.getenv("DEBATE_LM_CASSETTE", "./cassettes/debate.jsonl")
+        return CassetteLM(path, mode=mode, inner=lm)
+    raise ValueError(f"Unknown DEBATE_LM_MODE: {mode}")
@@ -13,7 +13,8 @@ def create_recall_tool(
     tool_id: str = "default",
     agent_name: Optional[str] = None,
     run_id: Optional[UUID] = None,
-    engine=None
+    engine=None,
+    embedding_service=None
 ) -> callable:
     """
     Create a DSPy-compatible recall tool function.
@@ -24,6 +25,7 @@ def create_recall_tool(
         agent_name: Name of the agent using this tool
         run_id: UUID of the current simulation run
         engine: Database engine for queries
+        embedding_service: The run's embedding service (default: the shared service)
 
     Returns:
         Callable recall function compatible with DSPy
@@ -46,7 +48,7 @@ def create_recall_tool(
                 return "No recall sources configured"
 
             # Use recall engine for the heavy lifting
-            recall_engine = RecallEngine(engine)
+            recall_engine = RecallEngine(engine, embedding_service)
             results = recall_engine.query_embeddings(
                 query=query,
                 agent_name=agent_name,
@@ -69,7 +71,8 @@ def create_recall_tools_for_agents(
     agent_configs: Dict[str, Dict[str, Any]],
     agent_names: List[str],
     run_id: UUID,
-    engine
+    engine,
+    embedding_service=None
 ) -> Dict[str, callable]:
     """Create recall tools for multiple agents with different configurations."""
     tools = {}
@@ -85,6 +88,7 @@ def create_recall_tools_for_agents(
             agent_name=agent_name,
             run_id=run_id,
             engine=engine,
+            embedding_service=embedding_service,
         )
         tools[agent_name] = tool
 
@@ -20,8 +20,9 @@ logger = logging.getLogger(__name__)
 class RecallEngine:
     """Core engine for embedding-based recall operations."""
     
-    def __init__(self, engine):
+    def __init__(self, engine, embedding_service=None):
         self.engine = engine
+        self.embedding_service = embedding_service  # The run's embedding model (None = shared service)
     
     def query_embeddings(
         self,
@@ -46,9 +47,10 @@ class RecallEngine:
         """
         try:
             # Generate query embedding
-            embedding_service = get_embedding_service()
+            embedding_service = self.embedding_service or get_embedding_service()
             query_embedding = embedding_service.encode(query)
-            query_vector = query_embedding[0] if query_embedding.ndim > 1 else query_embedding
+            # Projected like the stored vectors (EMBEDDING_REDUCTION)
+            query_vector = embedding_service.to_storage(query_embedding)[0]
             
             with Session(self.engine) as db:
                 # Build query with pgvector cosine distance
@@ -66,6 +68,8 @@ class RecallEngine:
                         and_(
                             Embedding.run_id == run_id,
                             Embedding.source_type.in_(source_types),
+                            # Distances are only meaningful within one model's vector space
+                            Embedding.embedding_model == embedding_service.storage_model_name,
                             or_(
                                 Embedding.visibility == "public",
                                 and_(
@@ -10,7 +10,7 @@ from typing import Dict, Any, List
 from uuid import UUID
 
 from sqlmodel import Session, select
-from app.models import Embedding, AgentDocumentAccess
+from app.models import Embedding, AgentDocumentAccess, RUN_COPY_KEY, is_run_copy
 from .config import RecallToolConfig
 
 logger = logging.getLogger(__name__)
@@ -19,8 +19,43 @@ logger = logging.getLogger(__name__)
 class RecallDocumentService:
     """Service for managing document assignments during simulations."""
     
-    def __init__(self, engine):
+    def __init__(self, engine, embedding_service=None):
         self.engine = engine
+        self.embedding_service = embedding_service  # The run's embedding model (None = keep stored vectors)
+    
+    def _match_run_model(self, embeddings: List[Embedding]) -> List[Embedding]:
+        """
+        Run-model copies of document chunks stored under a different model than the run's.
+
+        The library rows keep their vectors (other runs and later assignments
+        use them); the copies are assigned alongside them and deleted when the
+        run releases its documents.
+        """
+        if self.embedding_service is None:
+            return []
+        model_name = self.embedding_service.storage_model_name
+        stale = [embedding for embedding in embeddings if embedding.embedding_model != model_name]
+        if not stale:
+            return []
+        vectors = self.embedding_service.embed_bulk([embedding.text_content for embedding in stale])
+        copies = [
+            Embedding(
+                source_type=embedding.source_type,
+                source_id=embedding.source_id,
+                text_content=embedding.text_content,
+                text_hash=embedding.text_hash,
+                visibility=embedding.visibility,
+                embedding=vector.tolist(),
+                embedding_model=model_name,
+                chunk_index=embedding.chunk_index,
+                chunk_start=embedding.chunk_start,
+                chunk_end=embedding.chunk_end,
+                extra_metadata={**(embedding.extra_metadata or {}), RUN_COPY_KEY: str(embedding.id)},
+            )
+            for embedding, vector in zip(stale, self.embedding_service.to_storage(vectors))
+        ]
+        logger.info(f"Re-embedded {len(stale)} document chunks with {model_name}")
+        return copies
     
     def assign_documents_to_run(
         self,
@@ -60,8 +95,11 @@ class RecallDocumentService:
                                 logger.warning(f"No unassigned embeddings found for document {document_id}")
                                 continue
                             
+                            # Recall compares against the run's model, so the chunks must be in its space
+                            copies = self._match_run_model(embeddings)
+                            
                             # Assign embeddings to agent
-                            for embedding in embeddings:
+                            for embedding in embeddings + copies:
                                 embedding.owner_agent = agent_name
                                 embedding.run_id = run_id
                                 db.add(embedding)
@@ -102,6 +140,9 @@ class RecallDocumentService:
                 
                 document_count = 0
                 for embedding in embeddings:
+                    if is_run_copy(embedding):
+                        db.delete(embedding)
+                        continue
                     embedding.owner_agent = None
                     embedding.run_id = None
                     db.add(embedding)
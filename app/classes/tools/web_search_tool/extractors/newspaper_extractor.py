@@ -1,4 +1,3 @@
-from newspaper import Article
 from typing import Optional
 from ..search_result import SearchResult
 from ..config import WebSearchConfig
@@ -13,6 +12,7 @@ def extract(url: str, config: WebSearchConfig, source: str = "Web") -> Optional[
         return None
 
     try:
+        from newspaper import Article  # Deferred: newspaper3k (nltk, lxml, feedparser) is slow to import
         article = Article(url)
         article.download()
         article.parse()
@@ -2,10 +2,8 @@ import logging
 from ..search_result import SearchResult
 from ..config import WebSearchConfig
 from typing import Dict, List
-from google.oauth2 import service_account
 import os
 import requests
-import google.auth.transport.requests
 
 
 logger = logging.getLogger(__name__)
@@ -22,6 +20,10 @@ def search_pse(query: str, config: WebSearchConfig, cache: Dict) -> List[SearchR
         return []
     
     try:
+        # Deferred: google-auth is only needed once a PSE search actually runs
+        from google.oauth2 import service_account
+        import google.auth.transport.requests
+
         # Load service account credentials
         creds = service_account.Credentials.from_service_account_file(
             os.getenv('GOOGLE_CREDENTIALS_PATH'), 
@@ -7,6 +7,7 @@ Usage:
     python -m app.database.cli reset      # Drop all tables and recreate
     python -m app.database.cli seed       # Seed database with initial data
     python -m app.database.cli fresh      # Drop, recreate, and seed
+    python -m app.database.cli convert-embeddings  # Apply EMBEDDING_STORAGE_* / EMBEDDING_REDUCTION
 """
 
 import os
@@ -211,6 +212,21 @@ def test_connection():
         sys.exit(1)
 
 
+def convert_embeddings():
+    """Convert stored embeddings to the configured storage (dimension, halfvec, reduction)."""
+    from app.services.embedding_service.reduction import convert_stored_embeddings, storage_from_env
+
+    storage = storage_from_env()
+    print(f"Converting stored embeddings to {storage.describe()}...")
+    try:
+        with engine.begin() as conn:
+            converted = convert_stored_embeddings(conn, storage)
+        print(f"✅ Embedding storage converted ({converted} rows re-projected)")
+    except Exception as e:
+        print(f"❌ Embedding conversion failed: {e}")
+        sys.exit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Database management CLI for IPRE Debate Agents",
@@ -228,7 +244,7 @@ Examples:
         choices=[
             "migrate", "reset", "seed", "drop", "fresh", 
             "status", "rollback", "tables", "test",
-            "seed-agents", "seed-users"
+            "seed-agents", "seed-users", "convert-embeddings"
         ],
         help="Database command to run"
     )
@@ -248,6 +264,7 @@ Examples:
         "rollback": rollback_migration,
         "tables": show_tables,
         "test": test_connection,
+        "convert-embeddings": convert_embeddings,
     }
     
     # Execute the command
@@ -2,6 +2,7 @@
 Shared dependencies for FastAPI routes.
 """
 import logging
+import os
 from typing import Generator, Optional
 from uuid import UUID
 
@@ -84,4 +85,24 @@ def get_current_user(
             detail="Inactive user account"
         )
     
-    return user
\ No newline at end of file
+    return user
+
+
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Dependency that only lets administrators through.
+    Administrators are the users whose email is listed in ADMIN_EMAILS (comma-separated).
+    Use this dependency on routes that expose server-wide data.
+    """
+    admin_emails = {
+        email.strip().lower()
+        for email in os.getenv("ADMIN_EMAILS", "").split(",")
+        if email.strip()
+    }
+    if current_user.email.lower() not in admin_emails:
+        logger.warning(f"Non-admin user attempted admin access: {current_user.email}")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
@@ -1,12 +1,14 @@
 from __future__ import annotations
+import hashlib
+import os
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from uuid import UUID, uuid4
 
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, Index, String
+from sqlalchemy import Column, Index, String, event
 from sqlalchemy.dialects.postgresql import JSONB, ARRAY
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC, Vector
 
 
 # -----------------------
@@ -249,6 +251,25 @@ class ToolUsage(SQLModel, table=True):
     )
 
 
+# -----------------------
+# Embedding storage
+# -----------------------
+
+# Stored vector width and element type; after changing either, convert the table with
+# `python -m app.database.cli convert-embeddings` (see docs/embedding-models.md)
+EMBEDDING_STORAGE_DIM = int(os.getenv("EMBEDDING_STORAGE_DIM", "384"))
+EMBEDDING_STORAGE_TYPE = os.getenv("EMBEDDING_STORAGE_TYPE", "vector").lower()  # 'vector' (float32) or 'halfvec' (float16)
+
+
+def embedding_column_type(dim: int = EMBEDDING_STORAGE_DIM, storage_type: str = EMBEDDING_STORAGE_TYPE):
+    """pgvector column type for stored embeddings."""
+    if storage_type == "halfvec":
+        return HALFVEC(dim)
+    if storage_type == "vector":
+        return Vector(dim)
+    raise ValueError(f"Unknown EMBEDDING_STORAGE_TYPE '{storage_type}'. Choose from: vector, halfvec")
+
+
 class Embedding(SQLModel, table=True):
     """
     Stores vector embeddings for all embeddable content with privacy model.
@@ -265,15 +286,16 @@ class Embedding(SQLModel, table=True):
     source_type: str = Field(nullable=False, index=True)  # 'intervention', 'tool_query', 'tool_output', 'document'
     source_id: UUID = Field(nullable=False, index=True)   # FK to source table
     text_content: str = Field(nullable=False)             # The actual text that was embedded
+    text_hash: Optional[str] = Field(default=None, max_length=64)  # SHA-256 of text_content, filled on insert
     
     # Privacy and access control
     visibility: str = Field(nullable=False, index=True)   # 'public' (interventions) or 'private' (tools/docs)
     owner_agent: Optional[str] = Field(default=None, index=True)  # For private embeddings
     run_id: Optional[UUID] = Field(foreign_key="runs.id", nullable=True, index=True)  # NULL for unassigned documents
     
-    # Embedding data (384 dimensions for MiniLM)
-    embedding: List[float] = Field(sa_column=Column(Vector(384), nullable=False))
-    embedding_model: str = Field(nullable=False)          # 'sentence-transformers/all-MiniLM-L6-v2'
+    # Embedding data (EMBEDDING_STORAGE_DIM wide, 384 for MiniLM unless reduced)
+    embedding: List[float] = Field(sa_column=Column(embedding_column_type(), nullable=False))
+    embedding_model: str = Field(nullable=False)          # 'sentence-transformers/all-MiniLM-L6-v2', '+pca128' when reduced
     
     # Chunking information (for large documents)
     chunk_index: Optional[int] = Field(default=None)      # NULL for non-chunked content, 0+ for chunks
@@ -289,9 +311,31 @@ class Embedding(SQLModel, table=True):
         Index("embeddings_visibility_agent", "visibility", "owner_agent"),
         Index("embeddings_run_visibility", "run_id", "visibility"),
         Index("embeddings_chunk_lookup", "source_type", "source_id", "chunk_index"),
+        Index("embeddings_model_text_hash", "embedding_model", "text_hash"),
     )
 
 
+def hash_embedding_text(text: str) -> str:
+    """Hex SHA-256 of the embedded text (matches the SQL backfill in the migration)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# extra_metadata key marking a run's copy of a document chunk, re-embedded with the run's model
+RUN_COPY_KEY = "run_copy_of"
+
+
+def is_run_copy(embedding: Embedding) -> bool:
+    """Whether the row is a run's copy of a document chunk (deleted, not released, after the run)."""
+    return bool((embedding.extra_metadata or {}).get(RUN_COPY_KEY))
+
+
+@event.listens_for(Embedding, "before_insert")
+def _fill_embedding_text_hash(mapper, connection, target: Embedding) -> None:
+    """Every stored embedding can be reused by (model, text hash) lookups."""
+    if target.text_hash is None and target.text_content is not None:
+        target.text_hash = hash_embedding_text(target.text_content)
+
+
 # -----------------------
 # Document Library
 # -----------------------
@@ -1,16 +1,18 @@
+import asyncio
 from typing import Dict, List, Any, Optional, Tuple
 from uuid import UUID
+import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from sqlmodel import SQLModel
 
-from ..models import Intervention, RunAnalytics, Run
+from ..models import Intervention, RunAnalytics, Run, ConfigVersion
 
 
 class AnalyticsService:
     """Service for computing and caching simulation analytics"""
     
-    def get_or_compute_analytics(self, run_id: UUID, db: Session) -> Optional[Dict[str, Any]]:
+    async def get_or_compute_analytics(self, run_id: UUID, db: Session) -> Optional[Dict[str, Any]]:
         """
         Get analytics for a run. If not cached, compute and cache them.
         Uses short-lived DB session pattern like the rest of the app.
@@ -29,7 +31,7 @@ class AnalyticsService:
             return {"error": "Simulation must be finished to generate analytics"}
         
         # Compute analytics
-        analytics_data = self._compute_analytics(run_id, db)
+        analytics_data = await self._compute_analytics(run_id, db)
         if not analytics_data:
             return None
         
@@ -48,7 +50,7 @@ class AnalyticsService:
         
         return self._format_analytics_response(analytics)
     
-    def _compute_analytics(self, run_id: UUID, db: Session) -> Optional[Dict[str, Any]]:
+    async def _compute_analytics(self, run_id: UUID, db: Session) -> Optional[Dict[str, Any]]:
         """Compute analytics from Intervention data"""
         
         # Get all interventions for this run, ordered by iteration
@@ -87,7 +89,7 @@ class AnalyticsService:
         participation_stats = self._compute_participation_stats(interventions, agent_names)
         
         # Compute opinion similarity matrix using final opinions
-        opinion_similarity_matrix = self._compute_opinion_similarity(interventions, agent_names)
+        opinion_similarity_matrix = await self._compute_opinion_similarity(interventions, agent_names, self._run_embedding_selection(run_id, db))
         
         return {
             "engagement_matrix": engagement_matrix,
@@ -135,15 +137,21 @@ class AnalyticsService:
             "total_turns": total_turns
         }
     
-    def _compute_opinion_similarity(self, interventions: List[Intervention], agent_names: List[str]) -> Optional[Dict[str, Any]]:
-        """Compute opinion similarity matrix using final opinions of each agent"""
-        
-        try:
-            from app.services.embedding_service import get_embedding_service
-            embedding_service = get_embedding_service()
-        except Exception:
-            # If embedding service fails, return None (similarity matrix will be omitted)
-            return None
+    def _run_embedding_selection(self, run_id: UUID, db: Session) -> Tuple[Optional[str], Optional[dict]]:
+        """The (embedding_model, embedding_config) the run was configured with"""
+        run = db.get(Run, run_id)
+        version = db.get(ConfigVersion, run.config_version_id) if run and run.config_version_id else None
+        if version is None:
+            return None, None
+        return version.parameters.get("embedding_model"), version.parameters.get("embedding_config")
+
+    async def _compute_opinion_similarity(
+        self,
+        interventions: List[Intervention],
+        agent_names: List[str],
+        embedding_selection: Tuple[Optional[str], Optional[dict]] = (None, None),
+    ) -> Optional[Dict[str, Any]]:
+        """Compute opinion similarity matrix using final opinions of each agent, with the run's embedding model"""
         
         # Get the last opinion from each agent
         agent_final_opinions = {}
@@ -165,28 +173,28 @@ class AnalyticsService:
         if len(final_opinions) < 2:
             return None  # Need at least 2 opinions to compute similarity
         
-        # Compute similarity matrix with explicit agent mappings
-        similarity_data = {}
+        try:
+            from app.services.embedding_service import acquire_run_embedding_service, release_run_embedding_service
+            embedding_service = await asyncio.to_thread(acquire_run_embedding_service, *embedding_selection)
+        except Exception:
+            # If embedding service fails, return None (similarity matrix will be omitted)
+            return None
         
-        for i, agent_i in enumerate(speaking_agents):
-            for j, agent_j in enumerate(speaking_agents):
-                if i == j:
-                    similarity_data[f"{agent_i}_vs_{agent_j}"] = 1.0  # Self-similarity is 1.0
-                else:
-                    similarity = embedding_service.text_similarity_score(final_opinions[i], final_opinions[j])
-                    similarity_data[f"{agent_i}_vs_{agent_j}"] = float(similarity)
-        
-        # Also create traditional matrix format for backwards compatibility
-        similarity_matrix = []
-        for i, opinion_i in enumerate(final_opinions):
-            similarity_row = []
-            for j, opinion_j in enumerate(final_opinions):
-                if i == j:
-                    similarity_row.append(1.0)  # Self-similarity is 1.0
-                else:
-                    similarity = embedding_service.text_similarity_score(opinion_i, opinion_j)
-                    similarity_row.append(float(similarity))  # Ensure it's a regular float
-            similarity_matrix.append(similarity_row)
+        # One batched encode and one matrix multiply (off the event loop); hold the
+        # service meanwhile so the registry does not shut it down under us
+        try:
+            similarities = await embedding_service.similarity_matrix_async(final_opinions)
+        finally:
+            release_run_embedding_service(embedding_service)
+        np.fill_diagonal(similarities, 1.0)  # Self-similarity is 1.0
+        similarity_matrix = similarities.astype(float).tolist()
+
+        # Explicit agent mappings, read from the same matrix
+        similarity_data = {
+            f"{agent_i}_vs_{agent_j}": similarity_matrix[i][j]
+            for i, agent_i in enumerate(speaking_agents)
+            for j, agent_j in enumerate(speaking_agents)
+        }
         
         return {
             "matrix": similarity_matrix,
@@ -18,7 +18,7 @@ def create_config_version(
     max_iters: int = 21,
     bias: Optional[List[float]] = None,
     stance: str = "",
-    embedding_model: str = "onnx_minilm",
+    embedding_model: Optional[str] = None,
     embedding_config: Optional[dict] = None,
     max_interventions_per_agent: Optional[int] = None,
     **kwargs
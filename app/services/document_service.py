@@ -10,7 +10,7 @@ from fastapi import UploadFile, HTTPException
 from sqlmodel import Session, select
 from sqlalchemy.exc import IntegrityError
 
-from app.models import DocumentLibrary, Embedding, User, AgentDocumentAccess
+from app.models import DocumentLibrary, Embedding, User, AgentDocumentAccess, is_run_copy
 from app.services.file_processing_service import FileProcessingService
 
 
@@ -77,7 +77,7 @@ class DocumentService:
             raise HTTPException(400, "Document with this content already exists")
         
         try:
-            self.file_processor.generate_embeddings_efficiently(document, db)
+            await self.file_processor.generate_embeddings_efficiently(document, db)
         except Exception as e:
             # Update status but don't fail the upload
             document.embedding_status = "failed"
@@ -222,6 +222,9 @@ class DocumentService:
         embeddings = db.exec(embedding_stmt).all()
         
         for embedding in embeddings:
+            if is_run_copy(embedding):
+                db.delete(embedding)
+                continue
             embedding.owner_agent = None
             embedding.run_id = None
             db.add(embedding)
@@ -9,8 +9,27 @@ from .service import EmbeddingService
 from .factory import EmbeddingProviderFactory
 from .base import EmbeddingProvider, EmbeddingCache
 from .cache import InMemoryLRUCache, NoOpCache
-from .shared import get_embedding_service, reset_embedding_service, embedding_service_stats
-from .utils import setup_onnx_model
+from .disk_cache import DiskEmbeddingCache
+from .slab_cache import SlabEmbeddingCache
+from .db_reuse import DatabaseReadThroughProvider
+from .dispatcher import MicroBatchingProvider
+from .fallback import FallbackProvider
+from .reduction import EmbeddingStorage, PCAReducer, TruncationReducer, get_embedding_storage
+from .shared import (
+    get_embedding_service,
+    reset_embedding_service,
+    embedding_service_stats,
+    is_embedding_service_initialized,
+)
+from .registry import (
+    EmbeddingServiceRegistry,
+    acquire_run_embedding_service,
+    get_embedding_registry,
+    get_run_embedding_service,
+    release_run_embedding_service,
+    reset_embedding_registry,
+)
+from .utils import setup_onnx_model, create_onnx_variants
 
 __all__ = [
     "EmbeddingService",
@@ -19,8 +38,25 @@ __all__ = [
     "EmbeddingCache",
     "InMemoryLRUCache",
     "NoOpCache",
+    "SlabEmbeddingCache",
+    "DiskEmbeddingCache",
+    "DatabaseReadThroughProvider",
+    "MicroBatchingProvider",
+    "FallbackProvider",
+    "EmbeddingStorage",
+    "PCAReducer",
+    "TruncationReducer",
+    "get_embedding_storage",
     "get_embedding_service",
     "reset_embedding_service", 
     "embedding_service_stats",
-    "setup_onnx_model"
+    "is_embedding_service_initialized",
+    "EmbeddingServiceRegistry",
+    "get_embedding_registry",
+    "get_run_embedding_service",
+    "acquire_run_embedding_service",
+    "release_run_embedding_service",
+    "reset_embedding_registry",
+    "setup_onnx_model",
+    "create_onnx_variants"
 ]
\ No newline at end of file
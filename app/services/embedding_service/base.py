@@ -5,8 +5,11 @@ Provides the foundational abstractions that all embedding providers must impleme
 """
 
 from __future__ import annotations
+import asyncio
 import numpy as np
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from contextvars import ContextVar
 from typing import Union, List, Optional, Protocol, Iterable
 
 
@@ -14,6 +17,10 @@ from typing import Union, List, Optional, Protocol, Iterable
 ArrayOrList = Union[np.ndarray, List[np.ndarray]]
 TextInput = Union[str, List[str]]
 
+# Executor used by the default `embed_async` (None: the event loop's default executor).
+# EmbeddingService sets its bounded embedding executor here for each awaited call.
+embedding_executor: ContextVar[Optional[Executor]] = ContextVar("embedding_executor", default=None)
+
 
 class EmbeddingCache(Protocol):
     """Protocol for embedding cache implementations."""
@@ -26,6 +33,14 @@ class EmbeddingCache(Protocol):
         """Store embedding in cache."""
         ...
 
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """Retrieve several embeddings at once (None for each miss), in key order."""
+        ...
+
+    def set_many(self, keys: List[str], values: List[np.ndarray]) -> None:
+        """Store several embeddings at once."""
+        ...
+
 
 class EmbeddingProvider(ABC):
     """
@@ -63,13 +78,16 @@ class EmbeddingProvider(ABC):
         pass
     
     @abstractmethod
-    def cosine_many(self, query_vec: np.ndarray, doc_vecs: Iterable[np.ndarray]) -> np.ndarray:
+    def cosine_many(
+        self, query_vec: np.ndarray, doc_vecs: Iterable[np.ndarray], assume_normalized: bool = False
+    ) -> np.ndarray:
         """
         Calculate cosine similarities between a query vector and multiple document vectors.
         
         Args:
             query_vec: Single query embedding vector
             doc_vecs: Iterable of document embedding vectors
+            assume_normalized: Skip normalization when both inputs are already L2-normalized
             
         Returns:
             Array of cosine similarity scores
@@ -88,6 +106,23 @@ class EmbeddingProvider(ABC):
         """Identifier for the underlying model."""
         pass
 
+    async def embed_async(self, texts: TextInput) -> ArrayOrList:
+        """
+        Awaitable version of `embed`.
+        
+        The default runs `embed` on a worker thread (`embedding_executor`), so
+        CPU-bound inference never blocks the event loop. Remote providers
+        override it with native async HTTP calls.
+        
+        Args:
+            texts: Single string or list of strings to embed
+            
+        Returns:
+            Single numpy array for string input, list of arrays for list input
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(embedding_executor.get(), self.embed, texts)
+
 
 class BatchableProvider(EmbeddingProvider):
     """
@@ -6,12 +6,22 @@ Provides various caching strategies to avoid redundant embedding computations.
 
 import threading
 import hashlib
+import time
 from collections import OrderedDict
-from typing import Optional, Tuple
+from typing import Iterable, List, Optional, Tuple
 import numpy as np
 
 from .base import EmbeddingCache
 
+try:
+    import xxhash
+except ImportError:  # Optional: faster cache keys
+    xxhash = None
+
+# Keys start with the hash algorithm, so processes with and without `xxhash`
+# (e.g. sharing a disk cache) never compare hashes from different algorithms
+CACHE_KEY_ALGORITHM = "xxh3" if xxhash is not None else "b2"
+
 
 class InMemoryLRUCache(EmbeddingCache):
     """
@@ -19,10 +29,10 @@ class InMemoryLRUCache(EmbeddingCache):
     
     Features:
     - LRU eviction when capacity is exceeded
-    - Optional TTL for cache entry expiration
+    - Optional TTL for cache entry expiration, in seconds of `time.monotonic()`
     - Thread-safe operations with RLock
     - Stores numpy arrays efficiently
-    - Monotonic logical clock for TTL (avoids time.time() overhead)
+    - Hit, miss, eviction and expiration counters
     """
     
     def __init__(self, capacity: int = 10000, ttl_seconds: Optional[int] = None):
@@ -38,21 +48,20 @@ class InMemoryLRUCache(EmbeddingCache):
         self._lock = threading.RLock()
         self._store: OrderedDict[str, Tuple[np.ndarray, float]] = OrderedDict()
 
-        # Use a monotonic counter for simple "age" tracking
-        # This avoids importing time and is more predictable for testing
-        self._tick = 0.0
-        self._tick_step = 1.0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
 
     def _now(self) -> float:
-        """Get current logical timestamp."""
-        self._tick += self._tick_step
-        return self._tick
+        """Get current timestamp (monotonic, unaffected by system clock changes)."""
+        return time.monotonic()
 
-    def _expired(self, inserted_at: float) -> bool:
+    def _expired(self, inserted_at: float, now: float) -> bool:
         """Check if a cache entry has expired."""
         if self.ttl is None:
             return False
-        return (self._tick - inserted_at) > self.ttl
+        return (now - inserted_at) > self.ttl
 
     def get(self, key: str) -> Optional[np.ndarray]:
         """
@@ -64,19 +73,23 @@ class InMemoryLRUCache(EmbeddingCache):
         Returns:
             Cached embedding array or None if not found/expired
         """
+        now = self._now()
         with self._lock:
-            if key not in self._store:
-                return None
-            
-            arr, timestamp = self._store.pop(key)
-            
-            # Check expiration
-            if self._expired(timestamp):
-                return None
+            return self._get_locked(key, now)
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Retrieve several embeddings under a single lock acquisition.
+        
+        Args:
+            keys: Cache keys
             
-            # Move to end (mark as recently used)
-            self._store[key] = (arr, timestamp)
-            return arr
+        Returns:
+            Cached arrays in key order, None for each missing/expired key
+        """
+        now = self._now()
+        with self._lock:
+            return [self._get_locked(key, now) for key in keys]
 
     def set(self, key: str, value: np.ndarray) -> None:
         """
@@ -86,17 +99,58 @@ class InMemoryLRUCache(EmbeddingCache):
             key: Cache key
             value: Embedding array to store
         """
+        now = self._now()
         with self._lock:
-            # Remove if already exists
-            if key in self._store:
-                self._store.pop(key)
-            
-            # Add new entry
-            self._store[key] = (value, self._now())
-            
-            # Evict oldest entries if over capacity
-            while len(self._store) > self.capacity:
-                self._store.popitem(last=False)
+            self._set_locked(key, value, now)
+            self._evict_locked()
+
+    def set_many(self, keys: List[str], values: List[np.ndarray]) -> None:
+        """
+        Store several embeddings under a single lock acquisition.
+        
+        Args:
+            keys: Cache keys
+            values: Embedding arrays, aligned with `keys`
+        """
+        now = self._now()
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._set_locked(key, value, now)
+            self._evict_locked()
+
+    def _get_locked(self, key: str, now: float) -> Optional[np.ndarray]:
+        """Look up `key`; caller holds the lock."""
+        if key not in self._store:
+            self._misses += 1
+            return None
+        
+        arr, timestamp = self._store.pop(key)
+        
+        # Check expiration
+        if self._expired(timestamp, now):
+            self._expirations += 1
+            self._misses += 1
+            return None
+        
+        # Move to end (mark as recently used)
+        self._store[key] = (arr, timestamp)
+        self._hits += 1
+        return arr
+
+    def _set_locked(self, key: str, value: np.ndarray, now: float) -> None:
+        """Insert or refresh `key` as most recently used; caller holds the lock."""
+        # Remove if already exists
+        if key in self._store:
+            self._store.pop(key)
+        
+        # Add new entry
+        self._store[key] = (value, now)
+
+    def _evict_locked(self) -> None:
+        """Evict oldest entries while over capacity; caller holds the lock."""
+        while len(self._store) > self.capacity:
+            self._store.popitem(last=False)
+            self._evictions += 1
 
     def clear(self) -> None:
         """Clear all cache entries."""
@@ -111,11 +165,18 @@ class InMemoryLRUCache(EmbeddingCache):
     def stats(self) -> dict:
         """Get cache statistics."""
         with self._lock:
+            lookups = self._hits + self._misses
             return {
+                "type": "lru",
                 "size": len(self._store),
                 "capacity": self.capacity,
                 "ttl_seconds": self.ttl,
-                "utilization": len(self._store) / self.capacity if self.capacity > 0 else 0
+                "utilization": len(self._store) / self.capacity if self.capacity > 0 else 0,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations
             }
 
 
@@ -128,6 +189,12 @@ class NoOpCache(EmbeddingCache):
     def set(self, key: str, value: np.ndarray) -> None:
         pass
 
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        return [None] * len(keys)
+
+    def set_many(self, keys: List[str], values: List[np.ndarray]) -> None:
+        pass
+
 
 def create_cache_key(model_name: str, text: str) -> str:
     """
@@ -138,10 +205,37 @@ def create_cache_key(model_name: str, text: str) -> str:
         text: Input text
         
     Returns:
-        Hex-encoded SHA-256 hash
+        Hash algorithm and hex-encoded 128-bit hash (see `create_cache_keys`)
+    """
+    return create_cache_keys(model_name, (text,))[0]
+
+
+def create_cache_keys(model_name: str, texts: Iterable[str]) -> List[str]:
+    """
+    Create cache keys for many texts of the same model.
+    
+    Uses xxh3-128 when the `xxhash` package is installed (an order of magnitude
+    faster than SHA-256 on document chunks), otherwise BLAKE2b-128 with the
+    model prefix hashed once. Each key is prefixed with the algorithm
+    (`xxh3:` or `b2:`). Keys only need to be collision-free within a cache,
+    not cryptographically secure.
+    
+    Args:
+        model_name: Name/identifier of the embedding model
+        texts: Input texts
+        
+    Returns:
+        Keys of the form `<algorithm>:<hex>`, in input order
     """
-    hasher = hashlib.sha256()
-    hasher.update(model_name.encode("utf-8"))
-    hasher.update(b"\x00")  # Separator
-    hasher.update(text.encode("utf-8"))
-    return hasher.hexdigest()
\ No newline at end of file
+    prefix = model_name.encode("utf-8") + b"\x00"  # Separator
+    namespace = CACHE_KEY_ALGORITHM + ":"
+    if xxhash is not None:
+        return [namespace + xxhash.xxh3_128_hexdigest(prefix + text.encode("utf-8")) for text in texts]
+
+    prefix_hasher = hashlib.blake2b(prefix, digest_size=16)
+    keys = []
+    for text in texts:
+        hasher = prefix_hasher.copy()
+        hasher.update(text.encode("utf-8"))
+        keys.append(namespace + hasher.hexdigest())
+    return keys
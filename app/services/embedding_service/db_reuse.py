@@ -0,0 +1,240 @@
+"""
+Read-through reuse of vectors already stored in the `embeddings` table.
+
+Every intervention, tool output and document chunk is persisted with its
+text, model and vector. Re-analysis, re-voting and reruns over the same
+content can therefore be served from Postgres with one indexed bulk lookup
+on (embedding_model, text_hash) instead of running the model again.
+"""
+
+import asyncio
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.models import Embedding, hash_embedding_text
+
+from .base import ArrayOrList, EmbeddingProvider, TextInput
+from .cache import create_cache_keys
+
+
+class DatabaseReadThroughProvider(EmbeddingProvider):
+    """
+    Provider wrapper that consults stored embeddings before the model.
+
+    Lookup order for each text: the wrapped provider's cache, then the
+    `embeddings` table, then the wrapped provider itself. Vectors found in
+    the database are copied into the provider's cache.
+
+    Features:
+    - One bulk query per call (chunked for very large inputs), deduplicated texts
+    - Only rows produced by the same model are reused
+    - Database errors fall back to the wrapped provider, never fail an embedding
+    - Hit/miss/error counters for the database tier
+    """
+
+    # Key of this wrapper's section in EmbeddingService.cache_stats()
+    stats_key = "database_reuse"
+
+    def __init__(self, provider: EmbeddingProvider, engine: Engine, lookup_chunk_size: int = 500):
+        """
+        Wrap a provider with database reuse.
+
+        Args:
+            provider: Provider that computes embeddings on a miss
+            engine: SQLAlchemy engine for the application database
+            lookup_chunk_size: Maximum text hashes per lookup query
+        """
+        self.provider = provider
+        self.engine = engine
+        self.lookup_chunk_size = max(1, lookup_chunk_size)
+
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+
+    # -----------------------------------------------------------------------
+    # Embedding
+    # -----------------------------------------------------------------------
+
+    def embed(self, texts: TextInput) -> ArrayOrList:
+        """
+        Embed one or many texts, reusing stored vectors where possible.
+
+        Args:
+            texts: Single string or list of strings to embed
+
+        Returns:
+            Single numpy array for string input, list of arrays for list input
+        """
+        if isinstance(texts, str):
+            return self._embed_many([texts], None)[0]
+        return self._embed_many(list(texts), None)
+
+    def embed_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[np.ndarray]:
+        """
+        Embed a batch of texts, reusing stored vectors where possible.
+
+        Args:
+            texts: List of texts to embed
+            batch_size: Optional batch size override for the wrapped provider
+
+        Returns:
+            List of embedding arrays
+        """
+        return self._embed_many(list(texts), batch_size)
+
+    async def embed_async(self, texts: TextInput) -> ArrayOrList:
+        """
+        Async version of `embed`.
+
+        The database lookup runs in a worker thread; misses are embedded with
+        the wrapped provider's `embed_async`.
+        """
+        single = isinstance(texts, str)
+        items = [texts] if single else list(texts)
+        if not items:
+            return []
+
+        results, pending = await asyncio.to_thread(self.resolve_known, items)
+        if pending:
+            missing = list(pending)
+            self._fill(results, pending, await self.provider.embed_async(missing))
+        return results[0] if single else results
+
+    def _embed_many(self, texts: List[str], batch_size: Optional[int]) -> List[np.ndarray]:
+        if not texts:
+            return []
+
+        results, pending = self.resolve_known(texts)
+        if pending:
+            missing = list(pending)
+            if batch_size is not None and self.provider.supports_batching:
+                computed = self.provider.embed_batch(missing, batch_size)
+            else:
+                computed = self.provider.embed(missing)
+            self._fill(results, pending, computed)
+        return results
+
+    def resolve_known(self, texts: List[str]) -> Tuple[List[Optional[np.ndarray]], Dict[str, List[int]]]:
+        """
+        Serve texts from the provider's cache, then from the database.
+
+        Returns:
+            Results with the known vectors filled in, and the remaining texts
+            mapped to every position they occur at
+        """
+        model_name = self.provider.model_name
+        cache = getattr(self.provider, "cache", None)
+        results: List[Optional[np.ndarray]] = (
+            cache.get_many(create_cache_keys(model_name, texts)) if cache is not None else [None] * len(texts)
+        )
+
+        pending: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if results[i] is None:
+                pending.setdefault(text, []).append(i)
+
+        if pending:
+            stored = self.lookup(pending.keys())
+            if stored and cache is not None:
+                cache.set_many(create_cache_keys(model_name, list(stored)), list(stored.values()))
+            for text, vector in stored.items():
+                for i in pending.pop(text):
+                    results[i] = vector
+        return results, pending
+
+    @staticmethod
+    def _fill(results: List[Optional[np.ndarray]], pending: Dict[str, List[int]], computed: List[np.ndarray]) -> None:
+        for text, vector in zip(pending, computed):
+            for i in pending[text]:
+                results[i] = vector
+
+    def lookup(self, texts: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Fetch stored vectors for `texts` produced by the wrapped provider's model.
+
+        Args:
+            texts: Texts to look up
+
+        Returns:
+            Mapping of text to float32 vector, for the texts found
+        """
+        by_hash = {hash_embedding_text(text): text for text in texts}
+        if not by_hash:
+            return {}
+
+        hashes = list(by_hash)
+        found: Dict[str, np.ndarray] = {}
+        try:
+            with Session(self.engine) as db:
+                for start in range(0, len(hashes), self.lookup_chunk_size):
+                    chunk = hashes[start:start + self.lookup_chunk_size]
+                    rows = db.exec(
+                        select(Embedding.text_hash, Embedding.embedding)
+                        .where(Embedding.embedding_model == self.provider.model_name)
+                        .where(Embedding.text_hash.in_(chunk))
+                        .distinct(Embedding.text_hash)
+                    ).all()
+                    for text_hash, vector in rows:
+                        if hasattr(vector, "to_numpy"):  # halfvec storage
+                            vector = vector.to_numpy()
+                        found[by_hash[text_hash]] = np.asarray(vector, dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️  Embedding reuse lookup failed, computing instead: {e}")
+            with self._stats_lock:
+                self._errors += 1
+            return {}
+
+        with self._stats_lock:
+            self._hits += len(found)
+            self._misses += len(by_hash) - len(found)
+        return found
+
+    # -----------------------------------------------------------------------
+    # Delegation to the wrapped provider
+    # -----------------------------------------------------------------------
+
+    def cosine(self, a: np.ndarray, b: np.ndarray) -> float:
+        return self.provider.cosine(a, b)
+
+    def cosine_many(
+        self, query_vec: np.ndarray, doc_vecs: Iterable[np.ndarray], assume_normalized: bool = False
+    ) -> np.ndarray:
+        return self.provider.cosine_many(query_vec, doc_vecs, assume_normalized)
+
+    def warmup(self) -> None:
+        """Warm up the wrapped provider, if it supports it."""
+        warmup = getattr(self.provider, "warmup", None)
+        if callable(warmup):
+            warmup()
+
+    @property
+    def cache(self):
+        """The wrapped provider's cache (None if it has none)."""
+        return getattr(self.provider, "cache", None)
+
+    @property
+    def supports_batching(self) -> bool:
+        return self.provider.supports_batching
+
+    @property
+    def model_name(self) -> str:
+        return self.provider.model_name
+
+    def stats(self) -> dict:
+        """Database tier statistics (per process)."""
+        with self._stats_lock:
+            hits, misses, errors = self._hits, self._misses, self._errors
+        lookups = hits + misses
+        return {
+            "provider": self.provider.__class__.__name__,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "errors": errors,
+        }
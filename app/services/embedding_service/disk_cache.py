@@ -0,0 +1,317 @@
+"""
+Persistent on-disk embedding cache.
+
+Backed by SQLite so it survives restarts and can be shared by every worker
+process on the host. Vectors are stored as raw float32 blobs. A hit costs one
+indexed lookup: SQLite copies the blob into a `bytes` object (from its
+memory-mapped pages when `mmap_bytes` covers the file) and `np.frombuffer`
+wraps that object without a second copy. Reads never write: access times are
+collected in memory and persisted with the next write transaction.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base import EmbeddingCache
+
+
+class DiskEmbeddingCache(EmbeddingCache):
+    """
+    SQLite-backed embedding cache shared across processes.
+
+    Features:
+    - Survives restarts; all worker processes on a host share the same file
+    - WAL journaling and a busy timeout for safe concurrent multi-process access
+    - Vectors stored as contiguous float32 blobs, page reads memory-mapped
+    - Size-based eviction of least recently used entries; access times are
+      batched and written with the next write, so hits never wait for
+      another process's write lock
+    - Hit/miss/eviction statistics (per process) plus on-disk size and entry count
+    """
+
+    # Access times are only refreshed when older than this
+    _TOUCH_INTERVAL_SECONDS = 60
+    # Pending access times at which a read tries (without waiting) to persist them
+    _TOUCH_FLUSH_AT = 256
+    # Check the size bound once every this many writes
+    _EVICTION_CHECK_EVERY = 64
+    # Keys per `IN (...)` query, well under SQLite's bound-parameter limit
+    _LOOKUP_CHUNK = 500
+
+    def __init__(
+        self,
+        path: str = "./embedding-cache/embeddings.sqlite",
+        max_bytes: int = 1024 * 1024 * 1024,
+        mmap_bytes: int = 256 * 1024 * 1024,
+        busy_timeout_ms: int = 5000,
+    ):
+        """
+        Initialize disk cache.
+
+        Args:
+            path: SQLite database file (created if missing)
+            max_bytes: Maximum bytes used by cache pages before LRU eviction
+            mmap_bytes: Bytes of the database file to memory-map for reads
+            busy_timeout_ms: How long to wait for another process's write lock
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.mmap_bytes = mmap_bytes
+        self.busy_timeout_ms = busy_timeout_ms
+
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._writes_since_check = 0
+        self._pending_touches: Dict[str, float] = {}
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " vector BLOB NOT NULL,"
+                " last_access REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+
+    # -----------------------------------------------------------------------
+    # Connections
+    # -----------------------------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread and process (connections must not cross a fork)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_bytes)}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # -----------------------------------------------------------------------
+    # EmbeddingCache protocol
+    # -----------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Retrieve embedding from cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached float32 embedding (read-only) or None if not found
+        """
+        return self.get_many([key])[0]
+
+    def set(self, key: str, value: np.ndarray) -> None:
+        """
+        Store embedding in cache.
+
+        Args:
+            key: Cache key
+            value: Embedding array to store (stored as float32)
+        """
+        self.set_many([key], [value])
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Retrieve several embeddings with one query per chunk of keys.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Cached float32 embeddings (read-only) in key order, None for each miss
+        """
+        conn = self._connection()
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), self._LOOKUP_CHUNK):
+            chunk = unique_keys[start:start + self._LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT key, vector, last_access FROM embeddings WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, vector, last_access in rows:
+                found[key] = (vector, last_access)
+
+        self._record_touches(conn, found)
+
+        results = [
+            np.frombuffer(found[key][0], dtype=np.float32) if key in found else None
+            for key in keys
+        ]
+        hits = sum(1 for r in results if r is not None)
+        with self._stats_lock:
+            self._hits += hits
+            self._misses += len(keys) - hits
+        return results
+
+    def set_many(self, keys: List[str], values: List[np.ndarray]) -> None:
+        """
+        Store several embeddings in a single transaction.
+
+        Args:
+            keys: Cache keys
+            values: Embedding arrays, aligned with `keys` (stored as float32)
+        """
+        now = time.time()
+        rows = [
+            (key, np.ascontiguousarray(value, dtype=np.float32).tobytes(), now)
+            for key, value in zip(keys, values)
+        ]
+        if not rows:
+            return
+        conn = self._connection()
+        touches = self._take_touches()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)", rows
+            )
+            # Access times collected by reads since the last write, in the same transaction
+            conn.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?", touches)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            self._restore_touches(touches)
+            raise
+        self._count_writes(conn, len(rows))
+
+    # -----------------------------------------------------------------------
+    # Deferred access times
+    # -----------------------------------------------------------------------
+
+    def _record_touches(self, conn: sqlite3.Connection, found: Dict[str, Tuple[bytes, float]]) -> None:
+        """Remember hits whose access time is stale; persist them once enough are pending."""
+        now = time.time()
+        with self._stats_lock:
+            for key, (_, last_access) in found.items():
+                if now - last_access > self._TOUCH_INTERVAL_SECONDS:
+                    self._pending_touches[key] = now
+            flush = len(self._pending_touches) >= self._TOUCH_FLUSH_AT
+        if flush:
+            self._flush_touches_nowait(conn)
+
+    def _take_touches(self) -> List[Tuple[float, str]]:
+        with self._stats_lock:
+            touches = [(at, key) for key, at in self._pending_touches.items()]
+            self._pending_touches.clear()
+        return touches
+
+    def _restore_touches(self, touches: List[Tuple[float, str]]) -> None:
+        with self._stats_lock:
+            for at, key in touches:
+                self._pending_touches.setdefault(key, at)
+
+    def _flush_touches_nowait(self, conn: sqlite3.Connection) -> None:
+        """Persist pending access times only if the write lock is free right now."""
+        touches = self._take_touches()
+        conn.execute("PRAGMA busy_timeout=0")
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?", touches)
+            conn.execute("COMMIT")
+        except sqlite3.OperationalError:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._restore_touches(touches)  # Another process is writing; retry later
+        finally:
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+
+    def _count_writes(self, conn: sqlite3.Connection, n: int) -> None:
+        """Run the size check once every `_EVICTION_CHECK_EVERY` written entries."""
+        with self._stats_lock:
+            self._writes_since_check += n
+            check = self._writes_since_check >= self._EVICTION_CHECK_EVERY
+            if check:
+                self._writes_since_check = 0
+        if check:
+            self._evict_if_needed(conn)
+
+    # -----------------------------------------------------------------------
+    # Eviction
+    # -----------------------------------------------------------------------
+
+    def _used_bytes(self, conn: sqlite3.Connection) -> int:
+        """Bytes in use by live pages (free pages left by deletes are reused, not counted)."""
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - freelist) * page_size
+
+    def _evict_if_needed(self, conn: sqlite3.Connection) -> None:
+        """Delete least recently used entries until usage is back under 90% of `max_bytes`."""
+        used = self._used_bytes(conn)
+        if used <= self.max_bytes:
+            return
+
+        count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if count == 0:
+            return
+        target = int(self.max_bytes * 0.9)
+        # Estimate how many entries to drop from the average entry footprint
+        to_delete = max(1, int(count * (used - target) / used))
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute(
+                "DELETE FROM embeddings WHERE key IN ("
+                " SELECT key FROM embeddings ORDER BY last_access LIMIT ?"
+                ")",
+                (to_delete,),
+            )
+            conn.execute("COMMIT")
+        except sqlite3.OperationalError:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            return  # Another process is evicting; try again on a later write
+        with self._stats_lock:
+            self._evictions += cursor.rowcount
+
+    # -----------------------------------------------------------------------
+    # Maintenance and stats
+    # -----------------------------------------------------------------------
+
+    def clear(self) -> None:
+        """Remove every entry (for all processes sharing the file)."""
+        conn = self._connection()
+        conn.execute("DELETE FROM embeddings")
+
+    def size(self) -> int:
+        """Get current number of cached entries."""
+        return self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> dict:
+        """Get cache statistics (hit/miss/eviction counters are for this process)."""
+        conn = self._connection()
+        with self._stats_lock:
+            hits, misses, evictions = self._hits, self._misses, self._evictions
+        lookups = hits + misses
+        used = self._used_bytes(conn)
+        return {
+            "type": "disk",
+            "path": self.path,
+            "size": self.size(),
+            "bytes_used": used,
+            "max_bytes": self.max_bytes,
+            "utilization": used / self.max_bytes if self.max_bytes > 0 else 0,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "evictions": evictions,
+        }
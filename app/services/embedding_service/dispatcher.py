@@ -0,0 +1,231 @@
+"""
+In-process micro-batching of concurrent embedding requests.
+
+Refiner rewards, diversity checks, recall queries and step persistence all
+embed a handful of texts at a time from different threads. Running one
+inference per call wastes most of the model's batch throughput, so the
+dispatcher coalesces requests that arrive within a short window into a
+single provider call and fans the vectors back out to the waiting callers.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .base import ArrayOrList, EmbeddingProvider, TextInput
+from .cache import create_cache_keys
+
+
+_Request = Tuple[List[str], Future]
+
+
+class MicroBatchingProvider(EmbeddingProvider):
+    """
+    Provider wrapper that batches concurrent small requests.
+
+    Features:
+    - Requests arriving within `max_wait_ms` (or until `max_batch` texts)
+      share one inference call on a dispatcher thread
+    - No added latency for a lone caller: a batch is dispatched as soon as
+      every caller currently waiting has been collected
+    - Cache hits are served in the calling thread, only misses are queued
+    - Requests of `max_batch` texts or more bypass the queue
+    - Errors are propagated to every caller of the failed batch
+    """
+
+    # Key of this wrapper's section in EmbeddingService.cache_stats()
+    stats_key = "micro_batching"
+
+    def __init__(self, provider: EmbeddingProvider, max_wait_ms: float = 3.0, max_batch: int = 64):
+        """
+        Wrap a provider with micro-batching.
+
+        Args:
+            provider: Provider that computes the batched embeddings
+            max_wait_ms: Longest time a partial batch waits for more requests
+            max_batch: Texts per batch at which it is dispatched immediately
+        """
+        self.provider = provider
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_batch = max(1, max_batch)
+
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lifecycle_lock = threading.Lock()  # Serializes enqueue/start against close
+        self._lock = threading.Lock()
+        self._inflight = 0  # Requests queued or being embedded
+
+        self._requests = 0
+        self._batches = 0
+        self._batched_texts = 0
+
+    # -----------------------------------------------------------------------
+    # Embedding
+    # -----------------------------------------------------------------------
+
+    def embed(self, texts: TextInput) -> ArrayOrList:
+        """
+        Embed one or many texts, sharing inference with concurrent callers.
+
+        Args:
+            texts: Single string or list of strings to embed
+
+        Returns:
+            Single numpy array for string input, list of arrays for list input
+        """
+        single = isinstance(texts, str)
+        items = [texts] if single else list(texts)
+        if not items:
+            return []
+
+        if len(items) >= self.max_batch:
+            vectors = self.provider.embed(items)
+        else:
+            vectors = self._embed_queued(items)
+        return vectors[0] if single else vectors
+
+    def embed_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[np.ndarray]:
+        """Large explicit batches go straight to the wrapped provider."""
+        if self.provider.supports_batching:
+            return self.provider.embed_batch(texts, batch_size)
+        return self.provider.embed(list(texts))
+
+    def _embed_queued(self, items: List[str]) -> List[np.ndarray]:
+        cache = getattr(self.provider, "cache", None)
+        vectors = cache.get_many(create_cache_keys(self.provider.model_name, items)) if cache is not None else [None] * len(items)
+        missing = [i for i, vec in enumerate(vectors) if vec is None]
+        if not missing:
+            return vectors
+
+        future: Future = Future()
+        with self._lifecycle_lock:
+            with self._lock:
+                self._inflight += 1
+                self._requests += 1
+            self._ensure_thread()
+            self._queue.put(([items[i] for i in missing], future))
+
+        for i, vec in zip(missing, future.result()):
+            vectors[i] = vec
+        return vectors
+
+    # -----------------------------------------------------------------------
+    # Dispatcher thread
+    # -----------------------------------------------------------------------
+
+    def _ensure_thread(self) -> None:
+        """Start the dispatcher thread; caller holds `_lifecycle_lock`."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="embedding-dispatcher", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            n_texts = len(first[0])
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while n_texts < self.max_batch:
+                with self._lock:
+                    everyone_collected = self._inflight <= len(batch)
+                remaining = deadline - time.monotonic()
+                if everyone_collected or remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+                n_texts += len(request[0])
+
+            self._dispatch(batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch: List[_Request]) -> None:
+        """Embed the union of the batch's texts once and resolve every request."""
+        unique = list(dict.fromkeys(text for texts, _ in batch for text in texts))
+        try:
+            computed = self.provider.embed(unique)
+            by_text: Dict[str, np.ndarray] = dict(zip(unique, computed))
+            results = [[by_text[text] for text in texts] for texts, _ in batch]
+        except Exception as e:
+            results = None
+            error = e
+
+        with self._lock:
+            self._inflight -= len(batch)
+            self._batches += 1
+            self._batched_texts += len(unique)
+
+        for i, (_, future) in enumerate(batch):
+            if results is None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[i])
+
+    def close(self) -> None:
+        """Stop the dispatcher thread after the queued requests are served and wait for it."""
+        with self._lifecycle_lock:
+            thread = self._thread
+            if thread is not None and thread.is_alive():
+                self._queue.put(None)
+                if thread is not threading.current_thread():
+                    # A later request must not start a new thread while this one still runs
+                    thread.join()
+            self._thread = None
+
+    # -----------------------------------------------------------------------
+    # Delegation to the wrapped provider
+    # -----------------------------------------------------------------------
+
+    def cosine(self, a: np.ndarray, b: np.ndarray) -> float:
+        return self.provider.cosine(a, b)
+
+    def cosine_many(
+        self, query_vec: np.ndarray, doc_vecs: Iterable[np.ndarray], assume_normalized: bool = False
+    ) -> np.ndarray:
+        return self.provider.cosine_many(query_vec, doc_vecs, assume_normalized)
+
+    def warmup(self) -> None:
+        """Warm up the wrapped provider, if it supports it."""
+        warmup = getattr(self.provider, "warmup", None)
+        if callable(warmup):
+            warmup()
+
+    @property
+    def cache(self):
+        """The wrapped provider's cache (None if it has none)."""
+        return getattr(self.provider, "cache", None)
+
+    @property
+    def supports_batching(self) -> bool:
+        return self.provider.supports_batching
+
+    @property
+    def model_name(self) -> str:
+        return self.provider.model_name
+
+    def stats(self) -> dict:
+        """Micro-batching statistics (per process)."""
+        with self._lock:
+            requests, batches, texts = self._requests, self._batches, self._batched_texts
+        return {
+            "max_wait_ms": self.max_wait * 1000,
+            "max_batch": self.max_batch,
+            "requests": requests,
+            "batches": batches,
+            "texts_per_batch": texts / batches if batches else 0.0,
+            "requests_per_batch": requests / batches if batches else 0.0,
+        }
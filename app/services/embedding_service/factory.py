@@ -5,10 +5,13 @@ Provides a centralized way to create and configure embedding providers
 with support for caching, batching, and other optimizations.
 """
 
-from typing import Optional, Dict, Any, Type
+from typing import Optional, Dict, Any, Type, List
 from .base import EmbeddingProvider
 from .cache import InMemoryLRUCache, NoOpCache, EmbeddingCache
-from .providers import HuggingFaceProvider, ONNXProvider, OpenRouterProvider
+from .disk_cache import DiskEmbeddingCache
+from .fallback import FallbackProvider
+from .slab_cache import SlabEmbeddingCache
+from .providers import HuggingFaceProvider, ONNXProvider, OpenRouterProvider, StubProvider
 
 
 class EmbeddingProviderFactory:
@@ -25,6 +28,7 @@ class EmbeddingProviderFactory:
         "onnx": ONNXProvider,
         "onnx_minilm": ONNXProvider,  # Backward compatibility alias
         "openrouter": OpenRouterProvider,
+        "stub": StubProvider,  # Deterministic, for benchmarks and CI
     }
     
     @classmethod
@@ -117,6 +121,12 @@ class EmbeddingProviderFactory:
         model_dir: str = "./onnx-model",
         normalize: bool = True,
         cache_config: Optional[Dict[str, Any]] = None,
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: Optional[int] = None,
+        graph_optimization: str = "all",
+        execution_mode: str = "sequential",
+        enable_mem_arena: bool = True,
+        optimized_model_dir: Optional[str] = None,
         **kwargs
     ) -> ONNXProvider:
         """
@@ -126,6 +136,12 @@ class EmbeddingProviderFactory:
             model_dir: Directory containing ONNX model files
             normalize: Whether to normalize embeddings
             cache_config: Cache configuration
+            intra_op_threads: ONNX Runtime intra-op threads (None: one per core)
+            inter_op_threads: ONNX Runtime inter-op threads (parallel execution mode only)
+            graph_optimization: 'disable', 'basic', 'extended' or 'all'
+            execution_mode: 'sequential' or 'parallel'
+            enable_mem_arena: Whether to use the CPU memory arena
+            optimized_model_dir: Directory to cache the optimized graph in (None: no cache)
             **kwargs: Additional provider arguments
             
         Returns:
@@ -136,6 +152,12 @@ class EmbeddingProviderFactory:
             model_dir=model_dir,
             normalize=normalize,
             cache=cache,
+            intra_op_threads=intra_op_threads,
+            inter_op_threads=inter_op_threads,
+            graph_optimization=graph_optimization,
+            execution_mode=execution_mode,
+            enable_mem_arena=enable_mem_arena,
+            optimized_model_dir=optimized_model_dir,
             **kwargs
         )
     
@@ -170,6 +192,31 @@ class EmbeddingProviderFactory:
             **kwargs
         )
     
+    @classmethod
+    def create_fallback_provider(
+        cls,
+        providers: List[EmbeddingProvider],
+        same_embedding_space: bool = False,
+        **kwargs
+    ) -> FallbackProvider:
+        """
+        Chain providers with hedged requests and failover.
+        
+        Args:
+            providers: Primary provider followed by its fallbacks
+            same_embedding_space: Allow providers with different model names that
+                produce interchangeable vectors (e.g. hosted and ONNX all-MiniLM-L6-v2)
+            **kwargs: Hedging options (hedge_percentile, initial_hedge_delay_ms, ...)
+            
+        Returns:
+            Configured fallback provider
+            
+        Raises:
+            ValueError: If the providers embed with different models and
+                `same_embedding_space` is not set
+        """
+        return FallbackProvider(providers, same_embedding_space=same_embedding_space, **kwargs)
+    
     @classmethod
     def _create_cache(cls, cache_config: Optional[Dict[str, Any]]) -> EmbeddingCache:
         """
@@ -177,9 +224,13 @@ class EmbeddingProviderFactory:
         
         Args:
             cache_config: Cache configuration dict with keys:
-                - type: Cache type ('lru' or 'none', defaults to 'lru')
+                - type: Cache type ('lru', 'slab', 'disk' or 'none', defaults to 'lru')
                 - capacity: Maximum cache size (default: 10000)
                 - ttl_seconds: Time-to-live in seconds (optional)
+                - path: SQLite file for the 'disk' cache
+                - max_bytes: Size bound for the 'slab' and 'disk' caches (default: 1 GiB)
+                - dtype: Storage precision for the 'slab' cache ('float32' or 'float16')
+                - eviction: Eviction policy for the 'slab' cache ('clock' or 'lru')
                 
         Returns:
             Cache instance
@@ -196,6 +247,17 @@ class EmbeddingProviderFactory:
                 capacity=cache_config.get("capacity", 10000),
                 ttl_seconds=cache_config.get("ttl_seconds")
             )
+        elif cache_type == "slab":
+            return SlabEmbeddingCache(
+                max_bytes=cache_config.get("max_bytes", 1024 * 1024 * 1024),
+                dtype=cache_config.get("dtype", "float32"),
+                eviction=cache_config.get("eviction", "clock")
+            )
+        elif cache_type == "disk":
+            return DiskEmbeddingCache(
+                path=cache_config.get("path", "./embedding-cache/embeddings.sqlite"),
+                max_bytes=cache_config.get("max_bytes", 1024 * 1024 * 1024)
+            )
         else:
             raise ValueError(f"Unknown cache type: {cache_type}")
 
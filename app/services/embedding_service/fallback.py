@@ -0,0 +1,368 @@
+"""
+Hedged requests and failover across embedding providers.
+
+When the primary provider (e.g. the HuggingFace Inference API) slows down,
+every refiner reward, diversity check and recall query slows with it. The
+fallback provider sends each request to the primary and, if no answer has
+arrived after the primary's recent p95 latency, sends the same request to
+the next provider, using whichever answers first. Errors fail over to the
+next provider immediately.
+"""
+
+import asyncio
+import bisect
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .base import ArrayOrList, EmbeddingProvider, TextInput
+
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Bucketed latency counts plus a sliding window for percentiles."""
+
+    def __init__(self, window: int = 512):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.recent: "deque[float]" = deque(maxlen=window)
+
+    def observe(self, latency_ms: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.recent.append(latency_ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Latency percentile over the window (None without samples)."""
+        if not self.recent:
+            return None
+        return float(np.percentile(np.fromiter(self.recent, dtype=np.float64), p))
+
+    def buckets(self) -> Dict[str, int]:
+        labels = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + [f"gt_{LATENCY_BUCKETS_MS[-1]}ms"]
+        return dict(zip(labels, self.counts))
+
+
+class _Member:
+    """A provider in the chain with its latency and outcome statistics."""
+
+    def __init__(self, provider: EmbeddingProvider):
+        self.provider = provider
+        self.histogram = LatencyHistogram()
+        self.calls = 0
+        self.hedged_calls = 0
+        self.wins = 0
+        self.errors = 0
+        self.disabled_reason: Optional[str] = None
+
+
+class FallbackProvider(EmbeddingProvider):
+    """
+    Composite provider with hedged requests and failover.
+
+    Features:
+    - Each request goes to the first provider; the next one is started once
+      the request has been outstanding for the previous provider's p95
+      latency (clamped), and the first successful answer wins
+    - Errors fail over to the next provider without waiting
+    - Only compatible providers can be chained, because their vectors are
+      cached and stored together: by default all providers must report the
+      same model name, and every answer is checked against the dimension
+      of the first one (a mismatching provider is disabled)
+    - Per-provider latency histograms, p50/p95, wins, hedges and errors
+    """
+
+    # Key of this wrapper's section in EmbeddingService.cache_stats()
+    stats_key = "fallback"
+
+    def __init__(
+        self,
+        providers: Sequence[EmbeddingProvider],
+        hedge_percentile: float = 95.0,
+        initial_hedge_delay_ms: float = 250.0,
+        min_hedge_delay_ms: float = 10.0,
+        max_hedge_delay_ms: float = 2000.0,
+        min_samples: int = 20,
+        same_embedding_space: bool = False,
+    ):
+        """
+        Chain providers, the first being the primary.
+
+        Args:
+            providers: Primary provider followed by its fallbacks
+            hedge_percentile: Latency percentile of a provider after which the next one is started
+            initial_hedge_delay_ms: Hedge delay until a provider has `min_samples` latencies
+            min_hedge_delay_ms: Lower bound of the hedge delay
+            max_hedge_delay_ms: Upper bound of the hedge delay
+            min_samples: Latencies needed before the percentile is used
+            same_embedding_space: Declare that providers with different model names
+                produce interchangeable vectors (e.g. the hosted all-MiniLM-L6-v2 and
+                its local ONNX export); otherwise model names must match
+        """
+        if len(providers) < 2:
+            raise ValueError("FallbackProvider needs a primary and at least one fallback provider")
+        names = {provider.model_name for provider in providers}
+        if len(names) > 1 and not same_embedding_space:
+            raise ValueError(
+                f"Providers embed with different models ({', '.join(sorted(names))}); their vectors "
+                "cannot be stored together. Pass same_embedding_space=True only if they are interchangeable"
+            )
+
+        self.provider = providers[0]  # Primary (followed by EmbeddingService._provider_chain)
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_delay = initial_hedge_delay_ms / 1000
+        self.min_hedge_delay = min_hedge_delay_ms / 1000
+        self.max_hedge_delay = max_hedge_delay_ms / 1000
+        self.min_samples = max(1, min_samples)
+
+        self._members = [_Member(provider) for provider in providers]
+        self._dim: Optional[int] = None
+        self._lock = threading.Lock()
+        # Losing calls keep running until they finish, so leave room beyond one call per provider
+        self._executor = ThreadPoolExecutor(max_workers=4 * len(providers), thread_name_prefix="embedding-hedge")
+
+    # -----------------------------------------------------------------------
+    # Embedding
+    # -----------------------------------------------------------------------
+
+    def embed(self, texts: TextInput) -> ArrayOrList:
+        """
+        Embed one or many texts with the fastest healthy provider.
+
+        Args:
+            texts: Single string or list of strings to embed
+
+        Returns:
+            Single numpy array for string input, list of arrays for list input
+        """
+        single = isinstance(texts, str)
+        items = [texts] if single else list(texts)
+        if not items:
+            return []
+        vectors = self._race(items, None)
+        return vectors[0] if single else vectors
+
+    def embed_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[np.ndarray]:
+        """Embed a batch with the fastest healthy provider (batch size applies to batching providers)."""
+        texts = list(texts)
+        return self._race(texts, batch_size) if texts else []
+
+    async def embed_async(self, texts: TextInput) -> ArrayOrList:
+        """Awaitable version of `embed()` (native async calls where providers support them)."""
+        single = isinstance(texts, str)
+        items = [texts] if single else list(texts)
+        if not items:
+            return []
+        vectors = await self._race_async(items)
+        return vectors[0] if single else vectors
+
+    def _race(self, items: List[str], batch_size: Optional[int]) -> List[np.ndarray]:
+        members = self._active_members()
+        running: Dict[Future, _Member] = {}
+        errors: List[Exception] = []
+
+        def start(member: _Member, hedged: bool) -> None:
+            self._count_start(member, hedged)
+            running[self._executor.submit(self._timed_call, member, items, batch_size)] = member
+
+        start(members[0], hedged=False)
+        next_index = 1
+        while running:
+            last = members[next_index - 1]
+            timeout = self._hedge_delay(last) if next_index < len(members) else None
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                start(members[next_index], hedged=True)
+                next_index += 1
+                continue
+
+            failed = False
+            for future in done:
+                member = running.pop(future)
+                try:
+                    vectors = self._accept(member, future.result())
+                except Exception as e:
+                    errors.append(e)
+                    failed = True
+                    continue
+                return vectors
+            if failed and next_index < len(members):
+                start(members[next_index], hedged=False)  # Fail over immediately
+                next_index += 1
+
+        raise errors[-1]
+
+    async def _race_async(self, items: List[str]) -> List[np.ndarray]:
+        members = self._active_members()
+        running: Dict[asyncio.Task, _Member] = {}
+        errors: List[Exception] = []
+
+        def start(member: _Member, hedged: bool) -> None:
+            self._count_start(member, hedged)
+            task = asyncio.ensure_future(self._timed_call_async(member, items))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())  # Losers' errors are counted, not raised
+            running[task] = member
+
+        start(members[0], hedged=False)
+        next_index = 1
+        while running:
+            last = members[next_index - 1]
+            timeout = self._hedge_delay(last) if next_index < len(members) else None
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                start(members[next_index], hedged=True)
+                next_index += 1
+                continue
+
+            failed = False
+            for task in done:
+                member = running.pop(task)
+                try:
+                    vectors = self._accept(member, task.result())
+                except Exception as e:
+                    errors.append(e)
+                    failed = True
+                    continue
+                return vectors
+            if failed and next_index < len(members):
+                start(members[next_index], hedged=False)
+                next_index += 1
+
+        raise errors[-1]
+
+    def _timed_call(self, member: _Member, items: List[str], batch_size: Optional[int]) -> List[np.ndarray]:
+        started = time.perf_counter()
+        try:
+            provider = member.provider
+            if batch_size is not None and provider.supports_batching:
+                vectors = provider.embed_batch(items, batch_size)
+            else:
+                vectors = provider.embed(items)
+        except Exception:
+            self._record(member, started, failed=True)
+            raise
+        self._record(member, started)
+        return vectors
+
+    async def _timed_call_async(self, member: _Member, items: List[str]) -> List[np.ndarray]:
+        started = time.perf_counter()
+        try:
+            vectors = await member.provider.embed_async(items)
+        except Exception:
+            self._record(member, started, failed=True)
+            raise
+        self._record(member, started)
+        return vectors
+
+    def _accept(self, member: _Member, vectors: List[np.ndarray]) -> List[np.ndarray]:
+        """Check a result's dimension against the chain's; disable a mismatching provider."""
+        dim = len(vectors[0])
+        with self._lock:
+            if self._dim is None:
+                self._dim = dim
+            if dim != self._dim:
+                member.disabled_reason = f"returned {dim}-dimensional vectors, expected {self._dim}"
+                member.errors += 1
+                print(f"⚠️  Embedding fallback: disabled {member.provider.model_name}: {member.disabled_reason}")
+                raise ValueError(f"{member.provider.model_name} {member.disabled_reason}")
+            member.wins += 1
+        return vectors
+
+    # -----------------------------------------------------------------------
+    # Statistics and hedge delay
+    # -----------------------------------------------------------------------
+
+    def _active_members(self) -> List[_Member]:
+        members = [member for member in self._members if member.disabled_reason is None]
+        return members or self._members[:1]
+
+    def _count_start(self, member: _Member, hedged: bool) -> None:
+        with self._lock:
+            member.calls += 1
+            if hedged:
+                member.hedged_calls += 1
+
+    def _record(self, member: _Member, started: float, failed: bool = False) -> None:
+        latency_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            if failed:
+                member.errors += 1
+            else:
+                member.histogram.observe(latency_ms)
+
+    def _hedge_delay(self, member: _Member) -> float:
+        """Seconds to wait on `member` before starting the next provider."""
+        with self._lock:
+            if len(member.histogram.recent) < self.min_samples:
+                return self.initial_hedge_delay
+            delay = member.histogram.percentile(self.hedge_percentile) / 1000
+        return min(self.max_hedge_delay, max(self.min_hedge_delay, delay))
+
+    def stats(self) -> dict:
+        """Hedging statistics and latency histograms per provider (per process)."""
+        providers = []
+        for member in self._members:
+            delay_ms = self._hedge_delay(member) * 1000
+            with self._lock:
+                providers.append({
+                    "type": member.provider.__class__.__name__,
+                    "model": member.provider.model_name,
+                    "calls": member.calls,
+                    "hedged_calls": member.hedged_calls,
+                    "wins": member.wins,
+                    "errors": member.errors,
+                    "disabled": member.disabled_reason,
+                    "latency_ms_p50": member.histogram.percentile(50),
+                    "latency_ms_p95": member.histogram.percentile(95),
+                    "hedge_delay_ms": delay_ms,
+                    "latency_histogram": member.histogram.buckets(),
+                })
+        return {"hedge_percentile": self.hedge_percentile, "providers": providers}
+
+    # -----------------------------------------------------------------------
+    # Delegation to the primary provider
+    # -----------------------------------------------------------------------
+
+    def cosine(self, a: np.ndarray, b: np.ndarray) -> float:
+        return self.provider.cosine(a, b)
+
+    def cosine_many(
+        self, query_vec: np.ndarray, doc_vecs: Iterable[np.ndarray], assume_normalized: bool = False
+    ) -> np.ndarray:
+        return self.provider.cosine_many(query_vec, doc_vecs, assume_normalized)
+
+    def warmup(self) -> None:
+        """Warm up every provider that supports it."""
+        for member in self._members:
+            warmup = getattr(member.provider, "warmup", None)
+            if callable(warmup):
+                warmup()
+
+    def close(self) -> None:
+        """Close the fallback providers (the primary is closed by its owner)."""
+        for member in self._members[1:]:
+            close = getattr(member.provider, "close", None)
+            if callable(close):
+                close()
+
+    @property
+    def providers(self) -> List[EmbeddingProvider]:
+        return [member.provider for member in self._members]
+
+    @property
+    def cache(self):
+        """The primary provider's cache (None if it has none)."""
+        return getattr(self.provider, "cache", None)
+
+    @property
+    def supports_batching(self) -> bool:
+        return self.provider.supports_batching
+
+    @property
+    def model_name(self) -> str:
+        return self.provider.model_name
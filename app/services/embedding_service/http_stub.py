@@ -0,0 +1,156 @@
+"""
+Local HTTP stand-in for remote embedding APIs.
+
+Serves the HuggingFace feature-extraction and OpenAI-style `/embeddings`
+protocols (the latter is what OpenRouter speaks) on 127.0.0.1 with
+deterministic vectors (the same as `StubProvider`), configurable latency and
+injected rate-limit/server errors, so the remote providers' batching,
+concurrency and retry logic can be tested and benchmarked without network
+access or API keys.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+from .providers.stub import StubProvider
+
+
+class EmbeddingHTTPStub:
+    """
+    In-process HTTP server imitating an embedding endpoint.
+
+    Features:
+    - Deterministic vectors (raw, not normalized) for any input text
+    - HuggingFace (`{"inputs": [...]}`) or OpenAI-style (`{"input": [...]}`)
+      requests, answered in the matching format with token usage
+    - Fixed per-request latency to model network and inference time
+    - The first `fail_first` requests answer `fail_status` (e.g. 429, 503)
+    - Counts requests and the highest number handled concurrently
+
+    Usage:
+        with EmbeddingHTTPStub(latency_ms=20) as stub:
+            hf = HuggingFaceProvider(base_url=stub.url, api_key="test")
+            openrouter = OpenRouterProvider(api_base=stub.url, api_key="test")
+    """
+
+    def __init__(
+        self,
+        dim: int = 384,
+        latency_ms: float = 0.0,
+        fail_first: int = 0,
+        fail_status: int = 503,
+        retry_after: Optional[float] = None,
+    ):
+        """
+        Initialize the stub (call `start()` or use it as a context manager).
+
+        Args:
+            dim: Embedding dimension
+            latency_ms: Delay before each response
+            fail_first: Number of initial requests answered with `fail_status`
+            fail_status: HTTP status of the injected failures
+            retry_after: Optional Retry-After header (seconds) on injected failures
+        """
+        self.latency = latency_ms / 1000
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+
+        self._embedder = StubProvider(dim=dim, normalize=False)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.requests = 0
+        self.failures = 0
+        self.max_concurrent = 0
+        self._active = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "EmbeddingHTTPStub":
+        """Start serving on a free local port."""
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="embedding-http-stub", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "EmbeddingHTTPStub":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _vectors(self, texts: List[str]) -> List[List[float]]:
+        return [vec.tolist() for vec in self._embedder.embed(list(texts))]
+
+    def _respond(self, body: dict):
+        """(status, headers, payload) for one request."""
+        with self._lock:
+            self.requests += 1
+            fail = self.requests <= self.fail_first
+            if fail:
+                self.failures += 1
+        if fail:
+            headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+            return self.fail_status, headers, {"error": "injected failure"}
+
+        openai_style = "input" in body
+        inputs = body.get("input") if openai_style else body.get("inputs")
+        texts = [inputs] if isinstance(inputs, str) else list(inputs or [])
+        vectors = self._vectors(texts)
+        if not openai_style:
+            return 200, {}, vectors
+
+        tokens = sum(len(text.split()) for text in texts)
+        return 200, {}, {
+            "object": "list",
+            "data": [{"object": "embedding", "index": i, "embedding": vec} for i, vec in enumerate(vectors)],
+            "model": body.get("model"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                with stub._lock:
+                    stub._active += 1
+                    stub.max_concurrent = max(stub.max_concurrent, stub._active)
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                    if stub.latency:
+                        time.sleep(stub.latency)
+                    status, headers, payload = stub._respond(body)
+                finally:
+                    with stub._lock:
+                        stub._active -= 1
+
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # Keep test and benchmark output clean
+
+        return Handler
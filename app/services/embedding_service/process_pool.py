@@ -0,0 +1,164 @@
+"""
+Process pool for bulk ONNX embedding jobs.
+
+A single ONNX Runtime session tokenizes and mean-pools on the Python side
+of one process, so embedding a large document or re-embedding a whole run
+is effectively single-core. The pool shards such jobs across worker
+processes, each owning its own tokenizer and inference session, and the
+workers write vectors straight into a shared-memory matrix so no vectors
+are pickled on the way back. Interactive calls keep using the in-process
+provider.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+# Provider owned by each worker process (created once by `_init_worker`)
+_worker_provider = None
+
+
+def _init_worker(config: dict) -> None:
+    global _worker_provider
+    from .providers.onnx import ONNXProvider
+
+    _worker_provider = ONNXProvider(**config)
+
+
+def _embed_shard(shm_name: str, shape: Tuple[int, int], dtype: str, start: int, texts: List[str]) -> int:
+    """Embed `texts` into rows `start:start + len(texts)` of the shared matrix."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        matrix = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        vectors = _worker_provider._embed_batch(texts)
+        matrix[start:start + len(texts)] = np.asarray(vectors, dtype=dtype)
+        del matrix  # Release the buffer export before closing
+    finally:
+        shm.close()
+    return len(texts)
+
+
+class ONNXProcessPool:
+    """
+    Shards bulk embedding jobs across ONNX worker processes.
+
+    Features:
+    - One tokenizer and inference session per worker (spawned, not forked,
+      so no ONNX Runtime or tokenizer threads are inherited)
+    - Inputs sorted by length before sharding, so each worker's length
+      buckets stay tightly padded
+    - Results returned through one shared-memory matrix per job
+    - Workers start lazily on the first job; a crashed pool is rebuilt on
+      the next one
+    """
+
+    def __init__(self, config: dict, dim: int, workers: int, shard_size: int = 256):
+        """
+        Initialize the pool (no processes are started yet).
+
+        Args:
+            config: ONNXProvider keyword arguments used to build each worker's provider
+            dim: Embedding dimension
+            workers: Number of worker processes
+            shard_size: Texts per task sent to a worker
+        """
+        self.config = config
+        self.dim = dim
+        self.workers = max(1, workers)
+        self.shard_size = max(1, shard_size)
+        self.dtype = np.dtype(config.get("dtype", np.float32))
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._jobs = 0
+        self._texts = 0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts across the worker processes.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Array of shape (len(texts), dim), in input order
+        """
+        if not texts:
+            return np.empty((0, self.dim), dtype=self.dtype)
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        ordered = [texts[i] for i in order]
+        shape = (len(texts), self.dim)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(texts) * self.dim * self.dtype.itemsize))
+        try:
+            executor = self._get_executor()
+            futures = [
+                executor.submit(_embed_shard, shm.name, shape, self.dtype.str, start, ordered[start:start + self.shard_size])
+                for start in range(0, len(ordered), self.shard_size)
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+                raise
+
+            shared = np.ndarray(shape, dtype=self.dtype, buffer=shm.buf)
+            result = np.empty(shape, dtype=self.dtype)
+            result[order] = shared
+            del shared
+        finally:
+            shm.close()
+            shm.unlink()
+
+        with self._lock:
+            self._jobs += 1
+            self._texts += len(texts)
+        return result
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.config,),
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self) -> None:
+        """Stop the worker processes (they restart on the next job)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        """Bulk embedding statistics (per process)."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self._executor is not None,
+                "jobs": self._jobs,
+                "texts": self._texts,
+            }
+
+
+def default_bulk_workers() -> int:
+    """Worker processes used when EMBEDDING_BULK_WORKERS is 0 (auto)."""
+    return max(1, min(4, os.cpu_count() or 1))
@@ -3,9 +3,11 @@
 from .huggingface import HuggingFaceProvider
 from .onnx import ONNXProvider
 from .openrouter import OpenRouterProvider
+from .stub import StubProvider
 
 __all__ = [
     "HuggingFaceProvider",
     "ONNXProvider", 
-    "OpenRouterProvider"
+    "OpenRouterProvider",
+    "StubProvider"
 ]
\ No newline at end of file
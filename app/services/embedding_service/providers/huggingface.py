@@ -5,14 +5,17 @@ Provides high-performance embedding generation with intelligent batching,
 caching, and normalization using the HuggingFace Inference API.
 """
 
+import asyncio
 import os
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Iterable
 import numpy as np
-from huggingface_hub import InferenceClient
 
 from ..base import BatchableProvider, TextInput, ArrayOrList, safe_cosine_similarity
-from ..cache import EmbeddingCache, NoOpCache, create_cache_key
+from ..cache import EmbeddingCache, NoOpCache, create_cache_keys
+from ..retry import RetryPolicy
+from ..similarity import cosine_scores
 
 
 class HuggingFaceProvider(BatchableProvider):
@@ -21,6 +24,9 @@ class HuggingFaceProvider(BatchableProvider):
     
     Features:
     - Intelligent batching to reduce API calls
+    - Up to `max_concurrency` batches in flight at once (thread pool for
+      sync calls, async client for async calls), reassembled in input order
+    - Retries on 429/5xx and connection errors with jittered exponential backoff
     - Thread-safe LRU caching with TTL support
     - L2 normalization for stable cosine similarity
     - Efficient vectorized operations for bulk similarity calculations
@@ -37,6 +43,10 @@ class HuggingFaceProvider(BatchableProvider):
         cache: Optional[EmbeddingCache] = None,
         dtype: np.dtype = np.float32,
         provider: str = "hf-inference",
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        retry_base_delay: float = 0.5,
+        base_url: Optional[str] = None,
     ):
         """
         Initialize HuggingFace embedding provider.
@@ -49,18 +59,32 @@ class HuggingFaceProvider(BatchableProvider):
             cache: Optional cache implementation
             dtype: NumPy data type for embeddings
             provider: Provider string for InferenceClient
+            max_concurrency: Maximum batch requests in flight at once
+            max_retries: Retries per batch on rate limits and transient errors
+            retry_base_delay: Backoff base in seconds (doubled per retry, with full jitter)
+            base_url: Custom endpoint (e.g. a dedicated Inference Endpoint or a local stub);
+                requests go there instead of the provider's URL for `model`
         """
         self._model = model
         self.normalize = normalize
         self.batch_size = max(1, batch_size)
         self.cache = cache or NoOpCache()
         self.dtype = dtype
+        self.max_concurrency = max(1, max_concurrency)
+        self.retry = RetryPolicy(max_retries=max(0, max_retries), base_delay=retry_base_delay)
 
-        self._client = InferenceClient(
-            provider=provider,
-            api_key=api_key or os.getenv("HF_TOKEN"),
-        )
-        self._lock = threading.RLock()
+        # With a base_url the endpoint already identifies the model
+        self._client_kwargs = {"api_key": api_key or os.getenv("HF_TOKEN")}
+        self._client_kwargs.update({"base_url": base_url} if base_url else {"provider": provider})
+        self._request_model = None if base_url else model
+        # Imported here: the inference clients pull in aiohttp and friends, which
+        # servers running another provider should not pay for at startup
+        from huggingface_hub import InferenceClient
+        self._client = InferenceClient(**self._client_kwargs)
+        self._async_client = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
 
     @property
     def model_name(self) -> str:
@@ -83,30 +107,49 @@ class HuggingFaceProvider(BatchableProvider):
         vectors = [None] * len(items)
         missing: List[tuple[int, str]] = []
         
-        for i, text in enumerate(items):
-            cached_vec = self._get_from_cache(text)
+        for i, (text, cached_vec) in enumerate(zip(items, self._get_many_from_cache(items))):
             if cached_vec is not None:
                 vectors[i] = cached_vec
             else:
                 missing.append((i, text))
 
-        # Compute missing embeddings in batches
-        for start in range(0, len(missing), self.batch_size):
-            chunk = missing[start : start + self.batch_size]
-            if not chunk:
-                continue
-            
-            indices, texts_batch = zip(*chunk)
-            embeddings = self._embed_batch(list(texts_batch))
-            
+        # Compute missing embeddings in concurrent batches
+        if missing:
+            indices, missing_texts = zip(*missing)
+            embeddings = self._embed_concurrently(list(missing_texts), self.batch_size)
             for idx, embedding in zip(indices, embeddings):
                 vectors[idx] = embedding
-                self._store_in_cache(items[idx], embedding)
+            self._store_many_in_cache(list(missing_texts), embeddings)
 
         # All vectors should be filled at this point
         result: List[np.ndarray] = vectors  # type: ignore
         return result[0] if single else result
 
+    async def embed_async(self, texts: TextInput) -> ArrayOrList:
+        """
+        Embed one or many texts with non-blocking HTTP calls.
+        
+        Args:
+            texts: Single string or list of strings to embed
+            
+        Returns:
+            Single numpy array for string input, list of arrays for list input
+        """
+        single = isinstance(texts, str)
+        items = [texts] if single else list(texts)
+
+        vectors = self._get_many_from_cache(items)
+        missing = [(i, text) for i, text in enumerate(items) if vectors[i] is None]
+
+        if missing:
+            indices, missing_texts = zip(*missing)
+            embeddings = await self._embed_concurrently_async(list(missing_texts))
+            for idx, embedding in zip(indices, embeddings):
+                vectors[idx] = embedding
+            self._store_many_in_cache(list(missing_texts), embeddings)
+
+        return vectors[0] if single else vectors
+
     def embed_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[np.ndarray]:
         """
         Embed a batch of texts with optional batch size override.
@@ -120,55 +163,81 @@ class HuggingFaceProvider(BatchableProvider):
         """
         if not texts:
             return []
-        
-        effective_batch_size = batch_size or self.batch_size
-        result = []
-        
-        for start in range(0, len(texts), effective_batch_size):
-            chunk = texts[start:start + effective_batch_size]
-            chunk_embeddings = self._embed_batch(chunk)
-            result.extend(chunk_embeddings)
-        
-        return result
+        return self._embed_concurrently(list(texts), batch_size or self.batch_size)
+
+    def close(self) -> None:
+        """Stop the batch dispatch threads (they restart on the next call)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
 
     def cosine(self, a: np.ndarray, b: np.ndarray) -> float:
         """Calculate cosine similarity between two vectors."""
         return safe_cosine_similarity(a, b)
 
-    def cosine_many(self, query_vec: np.ndarray, doc_vecs: Iterable[np.ndarray]) -> np.ndarray:
+    def cosine_many(
+        self, query_vec: np.ndarray, doc_vecs: Iterable[np.ndarray], assume_normalized: bool = False
+    ) -> np.ndarray:
         """
-        Calculate cosine similarities between a query vector and multiple document vectors.
+        Calculate cosine similarities between a query vector (or matrix) and multiple document vectors.
         
-        Optimized vectorized implementation for bulk similarity calculations.
+        Delegates to the shared similarity kernel. The vectors come from the caller, so
+        they are normalized unless `assume_normalized` says they already are.
         """
-        Q = query_vec
-        if not np.isclose(np.linalg.norm(Q), 1.0, atol=1e-3):
-            norm = np.linalg.norm(Q)
-            Q = Q / norm if norm > 0 else Q
-
-        # Stack and normalize document vectors if needed
-        if isinstance(doc_vecs, np.ndarray) and doc_vecs.ndim == 2:
-            D = doc_vecs
+        return cosine_scores(query_vec, doc_vecs, assume_normalized=assume_normalized).astype(self.dtype, copy=False)
+
+    def _get_many_from_cache(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Retrieve embeddings from cache in one batched lookup."""
+        return self.cache.get_many(create_cache_keys(self.model_name, texts))
+
+    def _store_many_in_cache(self, texts: List[str], vecs: List[np.ndarray]) -> None:
+        """Store embeddings in cache in one batched write."""
+        self.cache.set_many(create_cache_keys(self.model_name, texts), vecs)
+
+    def _embed_concurrently(self, texts: List[str], batch_size: int) -> List[np.ndarray]:
+        """Split texts into batches, send up to `max_concurrency` at once and reassemble in order."""
+        batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+        if len(batches) <= 1 or self.max_concurrency == 1:
+            results = [self._embed_batch(batch) for batch in batches]
         else:
-            D = np.vstack([d for d in doc_vecs])
-        
-        norms = np.linalg.norm(D, axis=1, keepdims=True)
-        need_norm = np.any(np.abs(norms - 1.0) > 1e-3)
-        if need_norm:
-            nonzero_mask = norms.flatten() != 0
-            D[nonzero_mask] = D[nonzero_mask] / norms[nonzero_mask]
-        
-        return (D @ Q).astype(self.dtype)
+            results = list(self._get_executor().map(self._embed_batch, batches))  # map preserves order
+        return [vec for batch_vectors in results for vec in batch_vectors]
+
+    async def _embed_concurrently_async(self, texts: List[str]) -> List[np.ndarray]:
+        """Async version of `_embed_concurrently()`, bounded by a semaphore."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        client = self._get_async_client()
+
+        async def embed_one(batch: List[str]) -> List[np.ndarray]:
+            async with semaphore:
+                api_output = await self.retry.call_async(
+                    lambda: client.feature_extraction(batch, model=self._request_model)
+                )
+            return self._to_vectors(api_output)
+
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        results = await asyncio.gather(*(embed_one(batch) for batch in batches))  # Results in batch order
+        return [vec for batch_vectors in results for vec in batch_vectors]
 
-    def _get_from_cache(self, text: str) -> Optional[np.ndarray]:
-        """Retrieve embedding from cache."""
-        cache_key = create_cache_key(self._model, text)
-        return self.cache.get(cache_key)
+    def _get_async_client(self) -> "AsyncInferenceClient":
+        """Async client for the running event loop (its HTTP session cannot be shared across loops)."""
+        from huggingface_hub import AsyncInferenceClient
 
-    def _store_in_cache(self, text: str, vec: np.ndarray) -> None:
-        """Store embedding in cache."""
-        cache_key = create_cache_key(self._model, text)
-        self.cache.set(cache_key, vec)
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_client = AsyncInferenceClient(**self._client_kwargs)
+            self._async_loop = loop
+        return self._async_client
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the pool that sends concurrent sync batches."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="hf-embedding"
+                )
+            return self._executor
 
     def _embed_batch(self, texts: List[str]) -> List[np.ndarray]:
         """
@@ -180,10 +249,14 @@ class HuggingFaceProvider(BatchableProvider):
         Returns:
             List of embedding arrays
         """
-        # Single API call for the whole batch
-        with self._lock:
-            api_output = self._client.feature_extraction(texts, model=self._model)
+        # Single API call for the whole batch, retried on rate limits and transient errors
+        api_output = self.retry.call(
+            lambda: self._client.feature_extraction(texts, model=self._request_model)
+        )
+        return self._to_vectors(api_output)
 
+    def _to_vectors(self, api_output) -> List[np.ndarray]:
+        """Convert a feature-extraction response into (normalized) embedding arrays."""
         # Normalize HuggingFace API output format
         if api_output is not None and len(api_output) > 0 and isinstance(api_output[0], (float, int)):
             # Single embedding returned as flat list
@@ -5,31 +5,96 @@ Wraps the existing ONNX implementation with the new provider interface
 and adds caching support for improved performance.
 """
 
+import hashlib
 import os
-from typing import List, Optional, Iterable
+import tempfile
+import threading
+from typing import Dict, List, Optional, Iterable, Sequence, Tuple
 import numpy as np
 
-from ..base import EmbeddingProvider, TextInput, ArrayOrList, safe_cosine_similarity
-from ..cache import EmbeddingCache, NoOpCache, create_cache_key
+from ..base import BatchableProvider, TextInput, ArrayOrList, safe_cosine_similarity
+from ..cache import EmbeddingCache, NoOpCache, create_cache_keys
+from ..similarity import cosine_scores
 
 
-class ONNXProvider(EmbeddingProvider):
+# Model file for each exported precision variant (see `setup_onnx_model`)
+MODEL_VARIANT_FILES = {
+    "fp32": "model.onnx",
+    "int8": "model_int8.onnx",  # Dynamically quantized weights, INT8 matmuls
+    "fp16": "model_fp16.onnx",  # FP16 weights, FP32 inputs/outputs
+}
+
+TOKENIZER_BACKENDS = ("auto", "tokenizers", "transformers")
+
+
+class _InputBuffers(threading.local):
+    """
+    Per-thread int64 input buffers reused across inference calls.
+
+    Each bucket gets contiguous `(n, seq_len)` views over the front of flat
+    arrays sized for a full batch at `max_length`, so no input arrays are
+    allocated per batch. Buffers are per thread because the provider is
+    called concurrently (executor, micro-batcher).
+    """
+
+    def __init__(self, capacity: int):
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.attention_mask = np.empty(capacity, dtype=np.int64)
+        self.token_type_ids = np.empty(capacity, dtype=np.int64)
+
+    def views(self, n: int, seq_len: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        size = n * seq_len
+        if size > self.capacity:
+            # Only reached when a call overrides batch_size above the configured one
+            self._allocate(size)
+        return tuple(buf[:size].reshape(n, seq_len) for buf in (self.ids, self.attention_mask, self.token_type_ids))
+
+
+class ONNXProvider(BatchableProvider):
     """
     ONNX-optimized sentence encoder for lightweight local inference.
     
     Features:
     - Local inference with no external API dependencies
     - Intelligent caching to avoid redundant computations
+    - Length-bucketed batching: inputs are sorted by token length and split
+      into batches padded only to their own longest sequence
+    - Rust `tokenizers` fast path (loads `tokenizer.json` directly, truncation
+      configured once) and per-thread preallocated int64 input buffers
     - Efficient mean pooling for sentence embeddings
+    - Tunable ONNX Runtime session (threads, graph optimization, memory arena,
+      execution mode) with an on-disk cache of the optimized graph
     - Thread-safe operations
     """
 
+    # Graph optimization levels accepted by `graph_optimization`
+    _OPTIMIZATION_LEVELS = {
+        "disable": "ORT_DISABLE_ALL",
+        "basic": "ORT_ENABLE_BASIC",
+        "extended": "ORT_ENABLE_EXTENDED",
+        "all": "ORT_ENABLE_ALL",
+    }
+
     def __init__(
         self,
         model_dir: str = "./onnx-model",
         cache: Optional[EmbeddingCache] = None,
         normalize: bool = True,
-        dtype: np.dtype = np.float32
+        dtype: np.dtype = np.float32,
+        batch_size: int = 32,
+        max_length: int = 256,
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: Optional[int] = None,
+        graph_optimization: str = "all",
+        execution_mode: str = "sequential",
+        enable_mem_arena: bool = True,
+        optimized_model_dir: Optional[str] = None,
+        variant: str = "fp32",
+        tokenizer_backend: str = "auto"
     ):
         """
         Initialize ONNX embedding provider.
@@ -39,35 +104,248 @@ class ONNXProvider(EmbeddingProvider):
             cache: Optional cache implementation
             normalize: Whether to L2-normalize embeddings
             dtype: NumPy data type for embeddings
+            batch_size: Maximum number of sequences per inference call
+            max_length: Maximum tokens per text (longer texts are truncated)
+            intra_op_threads: Threads used inside an operator (None/0: ONNX Runtime default, one per core)
+            inter_op_threads: Threads used across operators (only with parallel execution mode)
+            graph_optimization: Graph optimization level: 'disable', 'basic', 'extended' or 'all'
+            execution_mode: 'sequential' or 'parallel' operator execution
+            enable_mem_arena: Whether to use the CPU memory arena (faster, keeps peak memory reserved)
+            optimized_model_dir: Directory where the optimized graph is cached; None disables caching
+            variant: Model precision variant: 'fp32', 'int8' or 'fp16'
+            tokenizer_backend: 'tokenizers' (Rust fast path, needs tokenizer.json),
+                'transformers' (AutoTokenizer) or 'auto' (fast path when available)
         """
         try:
             import onnxruntime as ort
-            from transformers import AutoTokenizer
         except ImportError:
-            raise ImportError(
-                "ONNX provider requires onnxruntime and transformers. "
-                "Install with: pip install onnxruntime transformers"
-            )
+            raise ImportError("ONNX provider requires onnxruntime. Install with: pip install onnxruntime")
         
         self.model_dir = model_dir
         self.cache = cache or NoOpCache()
         self.normalize = normalize
         self.dtype = dtype
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length
+        
+        if graph_optimization not in self._OPTIMIZATION_LEVELS:
+            raise ValueError(
+                f"Unknown graph_optimization '{graph_optimization}'. "
+                f"Choose from: {', '.join(self._OPTIMIZATION_LEVELS)}"
+            )
+        if variant not in MODEL_VARIANT_FILES:
+            raise ValueError(f"Unknown model variant '{variant}'. Choose from: {', '.join(MODEL_VARIANT_FILES)}")
+        model_path = os.path.join(model_dir, MODEL_VARIANT_FILES[variant])
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"ONNX model variant '{variant}' not found at {model_path}. "
+                f"Export it with: python scripts/setup_onnx_model.py --variants {variant}"
+            )
+        self.variant = variant
+        
+        if execution_mode not in ("sequential", "parallel"):
+            raise ValueError(f"Unknown execution_mode '{execution_mode}'. Choose 'sequential' or 'parallel'")
+        if tokenizer_backend not in TOKENIZER_BACKENDS:
+            raise ValueError(
+                f"Unknown tokenizer_backend '{tokenizer_backend}'. Choose from: {', '.join(TOKENIZER_BACKENDS)}"
+            )
         
         # Initialize tokenizer and ONNX session
-        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
-        self.session = ort.InferenceSession(
-            os.path.join(model_dir, "model.onnx"),
-            providers=["CPUExecutionProvider"]
+        self.tokenizer = None
+        self._fast_tokenizer = None
+        self._pad_token_id = self._load_tokenizer(tokenizer_backend)
+        self.session = self._create_session(
+            ort,
+            model_path,
+            intra_op_threads=intra_op_threads,
+            inter_op_threads=inter_op_threads,
+            graph_optimization=graph_optimization,
+            execution_mode=execution_mode,
+            enable_mem_arena=enable_mem_arena,
+            optimized_model_dir=optimized_model_dir,
         )
+        self._input_names = [node.name for node in self.session.get_inputs()]
+        self._needs_token_types = "token_type_ids" in self._input_names
+        self._buffers = _InputBuffers(self.batch_size * self.max_length)
+        self._embedding_dim: Optional[int] = None
+        
+        # Everything but the cache and thread counts, for bulk worker processes
+        self._worker_config = {
+            "model_dir": model_dir,
+            "normalize": normalize,
+            "dtype": dtype,
+            "batch_size": self.batch_size,
+            "max_length": max_length,
+            "graph_optimization": graph_optimization,
+            "execution_mode": execution_mode,
+            "enable_mem_arena": enable_mem_arena,
+            "optimized_model_dir": optimized_model_dir,
+            "variant": variant,
+            "tokenizer_backend": tokenizer_backend,
+        }
+
+    def _load_tokenizer(self, backend: str) -> int:
+        """
+        Load the tokenizer for `backend` and return the padding token id.
+        
+        The fast path loads `tokenizer.json` with the Rust `tokenizers` library
+        and configures truncation once; padding is disabled because each length
+        bucket is padded into the input buffers instead.
+        """
+        tokenizer_path = os.path.join(self.model_dir, "tokenizer.json")
+        if backend != "transformers":
+            try:
+                from tokenizers import Tokenizer
+            except ImportError:
+                if backend == "tokenizers":
+                    raise ImportError("tokenizer_backend='tokenizers' requires: pip install tokenizers")
+                Tokenizer = None
+            if Tokenizer is not None and os.path.exists(tokenizer_path):
+                tokenizer = Tokenizer.from_file(tokenizer_path)
+                pad_id = (tokenizer.padding or {}).get("pad_id", 0)
+                tokenizer.no_padding()
+                tokenizer.enable_truncation(max_length=self.max_length)
+                self._fast_tokenizer = tokenizer
+                # encode_batch_fast (tokenizers >= 0.21) skips the unused character offsets
+                self._encode_batch = getattr(tokenizer, "encode_batch_fast", tokenizer.encode_batch)
+                return pad_id
+            if backend == "tokenizers":
+                raise FileNotFoundError(f"tokenizer_backend='tokenizers' needs {tokenizer_path}")
+
+        try:
+            from transformers import AutoTokenizer
+        except ImportError:
+            raise ImportError(
+                "ONNX provider requires onnxruntime and transformers (or tokenizers with a tokenizer.json). "
+                "Install with: pip install onnxruntime transformers"
+            )
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+        return self.tokenizer.pad_token_id or 0
 
     @property
-    def supports_batching(self) -> bool:
-        return False  # ONNX provider doesn't implement special batching logic
+    def tokenizer_backend(self) -> str:
+        """Tokenizer actually in use: 'tokenizers' or 'transformers'."""
+        return "tokenizers" if self._fast_tokenizer is not None else "transformers"
+
+    def tokenize(self, texts: List[str]) -> Tuple[List[Sequence[int]], Optional[List[Sequence[int]]]]:
+        """
+        Tokenize texts with truncation and without padding.
+        
+        Args:
+            texts: List of texts
+            
+        Returns:
+            Tuple of token ids per text and token type ids per text (None when
+            the model takes no `token_type_ids` input)
+        """
+        if self._fast_tokenizer is not None:
+            encodings = self._encode_batch(texts)
+            input_ids = [encoding.ids for encoding in encodings]
+            type_ids = [encoding.type_ids for encoding in encodings] if self._needs_token_types else None
+            return input_ids, type_ids
+
+        encoded = self.tokenizer(
+            texts,
+            padding=False,
+            truncation=True,
+            max_length=self.max_length,
+            return_token_type_ids=self._needs_token_types,
+            return_attention_mask=False,
+        )
+        return encoded["input_ids"], encoded.get("token_type_ids") if self._needs_token_types else None
+
+    def _create_session(
+        self,
+        ort,
+        model_path: str,
+        intra_op_threads: Optional[int],
+        inter_op_threads: Optional[int],
+        graph_optimization: str,
+        execution_mode: str,
+        enable_mem_arena: bool,
+        optimized_model_dir: Optional[str],
+    ):
+        """
+        Build the inference session, reusing a previously optimized graph when cached.
+        
+        The cache file name includes a fingerprint of the source model, the
+        optimization level and the ONNX Runtime version, so a stale graph is
+        never loaded after any of them changes.
+        """
+        options = ort.SessionOptions()
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        if inter_op_threads:
+            options.inter_op_num_threads = inter_op_threads
+        options.execution_mode = (
+            ort.ExecutionMode.ORT_PARALLEL if execution_mode == "parallel" else ort.ExecutionMode.ORT_SEQUENTIAL
+        )
+        options.enable_cpu_mem_arena = enable_mem_arena
+        level = getattr(ort.GraphOptimizationLevel, self._OPTIMIZATION_LEVELS[graph_optimization])
+        options.graph_optimization_level = level
+
+        providers = ["CPUExecutionProvider"]
+        if not optimized_model_dir or graph_optimization == "disable":
+            return ort.InferenceSession(model_path, sess_options=options, providers=providers)
+
+        stat = os.stat(model_path)
+        fingerprint = hashlib.blake2b(
+            f"{os.path.abspath(model_path)}:{stat.st_size}:{stat.st_mtime_ns}:{graph_optimization}:{ort.__version__}".encode("utf-8"),
+            digest_size=8,
+        ).hexdigest()
+        model_stem = os.path.splitext(os.path.basename(model_path))[0]
+        cached_path = os.path.join(optimized_model_dir, f"{model_stem}.{graph_optimization}.{fingerprint}.onnx")
+
+        if os.path.exists(cached_path):
+            # Already optimized: skip graph optimization on load
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+            return ort.InferenceSession(cached_path, sess_options=options, providers=providers)
+
+        # Optimize once and persist the result atomically for the next start
+        try:
+            os.makedirs(optimized_model_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix=".onnx", dir=optimized_model_dir)
+            os.close(fd)
+            options.optimized_model_filepath = tmp_path
+            session = ort.InferenceSession(model_path, sess_options=options, providers=providers)
+            os.replace(tmp_path, cached_path)
+            return session
+        except OSError as e:
+            print(f"⚠️  Could not cache optimized ONNX graph in {optimized_model_dir}: {e}")
+            options.optimized_model_filepath = ""
+            return ort.InferenceSession(model_path, sess_options=options, providers=providers)
+
+    def warmup(self) -> None:
+        """
+        Run throwaway inferences (short and full-length) so session initialization
+        and memory arena growth are not paid by the first real request.
+        """
+        self._embed_batch(["warm-up"], 1)
+        self._embed_batch([" ".join(["warm-up"] * self.max_length)], 1)
+
+    def worker_config(self, intra_op_threads: int = 1) -> dict:
+        """
+        Keyword arguments that rebuild this provider (without a cache) in a worker process.
+        
+        Args:
+            intra_op_threads: ONNX Runtime threads for the worker's session
+        """
+        return {**self._worker_config, "intra_op_threads": intra_op_threads}
+
+    @property
+    def embedding_dim(self) -> int:
+        """Embedding dimension, from the model's output shape (or one probe inference)."""
+        if self._embedding_dim is None:
+            dim = self.session.get_outputs()[0].shape[-1]
+            self._embedding_dim = dim if isinstance(dim, int) else len(self._embed_batch(["dimension probe"])[0])
+        return self._embedding_dim
 
     @property 
     def model_name(self) -> str:
-        return f"onnx:{self.model_dir}"
+        # Variants produce different vectors, so they must not share cache keys
+        if self.variant == "fp32":
+            return f"onnx:{self.model_dir}"
+        return f"onnx:{self.model_dir}:{self.variant}"
 
     def embed(self, texts: TextInput) -> ArrayOrList:
         """
@@ -81,14 +359,30 @@ class ONNXProvider(EmbeddingProvider):
         """
         single = isinstance(texts, str)
         items = [texts] if single else list(texts)
+        result = self._embed_with_cache(items, self.batch_size)
+        return result[0] if single else result
+
+    def embed_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[np.ndarray]:
+        """
+        Embed a list of texts with length-bucketed batching.
+        
+        Args:
+            texts: List of texts to embed
+            batch_size: Optional override of the number of sequences per inference call
+            
+        Returns:
+            List of embedding arrays, in input order
+        """
+        return self._embed_with_cache(list(texts), batch_size or self.batch_size)
 
+    def _embed_with_cache(self, items: List[str], batch_size: int) -> List[np.ndarray]:
+        """Serve cached embeddings and compute the missing ones in length buckets."""
         # Check cache for each item
         vectors = []
         missing_indices = []
         missing_texts = []
         
-        for i, text in enumerate(items):
-            cached_vec = self._get_from_cache(text)
+        for i, (text, cached_vec) in enumerate(zip(items, self._get_many_from_cache(items))):
             if cached_vec is not None:
                 vectors.append(cached_vec)
             else:
@@ -98,102 +392,114 @@ class ONNXProvider(EmbeddingProvider):
 
         # Compute missing embeddings
         if missing_texts:
-            computed_embeddings = self._embed_batch(missing_texts)
+            computed_embeddings = self._embed_batch(missing_texts, batch_size)
             for idx, embedding in zip(missing_indices, computed_embeddings):
                 vectors[idx] = embedding
-                self._store_in_cache(items[idx], embedding)
+            self._store_many_in_cache(missing_texts, computed_embeddings)
 
         # All vectors should be filled now
-        result: List[np.ndarray] = vectors  # type: ignore
-        return result[0] if single else result
+        return vectors  # type: ignore
 
     def cosine(self, a: np.ndarray, b: np.ndarray) -> float:
         """Calculate cosine similarity between two vectors."""
         return safe_cosine_similarity(a, b)
 
-    def cosine_many(self, query_vec: np.ndarray, doc_vecs: Iterable[np.ndarray]) -> np.ndarray:
-        """
-        Calculate cosine similarities between a query vector and multiple document vectors.
+    def cosine_many(
+        self, query_vec: np.ndarray, doc_vecs: Iterable[np.ndarray], assume_normalized: bool = False
+    ) -> np.ndarray:
         """
-        Q = query_vec
-        if not np.isclose(np.linalg.norm(Q), 1.0, atol=1e-3):
-            norm = np.linalg.norm(Q)
-            Q = Q / norm if norm > 0 else Q
-
-        # Stack and normalize document vectors if needed
-        if isinstance(doc_vecs, np.ndarray) and doc_vecs.ndim == 2:
-            D = doc_vecs
-        else:
-            D = np.vstack([d for d in doc_vecs])
-        
-        norms = np.linalg.norm(D, axis=1, keepdims=True)
-        need_norm = np.any(np.abs(norms - 1.0) > 1e-3)
-        if need_norm:
-            nonzero_mask = norms.flatten() != 0
-            D[nonzero_mask] = D[nonzero_mask] / norms[nonzero_mask]
+        Calculate cosine similarities between a query vector (or matrix) and multiple document vectors.
         
-        return (D @ Q).astype(self.dtype)
+        Delegates to the shared similarity kernel. The vectors come from the caller, so
+        they are normalized unless `assume_normalized` says they already are.
+        """
+        return cosine_scores(query_vec, doc_vecs, assume_normalized=assume_normalized).astype(self.dtype, copy=False)
 
-    def _get_from_cache(self, text: str) -> Optional[np.ndarray]:
-        """Retrieve embedding from cache."""
-        cache_key = create_cache_key(self.model_name, text)
-        return self.cache.get(cache_key)
+    def _get_many_from_cache(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Retrieve embeddings from cache in one batched lookup."""
+        return self.cache.get_many(create_cache_keys(self.model_name, texts))
 
-    def _store_in_cache(self, text: str, vec: np.ndarray) -> None:
-        """Store embedding in cache."""
-        cache_key = create_cache_key(self.model_name, text)
-        self.cache.set(cache_key, vec)
+    def _store_many_in_cache(self, texts: List[str], vecs: List[np.ndarray]) -> None:
+        """Store embeddings in cache in one batched write."""
+        self.cache.set_many(create_cache_keys(self.model_name, texts), vecs)
 
-    def _embed_batch(self, texts: List[str]) -> List[np.ndarray]:
+    def _embed_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[np.ndarray]:
         """
-        Perform ONNX inference on a batch of texts.
+        Perform ONNX inference on texts using length-bucketed batches.
+        
+        Texts are tokenized once without padding, sorted by token length and
+        split into batches of `batch_size`; each batch is padded only to its own
+        longest sequence. Results are scattered back into input order.
         
         Args:
             texts: List of texts to embed
+            batch_size: Maximum sequences per inference call
             
         Returns:
-            List of embedding arrays
+            List of embedding arrays, in input order
         """
         if not texts:
             return []
 
-        # Tokenize all texts
-        encoded = self.tokenizer(
-            texts, 
-            return_tensors="np", 
-            padding=True, 
-            truncation=True, 
-            max_length=256
-        )
-        
+        batch_size = batch_size or self.batch_size
+
+        # Tokenize all texts once, without padding
+        input_ids, type_ids = self.tokenize(texts)
+        lengths = np.fromiter((len(ids) for ids in input_ids), dtype=np.int64, count=len(texts))
+
+        # Sort by length so each bucket holds similarly sized sequences
+        order = np.argsort(lengths, kind="stable")
+        result: List[Optional[np.ndarray]] = [None] * len(texts)
+
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            pooled = self._run_bucket(input_ids, type_ids, bucket, lengths, int(lengths[bucket].max()))
+            for idx, embedding in zip(bucket, pooled):
+                result[idx] = embedding
+
+        return result  # type: ignore
+
+    def _run_bucket(
+        self,
+        input_ids: List[Sequence[int]],
+        type_ids: Optional[List[Sequence[int]]],
+        bucket: np.ndarray,
+        lengths: np.ndarray,
+        seq_len: int,
+    ) -> List[np.ndarray]:
+        """Pad one bucket into the reused input buffers, run inference and mean-pool."""
+        n = len(bucket)
+        ids, attention_mask, token_type_ids = self._buffers.views(n, seq_len)
+        ids.fill(self._pad_token_id)
+        attention_mask.fill(0)
+        token_type_ids.fill(0)
+
+        for row, idx in enumerate(bucket):
+            length = lengths[idx]
+            ids[row, :length] = input_ids[idx]
+            attention_mask[row, :length] = 1
+            if type_ids is not None:
+                token_type_ids[row, :length] = type_ids[idx]
+
         # Prepare inputs for ONNX model
-        input_feed = {}
-        for input_node in self.session.get_inputs():
-            input_name = input_node.name
-            if input_name in encoded:
-                input_feed[input_name] = encoded[input_name]
+        available: Dict[str, np.ndarray] = {
+            "input_ids": ids,
+            "attention_mask": attention_mask,
+            "token_type_ids": token_type_ids,
+        }
+        input_feed = {name: available[name] for name in self._input_names if name in available}
         
         # Run ONNX inference
         outputs = self.session.run(None, input_feed)[0]
         
-        # Apply mean pooling using attention mask
-        attention_mask = encoded["attention_mask"]
-        
-        # Mean pooling: sum embeddings and divide by attention mask sum
-        masked_embeddings = outputs * np.expand_dims(attention_mask, axis=-1)
-        summed = np.sum(masked_embeddings, axis=1)
-        counts = np.sum(attention_mask, axis=1, keepdims=True)
-        counts = np.maximum(counts, 1)  # Avoid division by zero
-        
-        mean_pooled = summed / counts
+        # Mean pooling as one batched matmul with the mask (no masked (n, seq_len, dim) copy)
+        weights = attention_mask.astype(np.float32)
+        summed = np.matmul(weights[:, None, :], outputs)[:, 0]
+        counts = np.maximum(weights.sum(axis=1, keepdims=True), 1)  # Avoid division by zero
+        mean_pooled = (summed / counts).astype(self.dtype, copy=False)
         
-        result = []
-        for embedding in mean_pooled:
-            arr = embedding.astype(self.dtype)
-            if self.normalize:
-                norm = np.linalg.norm(arr)
-                if norm > 0:
-                    arr = arr / norm
-            result.append(arr)
+        if self.normalize:
+            norms = np.linalg.norm(mean_pooled, axis=1, keepdims=True)
+            mean_pooled = mean_pooled / np.where(norms > 0, norms, 1)
         
-        return result
\ No newline at end of file
+        return list(mean_pooled)
@@ -1,37 +1,59 @@
 """
-OpenRouter embedding provider using DSPy integration.
+OpenRouter embedding provider.
 
-Wraps the existing DSPy OpenRouter implementation with the new provider interface
-and adds caching support.
+Calls OpenRouter's OpenAI-compatible embeddings endpoint with the OpenAI
+client, so each response's token usage is available, and adds caching,
+chunking, concurrency and retries.
 """
 
+import asyncio
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Iterable
 import numpy as np
-import dspy
+from openai import AsyncOpenAI, OpenAI
 
 from ..base import EmbeddingProvider, TextInput, ArrayOrList, safe_cosine_similarity
-from ..cache import EmbeddingCache, NoOpCache, create_cache_key
+from ..cache import EmbeddingCache, NoOpCache, create_cache_keys
+from ..retry import RetryPolicy
+from ..similarity import cosine_scores
 
 
 class OpenRouterProvider(EmbeddingProvider):
     """
-    OpenRouter embedding provider using DSPy's embedder abstraction.
+    OpenRouter embedding provider.
     
     Features:
-    - Integration with OpenRouter's API through DSPy
+    - Integration with OpenRouter's OpenAI-compatible embeddings API
     - Intelligent caching to reduce API costs
     - Support for various OpenRouter embedding models
+    - Requests chunked to `batch_size` texts, up to `max_concurrency` in flight,
+      results reassembled in input order
+    - Retries on 429/5xx and connection errors with jittered exponential backoff
+    - Resumable: each completed chunk is cached immediately, so a failed chunk
+      does not discard the others and a repeated call only sends what is missing
+    - Per-call latency and token usage statistics
     - Thread-safe operations
     """
 
+    # Key of this provider's section in EmbeddingService.cache_stats()
+    stats_key = "openrouter"
+
     def __init__(
         self,
         model_name: str = "openai/text-embedding-3-small",
         api_key: Optional[str] = None,
         cache: Optional[EmbeddingCache] = None,
         normalize: bool = True,
-        dtype: np.dtype = np.float32
+        dtype: np.dtype = np.float32,
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        retry_base_delay: float = 0.5,
+        api_base: str = "https://openrouter.ai/api/v1",
     ):
         """
         Initialize OpenRouter embedding provider.
@@ -42,6 +64,11 @@ class OpenRouterProvider(EmbeddingProvider):
             cache: Optional cache implementation
             normalize: Whether to L2-normalize embeddings
             dtype: NumPy data type for embeddings
+            batch_size: Maximum texts per API request
+            max_concurrency: Maximum requests in flight at once
+            max_retries: Retries per request on rate limits and transient errors
+            retry_base_delay: Backoff base in seconds (doubled per retry, with full jitter)
+            api_base: OpenAI-compatible API base URL
         """
         self._model_name = model_name
         self.cache = cache or NoOpCache()
@@ -52,16 +79,28 @@ class OpenRouterProvider(EmbeddingProvider):
         if not self.api_key:
             raise ValueError("OpenRouter API key is required")
         
-        # Initialize DSPy embedder for OpenRouter
-        self.embedder = dspy.Embedder(
-            model=self._model_name,
-            api_base="https://openrouter.ai/api/v1",
-            api_key=self.api_key
-        )
+        self.api_base = api_base
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.retry = RetryPolicy(max_retries=max(0, max_retries), base_delay=retry_base_delay)
+        # SDK retries off: self.retry is the only retry layer
+        self._client = OpenAI(base_url=api_base, api_key=self.api_key, max_retries=0)
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Per-call statistics (latency of recent calls, running totals)
+        self._latencies_ms: "deque[float]" = deque(maxlen=1000)
+        self._requests = 0
+        self._failed_requests = 0
+        self._texts = 0
+        self._prompt_tokens = 0
+        self._total_tokens = 0
 
     @property
     def supports_batching(self) -> bool:
-        return False  # DSPy embedder doesn't expose batch interface
+        return True
 
     @property
     def model_name(self) -> str:
@@ -85,8 +124,7 @@ class OpenRouterProvider(EmbeddingProvider):
         missing_indices = []
         missing_texts = []
         
-        for i, text in enumerate(items):
-            cached_vec = self._get_from_cache(text)
+        for i, (text, cached_vec) in enumerate(zip(items, self._get_many_from_cache(items))):
             if cached_vec is not None:
                 vectors.append(cached_vec)
             else:
@@ -94,70 +132,226 @@ class OpenRouterProvider(EmbeddingProvider):
                 missing_indices.append(i)
                 missing_texts.append(text)
 
-        # Compute missing embeddings
+        # Compute missing embeddings (each chunk is cached as soon as it completes)
         if missing_texts:
             computed_embeddings = self._embed_batch(missing_texts)
             for idx, embedding in zip(missing_indices, computed_embeddings):
                 vectors[idx] = embedding
-                self._store_in_cache(items[idx], embedding)
 
         # All vectors should be filled now
         result: List[np.ndarray] = vectors  # type: ignore
         return result[0] if single else result
 
+    async def embed_async(self, texts: TextInput) -> ArrayOrList:
+        """
+        Embed one or many texts with non-blocking OpenRouter calls.
+        
+        Args:
+            texts: Single string or list of strings to embed
+            
+        Returns:
+            Single numpy array for string input, list of arrays for list input
+        """
+        single = isinstance(texts, str)
+        items = [texts] if single else list(texts)
+
+        vectors = self._get_many_from_cache(items)
+        missing_indices = [i for i, vec in enumerate(vectors) if vec is None]
+        missing_texts = [items[i] for i in missing_indices]
+
+        if missing_texts:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def embed_chunk(chunk: List[str]) -> List[np.ndarray]:
+                async with semaphore:
+                    return await self._request_async(chunk)
+
+            chunks = self._chunks(missing_texts, self.batch_size)
+            results = await asyncio.gather(*(embed_chunk(chunk) for chunk in chunks), return_exceptions=True)
+            computed_embeddings = self._collect(chunks, results)
+            for idx, embedding in zip(missing_indices, computed_embeddings):
+                vectors[idx] = embedding
+
+        return vectors[0] if single else vectors
+
+    def embed_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[np.ndarray]:
+        """
+        Embed a list of texts with optional request size override.
+        
+        Args:
+            texts: List of texts to embed
+            batch_size: Optional override of the texts per API request
+            
+        Returns:
+            List of embedding arrays, in input order
+        """
+        texts = list(texts)
+        vectors = self._get_many_from_cache(texts)
+        missing_indices = [i for i, vec in enumerate(vectors) if vec is None]
+        if missing_indices:
+            computed = self._embed_batch([texts[i] for i in missing_indices], batch_size)
+            for idx, embedding in zip(missing_indices, computed):
+                vectors[idx] = embedding
+        return vectors
+
+    def close(self) -> None:
+        """Stop the request threads (they restart on the next call)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        """Provider-side latency and token usage of embedding requests (per process)."""
+        with self._lock:
+            latencies = sorted(self._latencies_ms)
+            return {
+                "requests": self._requests,
+                "failed_requests": self._failed_requests,
+                "texts": self._texts,
+                "prompt_tokens": self._prompt_tokens,
+                "total_tokens": self._total_tokens,
+                "latency_ms_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+                "latency_ms_p95": latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+            }
+
     def cosine(self, a: np.ndarray, b: np.ndarray) -> float:
         """Calculate cosine similarity between two vectors."""
         return safe_cosine_similarity(a, b)
 
-    def cosine_many(self, query_vec: np.ndarray, doc_vecs: Iterable[np.ndarray]) -> np.ndarray:
+    def cosine_many(
+        self, query_vec: np.ndarray, doc_vecs: Iterable[np.ndarray], assume_normalized: bool = False
+    ) -> np.ndarray:
         """
-        Calculate cosine similarities between a query vector and multiple document vectors.
-        """
-        Q = query_vec
-        if not np.isclose(np.linalg.norm(Q), 1.0, atol=1e-3):
-            norm = np.linalg.norm(Q)
-            Q = Q / norm if norm > 0 else Q
-
-        # Stack and normalize document vectors if needed
-        if isinstance(doc_vecs, np.ndarray) and doc_vecs.ndim == 2:
-            D = doc_vecs
-        else:
-            D = np.vstack([d for d in doc_vecs])
-        
-        norms = np.linalg.norm(D, axis=1, keepdims=True)
-        need_norm = np.any(np.abs(norms - 1.0) > 1e-3)
-        if need_norm:
-            nonzero_mask = norms.flatten() != 0
-            D[nonzero_mask] = D[nonzero_mask] / norms[nonzero_mask]
+        Calculate cosine similarities between a query vector (or matrix) and multiple document vectors.
         
-        return (D @ Q).astype(self.dtype)
+        Delegates to the shared similarity kernel. The vectors come from the caller, so
+        they are normalized unless `assume_normalized` says they already are.
+        """
+        return cosine_scores(query_vec, doc_vecs, assume_normalized=assume_normalized).astype(self.dtype, copy=False)
 
-    def _get_from_cache(self, text: str) -> Optional[np.ndarray]:
-        """Retrieve embedding from cache."""
-        cache_key = create_cache_key(self.model_name, text)
-        return self.cache.get(cache_key)
+    def _get_many_from_cache(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Retrieve embeddings from cache in one batched lookup."""
+        return self.cache.get_many(create_cache_keys(self.model_name, texts))
 
-    def _store_in_cache(self, text: str, vec: np.ndarray) -> None:
-        """Store embedding in cache."""
-        cache_key = create_cache_key(self.model_name, text)
-        self.cache.set(cache_key, vec)
+    def _store_many_in_cache(self, texts: List[str], vecs: List[np.ndarray]) -> None:
+        """Store embeddings in cache in one batched write."""
+        self.cache.set_many(create_cache_keys(self.model_name, texts), vecs)
 
-    def _embed_batch(self, texts: List[str]) -> List[np.ndarray]:
+    def _embed_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[np.ndarray]:
         """
-        Embed a batch of texts using DSPy embedder.
+        Embed texts in chunks of `batch_size`, up to `max_concurrency` requests at once.
+        
+        Completed chunks are cached even if another chunk fails; the first
+        failure is raised once every chunk has finished.
         
         Args:
             texts: List of texts to embed
+            batch_size: Optional override of the texts per API request
             
         Returns:
-            List of embedding arrays
+            List of embedding arrays, in input order
         """
         if not texts:
             return []
 
-        # Use DSPy embedder - it expects a list and returns a list
-        embeddings = self.embedder(texts)
-        
+        chunks = self._chunks(texts, batch_size or self.batch_size)
+        if len(chunks) == 1:
+            return self._collect(chunks, [self._capture(self._request, chunks[0])])
+        executor = self._get_executor()
+        futures = [executor.submit(self._capture, self._request, chunk) for chunk in chunks]
+        return self._collect(chunks, [future.result() for future in futures])
+
+    @staticmethod
+    def _chunks(texts: List[str], size: int) -> List[List[str]]:
+        return [texts[start:start + size] for start in range(0, len(texts), size)]
+
+    @staticmethod
+    def _capture(func, *args):
+        """Return func's result, or the exception it raised (like gather's return_exceptions)."""
+        try:
+            return func(*args)
+        except Exception as e:
+            return e
+
+    def _collect(self, chunks: List[List[str]], results: list) -> List[np.ndarray]:
+        """Flatten per-chunk results in order, raising the first failure after reporting progress."""
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            done = sum(len(chunk) for chunk, result in zip(chunks, results) if not isinstance(result, BaseException))
+            total = sum(len(chunk) for chunk in chunks)
+            print(f"⚠️  OpenRouter embedding: {len(errors)}/{len(chunks)} requests failed, "
+                  f"{done}/{total} texts embedded and cached")
+            raise errors[0]
+        return [vec for chunk_vectors in results for vec in chunk_vectors]
+
+    def _get_async_client(self) -> AsyncOpenAI:
+        """Async client for the running event loop (its HTTP pool cannot be shared across loops)."""
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_client = AsyncOpenAI(base_url=self.api_base, api_key=self.api_key, max_retries=0)
+            self._async_loop = loop
+        return self._async_client
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the pool that sends concurrent sync requests."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="openrouter-embedding"
+                )
+            return self._executor
+
+    def _request(self, texts: List[str]) -> List[np.ndarray]:
+        """One embeddings API request (with retries); caches and records its result."""
+        def call():
+            return self._client.embeddings.create(model=self._model_name, input=texts)
+
+        started = time.perf_counter()
+        try:
+            response = self.retry.call(call)
+        except Exception:
+            self._record(len(texts), None, started, failed=True)
+            raise
+        return self._finish(texts, response, started)
+
+    async def _request_async(self, texts: List[str]) -> List[np.ndarray]:
+        """Async version of `_request()`."""
+        client = self._get_async_client()
+
+        def call():
+            return client.embeddings.create(model=self._model_name, input=texts)
+
+        started = time.perf_counter()
+        try:
+            response = await self.retry.call_async(call)
+        except Exception:
+            self._record(len(texts), None, started, failed=True)
+            raise
+        return self._finish(texts, response, started)
+
+    def _finish(self, texts: List[str], response, started: float) -> List[np.ndarray]:
+        self._record(len(texts), getattr(response, "usage", None), started)
+        data = sorted(response.data, key=lambda item: item.index)  # Guard against reordering
+        vectors = self._to_vectors([item.embedding for item in data])
+        self._store_many_in_cache(texts, vectors)
+        return vectors
+
+    def _record(self, n_texts: int, usage, started: float, failed: bool = False) -> None:
+        """Record one request's latency (including retries) and token usage."""
+        latency_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._requests += 1
+            self._latencies_ms.append(latency_ms)
+            if failed:
+                self._failed_requests += 1
+                return
+            self._texts += n_texts
+            self._prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+            self._total_tokens += getattr(usage, "total_tokens", 0) or 0
+
+    def _to_vectors(self, embeddings) -> List[np.ndarray]:
+        """Convert embedder output into (normalized) embedding arrays."""
         result = []
         for embedding in embeddings:
             arr = np.asarray(embedding, dtype=self.dtype)
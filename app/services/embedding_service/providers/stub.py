@@ -0,0 +1,102 @@
+"""
+Deterministic hashing embedding provider.
+
+Produces stable pseudo-random unit vectors derived from a hash of the text.
+Has no model or network dependency, which makes it suitable for benchmarks
+and CI runs where embedding quality is irrelevant but cost and latency must be zero.
+"""
+
+import hashlib
+from typing import List, Optional, Iterable
+import numpy as np
+
+from ..base import EmbeddingProvider, TextInput, ArrayOrList, safe_cosine_similarity
+from ..cache import EmbeddingCache, NoOpCache, create_cache_keys
+from ..similarity import cosine_scores
+
+
+class StubProvider(EmbeddingProvider):
+    """
+    Hash-seeded embedding provider for benchmarks and tests.
+
+    Features:
+    - Same text always maps to the same vector (across processes)
+    - Configurable dimension to match the model it stands in for
+    - No external dependencies beyond NumPy
+    """
+
+    def __init__(
+        self,
+        dim: int = 384,
+        cache: Optional[EmbeddingCache] = None,
+        normalize: bool = True,
+        dtype: np.dtype = np.float32
+    ):
+        """
+        Initialize stub embedding provider.
+
+        Args:
+            dim: Embedding dimension
+            cache: Optional cache implementation
+            normalize: Whether to L2-normalize embeddings
+            dtype: NumPy data type for embeddings
+        """
+        self.dim = dim
+        self.cache = cache or NoOpCache()
+        self.normalize = normalize
+        self.dtype = dtype
+
+    @property
+    def supports_batching(self) -> bool:
+        return False
+
+    @property
+    def model_name(self) -> str:
+        return f"stub:{self.dim}"
+
+    def embed(self, texts: TextInput) -> ArrayOrList:
+        """
+        Embed one or many texts.
+
+        Args:
+            texts: Single string or list of strings to embed
+
+        Returns:
+            Single numpy array for string input, list of arrays for list input
+        """
+        single = isinstance(texts, str)
+        items = [texts] if single else list(texts)
+
+        keys = create_cache_keys(self.model_name, items)
+        vectors = self.cache.get_many(keys)
+        missing = [i for i, vec in enumerate(vectors) if vec is None]
+        for i in missing:
+            vectors[i] = self._embed_one(items[i])
+        if missing:
+            self.cache.set_many([keys[i] for i in missing], [vectors[i] for i in missing])
+
+        return vectors[0] if single else vectors
+
+    def cosine(self, a: np.ndarray, b: np.ndarray) -> float:
+        """Calculate cosine similarity between two vectors."""
+        return safe_cosine_similarity(a, b)
+
+    def cosine_many(
+        self, query_vec: np.ndarray, doc_vecs: Iterable[np.ndarray], assume_normalized: bool = False
+    ) -> np.ndarray:
+        """
+        Calculate cosine similarities between a query vector (or matrix) and multiple document vectors.
+        
+        Delegates to the shared similarity kernel. The vectors come from the caller, so
+        they are normalized unless `assume_normalized` says they already are.
+        """
+        return cosine_scores(query_vec, doc_vecs, assume_normalized=assume_normalized).astype(self.dtype, copy=False)
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+        arr = np.random.default_rng(seed).standard_normal(self.dim).astype(self.dtype)
+        if self.normalize:
+            norm = np.linalg.norm(arr)
+            if norm > 0:
+                arr = arr / norm
+        return arr
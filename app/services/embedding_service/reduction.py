@@ -0,0 +1,342 @@
+"""
+Reduced-dimension storage for the `embeddings` table.
+
+Every intervention, tool query, tool output and document chunk is stored
+with its vector, so the vector width dominates table size and recall scan
+time. Vectors can be projected to fewer dimensions before they are written
+and before recall queries are compared against them:
+
+- `pca`: a PCA projection fitted on vectors from the model
+  (`scripts/fit_embedding_pca.py`); works for any model
+- `truncate`: Matryoshka-style truncation to the leading components; only
+  meaningful for models trained for it (e.g. text-embedding-3-*, nomic)
+
+Either way the stored element type can also be `halfvec` (float16) instead
+of `vector` (float32). The in-memory vectors used for similarity, caching
+and analytics keep the model's full dimension; only stored and queried
+vectors are reduced.
+"""
+
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import text
+
+from app.models import EMBEDDING_STORAGE_DIM, EMBEDDING_STORAGE_TYPE
+
+from .similarity import VectorsInput, as_matrix, normalize_rows
+
+
+class EmbeddingReducer(ABC):
+    """Projection from a model's vectors to the stored dimension."""
+
+    # Appended to the model name of stored rows, e.g. 'all-MiniLM-L6-v2+pca128'
+    tag: str = ""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def fits(self, model_name: str, input_dim: int) -> bool:
+        """Whether vectors of `model_name` with `input_dim` components can be reduced."""
+        return input_dim >= self.dim
+
+    @abstractmethod
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        """Reduce a (n, input_dim) matrix to unit (n, dim) float32 rows."""
+        pass
+
+
+class TruncationReducer(EmbeddingReducer):
+    """Keeps the leading `dim` components (Matryoshka embeddings) and renormalizes."""
+
+    def __init__(self, dim: int):
+        super().__init__(dim)
+        self.tag = f"mrl{dim}"
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        return normalize_rows(vectors[:, :self.dim])
+
+
+class PCAReducer(EmbeddingReducer):
+    """Projects onto the top principal components of one model's vectors and renormalizes."""
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray, model_name: str, explained_variance: float = 0.0):
+        """
+        Initialize from a fitted projection.
+
+        Args:
+            mean: Mean of the fitting vectors, shape (input_dim,)
+            components: Principal axes as rows, shape (dim, input_dim)
+            model_name: Model whose vectors the projection was fitted on
+            explained_variance: Fraction of variance kept by the components
+        """
+        super().__init__(components.shape[0])
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        self.model_name = model_name
+        self.explained_variance = float(explained_variance)
+        self.tag = f"pca{self.dim}"
+
+    @classmethod
+    def fit(cls, vectors: VectorsInput, dim: int, model_name: str) -> "PCAReducer":
+        """
+        Fit a projection on sample vectors.
+
+        Args:
+            vectors: Sample vectors from the model (a few thousand or more)
+            dim: Number of components to keep
+            model_name: Model the vectors come from
+
+        Returns:
+            Fitted PCAReducer
+        """
+        matrix = as_matrix(vectors).astype(np.float64)
+        if dim > matrix.shape[1] or dim > matrix.shape[0]:
+            raise ValueError(f"Cannot fit {dim} components on {matrix.shape[0]} x {matrix.shape[1]} vectors")
+        mean = matrix.mean(axis=0)
+        centered = matrix - mean
+        eigenvalues, eigenvectors = np.linalg.eigh(centered.T @ centered)  # Ascending order
+        top = np.argsort(eigenvalues)[::-1][:dim]
+        explained = eigenvalues[top].sum() / max(eigenvalues.sum(), 1e-12)
+        return cls(mean, eigenvectors[:, top].T, model_name, explained)
+
+    def fits(self, model_name: str, input_dim: int) -> bool:
+        return model_name == self.model_name and input_dim == self.components.shape[1]
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        return normalize_rows((np.asarray(vectors, dtype=np.float32) - self.mean) @ self.components.T)
+
+    def save(self, path: str) -> None:
+        """Save the projection as .npz."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez(
+            path,
+            mean=self.mean,
+            components=self.components,
+            model_name=np.array(self.model_name),
+            explained_variance=np.array(self.explained_variance),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "PCAReducer":
+        """Load a projection saved with `save()`."""
+        with np.load(path) as data:
+            return cls(data["mean"], data["components"], str(data["model_name"]), float(data["explained_variance"]))
+
+
+class EmbeddingStorage:
+    """
+    How embedding vectors are written to and searched in the `embeddings` table.
+
+    Features:
+    - Fixed stored width (`EMBEDDING_STORAGE_DIM`) and element type
+      (`vector` or `halfvec`), matching the column
+    - Optional reduction applied identically to stored and query vectors
+    - Reduced rows are stored under a tagged model name, so recall never
+      compares vectors from different projections and database reuse never
+      returns reduced vectors as model output
+    """
+
+    def __init__(self, dim: int = 384, storage_type: str = "vector", reducer: Optional[EmbeddingReducer] = None):
+        """
+        Initialize the storage settings.
+
+        Args:
+            dim: Stored vector width (the column's dimension)
+            storage_type: 'vector' (float32) or 'halfvec' (float16)
+            reducer: Optional projection to `dim` components
+        """
+        if reducer is not None and reducer.dim != dim:
+            raise ValueError(f"Reduction to {reducer.dim} dimensions does not match EMBEDDING_STORAGE_DIM={dim}")
+        self.dim = dim
+        self.storage_type = storage_type
+        self.reducer = reducer
+
+    @property
+    def reduces(self) -> bool:
+        return self.reducer is not None
+
+    @property
+    def bytes_per_vector(self) -> int:
+        """Stored bytes per vector, excluding pgvector's small header."""
+        return self.dim * (2 if self.storage_type == "halfvec" else 4)
+
+    def model_name(self, model_name: str) -> str:
+        """Model name recorded with stored (and searched) rows."""
+        return f"{model_name}+{self.reducer.tag}" if self.reducer is not None else model_name
+
+    def project(self, vectors: VectorsInput, model_name: str) -> np.ndarray:
+        """
+        Vectors as they are stored: reduced if configured, shape (n, dim), float32.
+
+        Args:
+            vectors: One vector or a matrix/list of vectors from `model_name`
+            model_name: Model that produced the vectors
+
+        Returns:
+            Array of shape (n, dim)
+
+        Raises:
+            ValueError: If the vectors cannot be stored in this column
+        """
+        if not isinstance(vectors, np.ndarray):
+            vectors = list(vectors)
+            if not vectors:
+                return np.empty((0, self.dim), dtype=np.float32)
+        matrix = as_matrix(vectors)
+        if self.reducer is not None:
+            if not self.reducer.fits(model_name, matrix.shape[1]):
+                raise ValueError(
+                    f"Embedding reduction '{self.reducer.tag}' does not apply to {model_name} "
+                    f"({matrix.shape[1]} dimensions)"
+                )
+            return self.reducer.transform(matrix)
+        if matrix.shape[1] != self.dim:
+            raise ValueError(
+                f"{model_name} produces {matrix.shape[1]}-dimensional vectors but the embeddings column "
+                f"stores {self.dim}; set EMBEDDING_REDUCTION or EMBEDDING_STORAGE_DIM"
+            )
+        return np.asarray(matrix, dtype=np.float32)
+
+    def describe(self) -> dict:
+        """Storage settings, for stats endpoints and benchmarks."""
+        return {
+            "dim": self.dim,
+            "type": self.storage_type,
+            "reduction": self.reducer.tag if self.reducer is not None else None,
+            "bytes_per_vector": self.bytes_per_vector,
+        }
+
+
+def create_reducer(kind: str, dim: int, pca_path: Optional[str] = None) -> Optional[EmbeddingReducer]:
+    """
+    Create the reducer for an EMBEDDING_REDUCTION setting.
+
+    Args:
+        kind: 'none', 'truncate' or 'pca'
+        dim: Target dimension
+        pca_path: Fitted projection for 'pca'
+
+    Returns:
+        Reducer, or None for 'none'
+    """
+    kind = (kind or "none").lower()
+    if kind == "none":
+        return None
+    if kind == "truncate":
+        return TruncationReducer(dim)
+    if kind == "pca":
+        if not pca_path or not os.path.exists(pca_path):
+            raise ValueError(f"EMBEDDING_REDUCTION=pca needs a fitted projection at EMBEDDING_PCA_PATH ({pca_path})")
+        return PCAReducer.load(pca_path)
+    raise ValueError(f"Unknown EMBEDDING_REDUCTION '{kind}'. Choose from: none, truncate, pca")
+
+
+def storage_from_env() -> EmbeddingStorage:
+    """Build the storage settings from EMBEDDING_STORAGE_* and EMBEDDING_REDUCTION."""
+    reducer = create_reducer(
+        os.getenv("EMBEDDING_REDUCTION", "none"),
+        EMBEDDING_STORAGE_DIM,
+        os.getenv("EMBEDDING_PCA_PATH", "./embedding-cache/pca.npz"),
+    )
+    return EmbeddingStorage(EMBEDDING_STORAGE_DIM, EMBEDDING_STORAGE_TYPE, reducer)
+
+
+_storage: Optional[EmbeddingStorage] = None
+_storage_lock = threading.Lock()
+
+
+def get_embedding_storage() -> EmbeddingStorage:
+    """Get the process-wide storage settings (read from the environment once)."""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = storage_from_env()
+    return _storage
+
+
+# -----------------------------------------------------------------------
+# Converting stored rows
+# -----------------------------------------------------------------------
+
+def stored_column_type(connection) -> str:
+    """Current type of `embeddings.embedding`, e.g. 'vector(384)'."""
+    return connection.execute(text(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = 'embeddings'::regclass AND attname = 'embedding'"
+    )).scalar()
+
+
+def convert_stored_embeddings(connection, storage: EmbeddingStorage, batch_size: int = 2000) -> int:
+    """
+    Convert the `embeddings` table to `storage` (column type, width and reduction).
+
+    Element-type changes with the same width are a single cast. Reductions
+    re-project every untagged row in batches into a new column that then
+    replaces the old one. Used by `python -m app.database.cli convert-embeddings`
+    (never by a migration: the result depends on the environment).
+
+    Args:
+        connection: SQLAlchemy connection (inside a transaction)
+        storage: Target storage settings
+        batch_size: Rows re-projected per batch
+
+    Returns:
+        Number of rows re-projected (0 for a cast or when nothing changes)
+    """
+    target = f"{storage.storage_type}({storage.dim})"
+    current = stored_column_type(connection)
+    if not storage.reduces:
+        if current == target:
+            return 0
+        if current is None or not current.endswith(f"({storage.dim})"):
+            raise ValueError(
+                f"Cannot cast {current} to {target} without a reduction; "
+                f"set EMBEDDING_REDUCTION or re-embed the stored content"
+            )
+        connection.execute(text(f"ALTER TABLE embeddings ALTER COLUMN embedding TYPE {target} USING embedding::{target}"))
+        return 0
+
+    suffix = f"+{storage.reducer.tag}"
+    connection.execute(text(f"ALTER TABLE embeddings ADD COLUMN embedding_reduced {target}"))
+    converted = 0
+    last_id = None
+    while True:
+        params = {"limit": batch_size} if last_id is None else {"limit": batch_size, "last_id": last_id}
+        rows = connection.execute(text(
+            "SELECT id, embedding::text, embedding_model FROM embeddings "
+            + ("WHERE id > :last_id " if last_id is not None else "")
+            + "ORDER BY id LIMIT :limit"
+        ), params).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        by_model = {}
+        for row_id, vector_text, model_name in rows:
+            by_model.setdefault(model_name, []).append((row_id, vector_text))
+        updates = []
+        for model_name, model_rows in by_model.items():
+            if model_name.endswith(suffix):
+                raise ValueError(f"Rows of {model_name} are already reduced; the stored vectors cannot be reduced again")
+            vectors = np.array([np.fromstring(v[1:-1], sep=",") for _, v in model_rows], dtype=np.float32)
+            projected = storage.project(vectors, model_name)
+            updates.extend(
+                {"id": row_id, "vector": "[" + ",".join(map(repr, vec.tolist())) + "]", "model": model_name + suffix}
+                for (row_id, _), vec in zip(model_rows, projected)
+            )
+        connection.execute(
+            text(f"UPDATE embeddings SET embedding_reduced = CAST(:vector AS {target}), embedding_model = :model WHERE id = :id"),
+            updates,
+        )
+        converted += len(updates)
+        print(f"🔧 Re-projected {converted} stored embeddings to {target} ({storage.reducer.tag})")
+
+    connection.execute(text("ALTER TABLE embeddings DROP COLUMN embedding"))
+    connection.execute(text("ALTER TABLE embeddings RENAME COLUMN embedding_reduced TO embedding"))
+    connection.execute(text("ALTER TABLE embeddings ALTER COLUMN embedding SET NOT NULL"))
+    return converted
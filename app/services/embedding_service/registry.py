@@ -0,0 +1,348 @@
+"""
+Per-run embedding model selection.
+
+A simulation request can name its own embedding model (`embedding_model`)
+and settings (`embedding_config`). The registry resolves that selection to
+an `EmbeddingService`, creating it on first use and pooling it, so every
+run configured with the same model shares one provider, cache and executor.
+Runs that do not pick a model (or pick the server's own) get the shared
+service. A run holds its service (`acquire`/`release`) so the pool never
+shuts down a service a simulation is still using.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .factory import EmbeddingProviderFactory
+from .service import EmbeddingService
+from .shared import build_embedding_service, get_embedding_service
+from .utils import get_embedding_config_from_env
+
+# Spellings accepted for `embedding_model`, mapped to factory provider types
+PROVIDER_ALIASES = {
+    "hf": "huggingface",
+    "onnx_minilm": "onnx",
+}
+
+# Former schema defaults that were stored with every config but never honoured:
+# they mean "the server default", not a model choice
+LEGACY_DEFAULT_MODELS = {"onnx_minilm"}
+
+# Settings a run may override, per provider. Credentials, endpoints, paths and
+# cache settings stay server-side: a request must not be able to send the
+# server's API keys to another host or read arbitrary model directories.
+RUN_CONFIG_KEYS = {
+    "huggingface": {"model", "batch_size"},
+    "openrouter": {"model_name", "batch_size"},
+    "onnx": {"variant", "batch_size", "max_length"},
+    "stub": {"dim"},
+}
+
+# `model` is accepted for every remote provider; OpenRouter calls it `model_name`
+_CONFIG_KEY_ALIASES = {
+    "openrouter": {"model": "model_name"},
+}
+
+
+def _normalize_provider(embedding_model: Optional[str]) -> Optional[str]:
+    if not embedding_model:
+        return None
+    provider_type = embedding_model.strip().lower()
+    return PROVIDER_ALIASES.get(provider_type, provider_type)
+
+
+def _run_overrides(provider_type: str, embedding_config: Optional[dict]) -> Dict[str, Any]:
+    """The allowed subset of a run's `embedding_config`."""
+    allowed = RUN_CONFIG_KEYS.get(provider_type, set())
+    aliases = _CONFIG_KEY_ALIASES.get(provider_type, {})
+    overrides = {}
+    for key, value in (embedding_config or {}).items():
+        key = aliases.get(key, key)
+        if key in allowed:
+            overrides[key] = value
+        else:
+            print(f"⚠️ Ignoring embedding_config['{key}'] for provider '{provider_type}' (not configurable per run)")
+    return overrides
+
+
+class EmbeddingServiceRegistry:
+    """
+    Resolves per-run embedding selections to pooled embedding services.
+
+    Features:
+    - Services keyed by (provider, model, config); same key, same instance
+    - Created lazily on first use, outside the registry lock, so loading one
+      model does not stall runs using others
+    - Services beyond `max_services` are evicted least-recently-used; an
+      evicted service still held by a run is shut down when its last run
+      releases it
+    - The server's default selection (and the legacy `onnx_minilm` default)
+      always resolves to the shared service
+    - A selection that cannot be created (unknown provider, missing model)
+      or whose vectors do not fit the `embeddings` column falls back to the
+      shared service with a warning
+    """
+
+    def __init__(self, max_services: int = 4):
+        """
+        Initialize the registry.
+
+        Args:
+            max_services: Pooled services kept besides the shared one
+        """
+        self.max_services = max(1, max_services)
+        self._services: "OrderedDict[str, EmbeddingService]" = OrderedDict()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._holds: Dict[int, int] = {}  # id(service) -> runs holding it
+        self._retired: Dict[int, EmbeddingService] = {}  # Evicted while held
+        self._lock = threading.Lock()
+        self._engine = None
+        self._created = 0
+        self._evicted = 0
+        self._failures = 0
+
+    def resolve(self, embedding_model: Optional[str] = None, embedding_config: Optional[dict] = None) -> EmbeddingService:
+        """
+        Get the embedding service for a run's model selection.
+
+        Args:
+            embedding_model: Provider name ('onnx', 'huggingface', 'openrouter', ...);
+                None or empty for the server default
+            embedding_config: Optional per-run settings (e.g. {"model": ...})
+
+        Returns:
+            EmbeddingService for the selection (the shared service for the default)
+        """
+        return self._resolve(embedding_model, embedding_config, hold=False)
+
+    def acquire(self, embedding_model: Optional[str] = None, embedding_config: Optional[dict] = None) -> EmbeddingService:
+        """
+        Resolve a run's model selection and hold the service until `release`.
+
+        A held service may still be evicted from the pool, but it is only shut
+        down once every run holding it has released it.
+
+        Args:
+            embedding_model: Provider name; None or empty for the server default
+            embedding_config: Optional per-run settings
+
+        Returns:
+            EmbeddingService for the selection
+        """
+        return self._resolve(embedding_model, embedding_config, hold=True)
+
+    def release(self, service: EmbeddingService) -> None:
+        """
+        Release a service obtained from `acquire`.
+
+        Args:
+            service: The service returned by `acquire`
+        """
+        with self._lock:
+            holds = self._holds.get(id(service), 0) - 1
+            if holds > 0:
+                self._holds[id(service)] = holds
+                return
+            self._holds.pop(id(service), None)
+            retired = self._retired.pop(id(service), None)
+        if retired is not None:
+            retired.shutdown(wait=False)
+
+    def _hold(self, service: EmbeddingService) -> None:
+        """Count a run holding `service` (caller holds the registry lock)."""
+        self._holds[id(service)] = self._holds.get(id(service), 0) + 1
+
+    def _resolve(self, embedding_model: Optional[str], embedding_config: Optional[dict], hold: bool) -> EmbeddingService:
+        shared = get_embedding_service()
+        if embedding_model and embedding_model.strip().lower() in LEGACY_DEFAULT_MODELS:
+            embedding_model = None
+        provider_type = _normalize_provider(embedding_model)
+        if provider_type is None:
+            if embedding_config:
+                print("⚠️ embedding_config given without embedding_model; using the server default")
+            return shared
+
+        if provider_type not in EmbeddingProviderFactory.get_available_providers():
+            print(f"⚠️ Unknown embedding model '{embedding_model}'; using the server default")
+            return shared
+
+        key, config = self._key(provider_type, embedding_config)
+        if key == self._default_key():
+            return shared
+
+        with self._lock:
+            service = self._services.get(key)
+            if service is not None:
+                self._services.move_to_end(key)
+                if hold:
+                    self._hold(service)
+                return service
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:  # Concurrent runs with the same new model build it once
+            with self._lock:
+                service = self._services.get(key)
+                if service is not None and hold:
+                    self._hold(service)
+            if service is None:
+                service = self._create(provider_type, config)
+                if service is None:
+                    return shared
+                self._store(key, service, hold)
+            return service
+
+    def _key(self, provider_type: str, embedding_config: Optional[dict]) -> Tuple[str, dict]:
+        _, env_config = get_embedding_config_from_env(provider_type)
+        config = {**env_config, **_run_overrides(provider_type, embedding_config)}
+        identity = {k: v for k, v in config.items() if k != "api_key"}
+        return f"{provider_type}:{json.dumps(identity, sort_keys=True, default=str)}", config
+
+    def _default_key(self) -> str:
+        provider_type = _normalize_provider(os.getenv("EMBEDDING_PROVIDER", "huggingface"))
+        return self._key(provider_type, None)[0]
+
+    def _create(self, provider_type: str, config: dict) -> Optional[EmbeddingService]:
+        print(f"🔧 Creating embedding service for run selection: {provider_type} ({config.get('model') or config.get('model_name') or config.get('model_dir', '')})")
+        try:
+            provider = EmbeddingProviderFactory.create_provider(provider_type=provider_type, **config)
+            service = build_embedding_service(provider)
+            # Runs store and search their vectors in the shared column: reject models that do not fit it
+            service.to_storage(service.encode(["dimension probe"]))
+        except Exception as e:
+            with self._lock:
+                self._failures += 1
+            print(f"⚠️ Could not create embedding service '{provider_type}': {e}; using the server default")
+            return None
+        if self._engine is not None:
+            service.enable_database_reuse(self._engine)
+        return service
+
+    def _store(self, key: str, service: EmbeddingService, hold: bool = False) -> None:
+        evicted = []
+        with self._lock:
+            self._services[key] = service
+            self._created += 1
+            if hold:
+                self._hold(service)
+            while len(self._services) > self.max_services:
+                old_key, old_service = self._services.popitem(last=False)
+                self._key_locks.pop(old_key, None)
+                self._evicted += 1
+                if id(old_service) in self._holds:
+                    self._retired[id(old_service)] = old_service  # Shut down on its last release
+                else:
+                    evicted.append(old_service)
+        for old_service in evicted:
+            old_service.shutdown(wait=False)
+
+    def enable_database_reuse(self, engine) -> None:
+        """
+        Apply database reuse to pooled services (current and future), like the shared one.
+
+        Args:
+            engine: SQLAlchemy engine for the application database
+        """
+        with self._lock:
+            self._engine = engine
+            services = list(self._services.values())
+        for service in services:
+            service.enable_database_reuse(engine)
+
+    def clear(self) -> None:
+        """Drop all pooled services, shutting down those no run holds."""
+        with self._lock:
+            services = []
+            for service in self._services.values():
+                if id(service) in self._holds:
+                    self._retired[id(service)] = service
+                else:
+                    services.append(service)
+            self._services.clear()
+            self._key_locks.clear()
+        for service in services:
+            service.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        """Pool statistics and the pooled services' models."""
+        with self._lock:
+            services = list(self._services.values())
+            stats = {
+                "pooled": len(services),
+                "max_services": self.max_services,
+                "created": self._created,
+                "evicted": self._evicted,
+                "retired": len(self._retired),
+                "held": sum(self._holds.values()),
+                "failures": self._failures,
+            }
+        stats["services"] = [
+            {"provider": service.provider_type, "model": service.model_name} for service in services
+        ]
+        return stats
+
+
+_registry: Optional[EmbeddingServiceRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_embedding_registry() -> EmbeddingServiceRegistry:
+    """Get the process-wide embedding service registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = EmbeddingServiceRegistry(
+                    max_services=int(os.getenv("EMBEDDING_REGISTRY_MAX_SERVICES", "4"))
+                )
+    return _registry
+
+
+def get_run_embedding_service(
+    embedding_model: Optional[str] = None,
+    embedding_config: Optional[dict] = None,
+) -> EmbeddingService:
+    """
+    Get the embedding service for a run's configured model.
+
+    Args:
+        embedding_model: The run's `embedding_model` (None for the server default)
+        embedding_config: The run's `embedding_config`
+
+    Returns:
+        Pooled EmbeddingService for the selection
+    """
+    return get_embedding_registry().resolve(embedding_model, embedding_config)
+
+
+def acquire_run_embedding_service(
+    embedding_model: Optional[str] = None,
+    embedding_config: Optional[dict] = None,
+) -> EmbeddingService:
+    """
+    Get and hold the embedding service for a run (pair with `release_run_embedding_service`).
+
+    Args:
+        embedding_model: The run's `embedding_model` (None for the server default)
+        embedding_config: The run's `embedding_config`
+
+    Returns:
+        Pooled EmbeddingService for the selection
+    """
+    return get_embedding_registry().acquire(embedding_model, embedding_config)
+
+
+def release_run_embedding_service(service: EmbeddingService) -> None:
+    """Release a service obtained from `acquire_run_embedding_service`."""
+    get_embedding_registry().release(service)
+
+
+def reset_embedding_registry() -> None:
+    """Shut down all pooled per-run services (useful for testing and shutdown)."""
+    global _registry
+    with _registry_lock:
+        if _registry is not None:
+            _registry.clear()
+        _registry = None
@@ -0,0 +1,99 @@
+"""
+Retry with jittered exponential backoff for remote embedding providers.
+
+Rate limits (429) and transient server errors (5xx) from embedding APIs
+are retried with "full jitter" backoff, so concurrent batches that fail
+together do not retry in lockstep. A `Retry-After` header, when present,
+is honoured as the minimum delay.
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeouts, rate limits and transient server errors
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+def _transport_errors() -> tuple:
+    errors = [ConnectionError, TimeoutError]
+    try:
+        import httpx
+        errors.append(httpx.TransportError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+_TRANSPORT_ERRORS = _transport_errors()
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of an API error (huggingface_hub, httpx, openai/litellm style), if any."""
+    response = getattr(error, "response", None)
+    code = getattr(response, "status_code", None) or getattr(error, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether `error` is a rate limit, transient server error or connection failure."""
+    code = status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS
+    return isinstance(error, _TRANSPORT_ERRORS) or type(error).__name__ in (
+        "InferenceTimeoutError", "APIConnectionError", "APITimeoutError"
+    )
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None  # HTTP-date form is not worth parsing here
+
+
+@dataclass
+class RetryPolicy:
+    """Retry limits and backoff shape for one provider."""
+
+    max_retries: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Full-jitter backoff for retry number `attempt` (0-based), at least Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        retry_after = _retry_after(error) if error is not None else None
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def call(self, func: Callable[[], T]) -> T:
+        """Call `func`, retrying retryable errors."""
+        attempt = 0
+        while True:
+            try:
+                return func()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                time.sleep(self.delay(attempt, e))
+                attempt += 1
+
+    async def call_async(self, func: Callable[[], Awaitable[T]]) -> T:
+        """Await `func()`, retrying retryable errors without blocking the event loop."""
+        attempt = 0
+        while True:
+            try:
+                return await func()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                await asyncio.sleep(self.delay(attempt, e))
+                attempt += 1
@@ -5,10 +5,18 @@ This is the primary interface that replaces the old SentenceEmbedder,
 providing backward compatibility while enabling modern provider-based architecture.
 """
 
-from typing import Optional, Union, List, Iterable
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union, List, Iterable, Tuple
 import numpy as np
 
-from .base import EmbeddingProvider, TextInput
+from .base import ArrayOrList, EmbeddingProvider, TextInput, embedding_executor
+from .cache import create_cache_keys
+from .dispatcher import MicroBatchingProvider
+from .process_pool import ONNXProcessPool
+from .similarity import cosine_similarity_matrix, top_k
 
 
 class EmbeddingService:
@@ -24,16 +32,34 @@ class EmbeddingService:
     - Backward compatibility with existing agent code
     - Consistent interface across all provider types
     - Support for both single and batch embedding operations
+    - Awaitable API backed by a dedicated embedding executor, so CPU-bound
+      inference never runs on the event loop thread
+    - Bulk mode for large jobs: ONNX inference sharded across worker processes
     """
 
-    def __init__(self, provider: EmbeddingProvider):
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        max_workers: int = 1,
+        bulk_workers: int = 1,
+        bulk_min_texts: int = 256,
+    ):
         """
         Initialize embedding service with a specific provider.
         
         Args:
             provider: Embedding provider instance (HuggingFace, ONNX, OpenRouter, etc.)
+            max_workers: Threads in the embedding executor used by the async API
+            bulk_workers: Worker processes for `embed_bulk` with ONNX (1 keeps bulk jobs in-process)
+            bulk_min_texts: Smallest `embed_bulk` job sent to the worker processes
         """
         self.provider = provider
+        self._max_workers = max(1, max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._bulk_workers = max(1, bulk_workers)
+        self._bulk_min_texts = max(1, bulk_min_texts)
+        self._bulk_pool: Optional[ONNXProcessPool] = None
 
     def encode(self, sentences: Union[str, List[str], Iterable[str]]) -> np.ndarray:
         """
@@ -63,6 +89,192 @@ class EmbeddingService:
         embeddings = self.provider.embed(sentence_list)
         return np.array(embeddings)
 
+    async def encode_async(self, sentences: Union[str, List[str], Iterable[str]]) -> np.ndarray:
+        """
+        Awaitable version of `encode()`.
+        
+        Remote providers (HuggingFace, OpenRouter) make native async HTTP calls;
+        CPU providers (ONNX) run on the service's bounded embedding executor.
+        Either way callers on the event loop are not blocked by inference.
+        
+        Args:
+            sentences: String, list of strings, or iterable of strings to encode
+            
+        Returns:
+            2D numpy array of embeddings with shape (n_sentences, embedding_dim)
+        """
+        if not isinstance(sentences, (str, list)):
+            sentences = list(sentences)  # Don't consume caller iterators from another thread
+        if isinstance(sentences, str):
+            return np.array([await self._embed_async(sentences)])
+        if not sentences:
+            return np.array([]).reshape(0, -1)
+        return np.array(await self._embed_async(sentences))
+
+    async def embed_batch_async(self, texts: List[str], batch_size: Optional[int] = None) -> List[np.ndarray]:
+        """
+        Awaitable version of `embed_batch()`.
+        
+        Args:
+            texts: List of texts to embed
+            batch_size: Optional batch size override (runs `embed_batch()` on the
+                embedding executor; otherwise providers use their configured batch size)
+            
+        Returns:
+            List of embedding arrays
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        if batch_size is None:
+            return await self._embed_async(texts)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self.embed_batch, texts, batch_size)
+
+    async def _embed_async(self, texts: TextInput) -> ArrayOrList:
+        """The provider's `embed_async`, with thread-based work on this service's executor."""
+        token = embedding_executor.set(self._get_executor())
+        try:
+            return await self.provider.embed_async(texts)
+        finally:
+            embedding_executor.reset(token)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the embedding executor."""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._max_workers, thread_name_prefix="embedding"
+                    )
+        return self._executor
+
+    def embed_bulk(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embed a large job (a whole document, a re-embedded run) using every core.
+        
+        With an ONNX provider and `bulk_workers` > 1, texts are served from the
+        cache and (with database reuse) the `embeddings` table first; the rest
+        are sharded across worker processes that each own a tokenizer and
+        inference session, and vectors come back through shared memory.
+        Micro-batching is bypassed: a bulk job is already a large batch.
+        Small jobs and other providers use `embed_batch()`.
+        
+        Args:
+            texts: List of texts to embed
+            
+        Returns:
+            List of embedding arrays, in input order
+        """
+        texts = list(texts)
+        pool = self._get_bulk_pool() if len(texts) >= self._bulk_min_texts else None
+        if pool is None:
+            return self.embed_batch(texts)
+
+        from .db_reuse import DatabaseReadThroughProvider
+
+        chain = self._provider_chain()
+        onnx = chain[-1]
+        reuse = next((p for p in chain if isinstance(p, DatabaseReadThroughProvider)), None)
+        if reuse is not None:
+            vectors, pending = reuse.resolve_known(texts)  # Cache, then stored vectors
+        else:
+            vectors = onnx.cache.get_many(create_cache_keys(onnx.model_name, texts))
+            pending = {}
+            for i, vec in enumerate(vectors):
+                if vec is None:
+                    pending.setdefault(texts[i], []).append(i)
+        if pending:
+            missing_texts = list(pending)
+            computed = list(pool.embed(missing_texts))
+            onnx.cache.set_many(create_cache_keys(onnx.model_name, missing_texts), computed)
+            for text, vec in zip(missing_texts, computed):
+                for i in pending[text]:
+                    vectors[i] = vec
+        return vectors
+
+    async def embed_bulk_async(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Awaitable version of `embed_bulk()`.
+        
+        Waits for the worker processes on a separate thread, so a bulk job does
+        not occupy the embedding executor that interactive async calls share.
+        """
+        texts = list(texts)
+        if len(texts) < self._bulk_min_texts or self._get_bulk_pool() is None:
+            return await self.embed_batch_async(texts)
+        return await asyncio.to_thread(self.embed_bulk, texts)
+
+    def _get_bulk_pool(self) -> Optional[ONNXProcessPool]:
+        """Lazily create the bulk process pool (None if bulk mode does not apply)."""
+        onnx = self._provider_chain()[-1]
+        if self._bulk_workers <= 1 or not hasattr(onnx, 'worker_config'):
+            return None
+        if self._bulk_pool is None:
+            with self._executor_lock:
+                if self._bulk_pool is None:
+                    threads = max(1, (os.cpu_count() or 1) // self._bulk_workers)
+                    self._bulk_pool = ONNXProcessPool(
+                        onnx.worker_config(intra_op_threads=threads),
+                        dim=onnx.embedding_dim,
+                        workers=self._bulk_workers,
+                    )
+        return self._bulk_pool
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the embedding executor, dispatcher and bulk workers (all restart on the next call)."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+        if self._bulk_pool is not None:
+            self._bulk_pool.close()
+        for provider in self._provider_chain():
+            close = getattr(provider, 'close', None)
+            if callable(close):
+                close()
+
+    def warmup(self) -> None:
+        """Run the provider's warm-up inference, if it has one (e.g. ONNX graph initialization)."""
+        warmup = getattr(self.provider, 'warmup', None)
+        if callable(warmup):
+            warmup()
+
+    def enable_database_reuse(self, engine) -> None:
+        """
+        Serve embeddings already stored in the `embeddings` table before calling the model.
+        
+        Args:
+            engine: SQLAlchemy engine for the application database
+        """
+        from .db_reuse import DatabaseReadThroughProvider
+        from .reduction import get_embedding_storage
+
+        if get_embedding_storage().reduces:
+            # Stored vectors are projections, not model output
+            print("⚠️  Embedding reuse disabled: stored embeddings are dimension-reduced")
+            return
+        if not isinstance(self.provider, DatabaseReadThroughProvider):
+            self.provider = DatabaseReadThroughProvider(self.provider, engine)
+
+    def enable_micro_batching(self, max_wait_ms: float = 3.0, max_batch: int = 64) -> None:
+        """
+        Coalesce concurrent small embedding requests into shared inference calls.
+        
+        Args:
+            max_wait_ms: Longest time a partial batch waits for more requests
+            max_batch: Texts per batch at which it is dispatched immediately
+        """
+        if not isinstance(self.provider, MicroBatchingProvider):
+            self.provider = MicroBatchingProvider(self.provider, max_wait_ms=max_wait_ms, max_batch=max_batch)
+
+    def _provider_chain(self) -> List[EmbeddingProvider]:
+        """The provider followed by the providers it wraps (database reuse, micro-batching)."""
+        chain = [self.provider]
+        while isinstance(getattr(chain[-1], 'provider', None), EmbeddingProvider):
+            chain.append(chain[-1].provider)
+        return chain
+
     def text_similarity_score(self, text1: str, text2: str) -> float:
         """
         Calculate similarity score between two texts.
@@ -76,10 +288,46 @@ class EmbeddingService:
         Returns:
             Cosine similarity score between the two texts
         """
-        emb1 = self.provider.embed(text1)
-        emb2 = self.provider.embed(text2)
+        emb1, emb2 = self.provider.embed([text1, text2])  # One batched provider call
         return self.provider.cosine(emb1, emb2)
 
+    def similarity_matrix(self, texts: List[str]) -> np.ndarray:
+        """
+        Pairwise cosine similarities of `texts`, from one batched encode.
+        
+        Args:
+            texts: Texts to compare
+            
+        Returns:
+            Symmetric array of shape (len(texts), len(texts))
+        """
+        embeddings = self.encode(texts)
+        return cosine_similarity_matrix(embeddings, embeddings)
+
+    async def similarity_matrix_async(self, texts: List[str]) -> np.ndarray:
+        """Awaitable version of `similarity_matrix()`."""
+        embeddings = await self.encode_async(texts)
+        return cosine_similarity_matrix(embeddings, embeddings)
+
+    def similarity_pairs(self, a_texts: List[str], b_texts: List[str]) -> np.ndarray:
+        """
+        Cosine similarity of every text in `a_texts` to every text in `b_texts`.
+        
+        Both lists are embedded in one batched encode.
+        
+        Args:
+            a_texts: Texts for the rows
+            b_texts: Texts for the columns
+            
+        Returns:
+            Array of shape (len(a_texts), len(b_texts))
+        """
+        a_texts, b_texts = list(a_texts), list(b_texts)
+        if not a_texts or not b_texts:
+            return np.zeros((len(a_texts), len(b_texts)), dtype=np.float32)
+        embeddings = self.encode(a_texts + b_texts)
+        return cosine_similarity_matrix(embeddings[:len(a_texts)], embeddings[len(a_texts):])
+
     def similarity(self, a: np.ndarray, b: np.ndarray) -> float:
         """
         Calculate similarity between two embedding vectors.
@@ -95,18 +343,38 @@ class EmbeddingService:
         """
         return self.provider.cosine(a, b)
 
-    def similarity_many(self, query_vec: np.ndarray, doc_vecs: Iterable[np.ndarray]) -> np.ndarray:
+    def similarity_many(
+        self, query_vec: np.ndarray, doc_vecs: Iterable[np.ndarray], assume_normalized: bool = False
+    ) -> np.ndarray:
         """
         Calculate similarities between a query vector and multiple document vectors.
         
         Args:
             query_vec: Single query embedding vector
             doc_vecs: Iterable of document embedding vectors
+            assume_normalized: Skip normalization when both inputs are already L2-normalized
             
         Returns:
             Array of cosine similarity scores
         """
-        return self.provider.cosine_many(query_vec, doc_vecs)
+        return self.provider.cosine_many(query_vec, doc_vecs, assume_normalized)
+
+    def top_k_similar(
+        self, query_vecs: np.ndarray, doc_vecs: Iterable[np.ndarray], k: int, assume_normalized: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the `k` most similar document vectors for one or many queries.
+        
+        Args:
+            query_vecs: Query embedding (dim,) or matrix of queries (n_queries, dim)
+            doc_vecs: Document embeddings (float32 or float16 matrix, or iterable of vectors)
+            k: Number of results per query
+            assume_normalized: Skip normalization when both inputs are already L2-normalized
+            
+        Returns:
+            (indices, scores), best first; shape (k,) for one query, else (n_queries, k)
+        """
+        return top_k(query_vecs, doc_vecs, k, assume_normalized=assume_normalized)
 
     def embed_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[np.ndarray]:
         """
@@ -125,12 +393,33 @@ class EmbeddingService:
             # Fallback for providers without batching support
             return [self.provider.embed(text) for text in texts]
 
+    def to_storage(self, vectors) -> np.ndarray:
+        """
+        Vectors as stored in (and searched against) the `embeddings` table.
+        
+        Args:
+            vectors: Embeddings from this service (one vector or a matrix/list)
+            
+        Returns:
+            Array of shape (n, EMBEDDING_STORAGE_DIM), reduced if EMBEDDING_REDUCTION is set
+        """
+        from .reduction import get_embedding_storage
+
+        return get_embedding_storage().project(vectors, self.model_name)
+
     # Provider information and capabilities
     @property
     def model_name(self) -> str:
         """Get the underlying model name/identifier."""
         return self.provider.model_name
 
+    @property
+    def storage_model_name(self) -> str:
+        """Model name recorded with this service's rows in the `embeddings` table."""
+        from .reduction import get_embedding_storage
+
+        return get_embedding_storage().model_name(self.model_name)
+
     @property
     def supports_batching(self) -> bool:
         """Check if the provider supports efficient batching."""
@@ -138,8 +427,8 @@ class EmbeddingService:
 
     @property
     def provider_type(self) -> str:
-        """Get the provider type name."""
-        return self.provider.__class__.__name__
+        """Get the provider type name (of the underlying provider, not its wrappers)."""
+        return self._provider_chain()[-1].__class__.__name__
 
     def cache_stats(self) -> Optional[dict]:
         """
@@ -148,10 +437,19 @@ class EmbeddingService:
         Returns:
             Cache statistics dict or None if caching is not enabled
         """
+        stats = None
         cache = getattr(self.provider, 'cache', None)
         if cache and hasattr(cache, 'stats'):
-            return cache.stats()
-        return None
+            stats = cache.stats()
+        chain = self._provider_chain()
+        for wrapper in chain[:-1]:
+            stats = {**(stats or {}), wrapper.stats_key: wrapper.stats()}
+        if getattr(chain[-1], 'stats_key', None):
+            # Providers with request statistics (e.g. OpenRouter latency and tokens)
+            stats = {**(stats or {}), chain[-1].stats_key: chain[-1].stats()}
+        if self._bulk_pool is not None:
+            stats = {**(stats or {}), "bulk": self._bulk_pool.stats()}
+        return stats
 
     def clear_cache(self) -> None:
         """Clear the provider's cache if it exists."""
@@ -6,13 +6,41 @@ is used across the entire server, reducing memory usage and improving
 performance through shared caching.
 """
 
+import os
 import threading
 from typing import Optional
 from .service import EmbeddingService
+from .process_pool import default_bulk_workers
 from .factory import EmbeddingProviderFactory
 from .utils import get_embedding_config_from_env
 
 
+def build_embedding_service(provider) -> EmbeddingService:
+    """
+    Wrap a provider in an EmbeddingService with the executor, bulk and
+    micro-batching settings from the environment.
+    
+    Args:
+        provider: Configured embedding provider
+        
+    Returns:
+        EmbeddingService for the provider
+    """
+    bulk_workers = int(os.getenv("EMBEDDING_BULK_WORKERS", "1"))  # 1 = in-process (opt-in), 0 = auto
+    service = EmbeddingService(
+        provider,
+        max_workers=int(os.getenv("EMBEDDING_EXECUTOR_WORKERS", "1")),
+        bulk_workers=bulk_workers or default_bulk_workers(),
+        bulk_min_texts=int(os.getenv("EMBEDDING_BULK_MIN_TEXTS", "256")),
+    )
+    if os.getenv("EMBEDDING_MICROBATCH", "false").lower() in ("1", "true", "yes"):
+        service.enable_micro_batching(
+            max_wait_ms=float(os.getenv("EMBEDDING_MICROBATCH_WAIT_MS", "3")),
+            max_batch=int(os.getenv("EMBEDDING_MICROBATCH_MAX_TEXTS", "64")),
+        )
+    return service
+
+
 class SharedEmbeddingService:
     """
     Singleton wrapper for the embedding service.
@@ -59,7 +87,19 @@ class SharedEmbeddingService:
             **final_config
         )
         
-        return EmbeddingService(provider)
+        # Optional hedged fallback, e.g. a local ONNX model behind the hosted API
+        fallback_type = os.getenv("EMBEDDING_FALLBACK_PROVIDER", "").lower()
+        if fallback_type:
+            _, fallback_config = get_embedding_config_from_env(fallback_type)
+            print(f"🔧 Embedding fallback provider: {fallback_type}")
+            provider = EmbeddingProviderFactory.create_fallback_provider(
+                [provider, EmbeddingProviderFactory.create_provider(provider_type=fallback_type, **fallback_config)],
+                same_embedding_space=os.getenv("EMBEDDING_FALLBACK_SAME_SPACE", "false").lower() in ("1", "true", "yes"),
+                hedge_percentile=float(os.getenv("EMBEDDING_HEDGE_PERCENTILE", "95")),
+                max_hedge_delay_ms=float(os.getenv("EMBEDDING_HEDGE_MAX_DELAY_MS", "2000")),
+            )
+        
+        return build_embedding_service(provider)
     
     @classmethod
     def reset(cls) -> None:
@@ -67,6 +107,7 @@ class SharedEmbeddingService:
         with cls._lock:
             if cls._instance:
                 cls._instance.clear_cache()
+                cls._instance.shutdown(wait=False)
             cls._instance = None
     
     @classmethod
@@ -98,6 +139,11 @@ def reset_embedding_service() -> None:
     SharedEmbeddingService.reset()
 
 
+def is_embedding_service_initialized() -> bool:
+    """Whether the shared embedding service has been created (without creating it)."""
+    return SharedEmbeddingService.is_initialized()
+
+
 def embedding_service_stats() -> Optional[dict]:
     """Get statistics from the shared embedding service."""
     if SharedEmbeddingService.is_initialized():
@@ -0,0 +1,154 @@
+"""
+Vectorized similarity kernels shared by all providers and the service.
+
+Embeddings produced by the providers are L2-normalized, so cosine
+similarity is a plain dot product. The kernels here assume that by default
+(pass `assume_normalized=False` otherwise), never modify their inputs,
+accept single queries or query matrices, and accept float16 corpora, which
+are processed in float32 blocks to bound temporary memory.
+"""
+
+from typing import Iterable, Tuple, Union
+
+import numpy as np
+
+
+VectorsInput = Union[np.ndarray, Iterable[np.ndarray]]
+
+# Corpus rows converted/multiplied per block for float16 corpora and top-k
+_BLOCK_ROWS = 16384
+
+
+def as_matrix(vectors: VectorsInput) -> np.ndarray:
+    """Stack vectors into a 2D array (no copy if already a 2D array)."""
+    if isinstance(vectors, np.ndarray):
+        return vectors if vectors.ndim == 2 else vectors.reshape(1, -1)
+    return np.vstack(list(vectors))
+
+
+def normalize_rows(matrix: np.ndarray, dtype: np.dtype = np.float32) -> np.ndarray:
+    """L2-normalized copy of the rows of `matrix` (zero rows stay zero)."""
+    matrix = np.asarray(matrix, dtype=dtype)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _queries(queries: np.ndarray, assume_normalized: bool) -> Tuple[np.ndarray, bool]:
+    queries = np.asarray(queries)
+    single = queries.ndim == 1
+    queries = queries.reshape(1, -1) if single else queries
+    queries = queries.astype(np.float32, copy=False)
+    if not assume_normalized:
+        queries = normalize_rows(queries)
+    return queries, single
+
+
+def _corpus_blocks(corpus: np.ndarray, assume_normalized: bool, block_rows: int):
+    """Yield (start, float32 block) pairs; float32 normalized corpora are not copied."""
+    if corpus.dtype == np.float32 and assume_normalized and corpus.shape[0] <= block_rows:
+        yield 0, corpus
+        return
+    for start in range(0, corpus.shape[0], block_rows):
+        block = corpus[start:start + block_rows]
+        if not assume_normalized:
+            block = normalize_rows(block)
+        elif block.dtype != np.float32:
+            block = block.astype(np.float32)
+        yield start, block
+
+
+def cosine_scores(
+    queries: np.ndarray,
+    corpus: VectorsInput,
+    assume_normalized: bool = True,
+) -> np.ndarray:
+    """
+    Cosine similarities between queries and every corpus vector.
+
+    Args:
+        queries: One query vector (dim,) or a query matrix (n_queries, dim)
+        corpus: Corpus matrix (n_docs, dim) or iterable of vectors; float32 or float16
+        assume_normalized: Skip normalization (provider outputs are L2-normalized)
+
+    Returns:
+        Scores of shape (n_docs,) for a single query, else (n_queries, n_docs)
+    """
+    corpus = as_matrix(corpus)
+    q, single = _queries(queries, assume_normalized)
+
+    if corpus.dtype == np.float32 and assume_normalized:
+        scores = q @ corpus.T
+    else:
+        scores = np.empty((q.shape[0], corpus.shape[0]), dtype=np.float32)
+        for start, block in _corpus_blocks(corpus, assume_normalized, _BLOCK_ROWS):
+            scores[:, start:start + block.shape[0]] = q @ block.T
+    return scores[0] if single else scores
+
+
+def top_k(
+    queries: np.ndarray,
+    corpus: VectorsInput,
+    k: int,
+    assume_normalized: bool = True,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The `k` most similar corpus vectors for each query, best first.
+
+    Uses `argpartition` per corpus block (O(n) instead of a full sort) and
+    only keeps k candidates per block, so memory stays bounded for large
+    corpora and many queries.
+
+    Args:
+        queries: One query vector (dim,) or a query matrix (n_queries, dim)
+        corpus: Corpus matrix (n_docs, dim) or iterable of vectors; float32 or float16
+        k: Number of neighbours to return (capped at n_docs)
+        assume_normalized: Skip normalization (provider outputs are L2-normalized)
+
+    Returns:
+        (indices, scores), each of shape (k,) for a single query, else (n_queries, k)
+    """
+    corpus = as_matrix(corpus)
+    q, single = _queries(queries, assume_normalized)
+    k = max(0, min(k, corpus.shape[0]))
+
+    candidate_idx = []
+    candidate_scores = []
+    for start, block in _corpus_blocks(corpus, assume_normalized, _BLOCK_ROWS):
+        scores = q @ block.T
+        kb = min(k, block.shape[0])
+        if kb == 0:
+            continue
+        part = np.argpartition(-scores, kb - 1, axis=1)[:, :kb]
+        candidate_idx.append(part + start)
+        candidate_scores.append(np.take_along_axis(scores, part, axis=1))
+
+    if not candidate_idx:
+        empty_idx = np.empty((q.shape[0], 0), dtype=np.int64)
+        empty_scores = np.empty((q.shape[0], 0), dtype=np.float32)
+        return (empty_idx[0], empty_scores[0]) if single else (empty_idx, empty_scores)
+
+    idx = np.concatenate(candidate_idx, axis=1)
+    scores = np.concatenate(candidate_scores, axis=1)
+    if idx.shape[1] > k:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        idx = np.take_along_axis(idx, part, axis=1)
+        scores = np.take_along_axis(scores, part, axis=1)
+
+    order = np.argsort(-scores, axis=1, kind="stable")
+    idx = np.take_along_axis(idx, order, axis=1)
+    scores = np.take_along_axis(scores, order, axis=1)
+    return (idx[0], scores[0]) if single else (idx, scores)
+
+
+def cosine_similarity_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise cosine similarities between the rows of `a` and the rows of `b`.
+
+    Rows are L2-normalized (zero rows stay zero) and compared with a single
+    matrix multiply, so inputs need not be normalized.
+
+    Returns:
+        Array of shape (len(a), len(b))
+    """
+    return normalize_rows(as_matrix(a)) @ normalize_rows(as_matrix(b)).T
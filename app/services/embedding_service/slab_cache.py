@@ -0,0 +1,314 @@
+"""
+Slab-allocated, byte-bounded in-memory embedding cache.
+
+Vectors live in large preallocated NumPy pages ("slabs") of fixed-size rows,
+one slab class per embedding dimension, instead of one small array per
+entry. Memory is bounded in bytes regardless of how many models (and
+dimensions) share the cache. Hits are returned as copies: a slot can be
+evicted and overwritten by the next write, so a view would not stay valid.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base import EmbeddingCache
+
+
+class _SlabClass:
+    """Rows of a single dimension, stored in equally sized pages."""
+
+    def __init__(self, dim: int, dtype: np.dtype, rows_per_page: int):
+        self.dim = dim
+        self.dtype = dtype
+        self.rows_per_page = rows_per_page
+        self.pages: List[np.ndarray] = []
+        self.keys: List[Optional[str]] = []     # Key stored in each slot (None = free)
+        self.referenced = bytearray()           # CLOCK reference bit per slot
+        self.free: List[int] = []
+        self.hand = 0
+        self.recency: "OrderedDict[str, int]" = OrderedDict()  # LRU order (lru eviction only)
+
+    @property
+    def page_bytes(self) -> int:
+        return self.rows_per_page * self.dim * self.dtype.itemsize
+
+    def add_page(self) -> None:
+        page = np.zeros((self.rows_per_page, self.dim), dtype=self.dtype)
+        first_slot = len(self.keys)
+        self.pages.append(page)
+        self.keys.extend([None] * self.rows_per_page)
+        self.referenced.extend(bytes(self.rows_per_page))
+        # Hand out low slots first so pages fill in order
+        self.free.extend(range(first_slot + self.rows_per_page - 1, first_slot - 1, -1))
+
+    def locate(self, slot: int) -> Tuple[int, int]:
+        return divmod(slot, self.rows_per_page)
+
+
+class SlabEmbeddingCache(EmbeddingCache):
+    """
+    Byte-bounded embedding cache backed by contiguous NumPy slabs.
+
+    Features:
+    - Vectors stored as float32 or float16 rows in preallocated pages
+      (no per-entry array objects, predictable memory use)
+    - Memory bounded in bytes across all embedding dimensions
+    - CLOCK (default, no bookkeeping on hits) or exact LRU eviction
+    - Hits are copied out of the slab (one row each), so a returned vector
+      stays valid when its slot is evicted and reused
+    - Stats report real bytes allocated and used
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        dtype: str = "float32",
+        eviction: str = "clock",
+        page_bytes: int = 4 * 1024 * 1024,
+    ):
+        """
+        Initialize slab cache.
+
+        Args:
+            max_bytes: Maximum bytes of slab memory (pages are allocated on demand up to this bound)
+            dtype: Storage precision, 'float32' or 'float16' (half the memory)
+            eviction: Eviction policy, 'clock' or 'lru'
+            page_bytes: Size of each slab page
+        """
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported slab dtype: {dtype}. Use 'float32' or 'float16'")
+        if eviction not in ("clock", "lru"):
+            raise ValueError(f"Unknown eviction policy: {eviction}. Use 'clock' or 'lru'")
+
+        self.max_bytes = max_bytes
+        self.dtype = np.dtype(dtype)
+        self.eviction = eviction
+        self.page_bytes = page_bytes
+
+        self._lock = threading.Lock()
+        self._classes: Dict[int, _SlabClass] = {}
+        self._index: Dict[str, Tuple[_SlabClass, int]] = {}
+        self._allocated_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    # -----------------------------------------------------------------------
+    # EmbeddingCache protocol
+    # -----------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Retrieve embedding from cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Copy of the cached row, or None if not found
+        """
+        with self._lock:
+            return self._get_locked(key)
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Retrieve several embeddings under a single lock acquisition.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Copies of the cached rows in key order, None for each missing key
+        """
+        with self._lock:
+            return [self._get_locked(key) for key in keys]
+
+    def set(self, key: str, value: np.ndarray) -> None:
+        """
+        Store embedding in cache (copied into the slab, cast to the slab dtype).
+
+        Args:
+            key: Cache key
+            value: 1D embedding array
+        """
+        with self._lock:
+            self._set_locked(key, value)
+
+    def set_many(self, keys: List[str], values: List[np.ndarray]) -> None:
+        """
+        Store several embeddings under a single lock acquisition.
+
+        Args:
+            keys: Cache keys
+            values: 1D embedding arrays, aligned with `keys`
+        """
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._set_locked(key, value)
+
+    # -----------------------------------------------------------------------
+    # Internals (caller holds the lock)
+    # -----------------------------------------------------------------------
+
+    def _get_locked(self, key: str) -> Optional[np.ndarray]:
+        entry = self._index.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        slab, slot = entry
+        if self.eviction == "clock":
+            slab.referenced[slot] = 1
+        else:
+            slab.recency.move_to_end(key)
+        self._hits += 1
+        page, row = slab.locate(slot)
+        # Copy: the slot may be evicted and overwritten by a later write
+        return slab.pages[page][row].copy()
+
+    def _set_locked(self, key: str, value: np.ndarray) -> None:
+        vector = np.asarray(value).reshape(-1)
+        dim = vector.shape[0]
+
+        entry = self._index.get(key)
+        if entry is not None and entry[0].dim != dim:
+            self._remove_locked(key)
+            entry = None
+
+        if entry is None:
+            slab = self._slab_class(dim)
+            slot = self._allocate_slot(slab)
+            if slot is None:
+                return  # A single row does not fit in the byte budget
+            slab.keys[slot] = key
+            self._index[key] = (slab, slot)
+        else:
+            slab, slot = entry
+
+        page, row = slab.locate(slot)
+        slab.pages[page][row] = vector
+        if self.eviction == "clock":
+            slab.referenced[slot] = 1
+        else:
+            slab.recency[key] = slot
+            slab.recency.move_to_end(key)
+
+    def _slab_class(self, dim: int) -> _SlabClass:
+        slab = self._classes.get(dim)
+        if slab is None:
+            row_bytes = dim * self.dtype.itemsize
+            rows_per_page = max(1, min(self.page_bytes, self.max_bytes) // row_bytes)
+            slab = _SlabClass(dim, self.dtype, rows_per_page)
+            self._classes[dim] = slab
+        return slab
+
+    def _allocate_slot(self, slab: _SlabClass) -> Optional[int]:
+        """Free slot in `slab`: reuse, grow by a page, or evict."""
+        if slab.free:
+            return slab.free.pop()
+
+        if self._allocated_bytes + slab.page_bytes <= self.max_bytes:
+            slab.add_page()
+            self._allocated_bytes += slab.page_bytes
+            return slab.free.pop()
+
+        if slab.pages:
+            return self._evict_one(slab)
+
+        # Budget is held by other dimensions: release pages of the largest classes
+        while self._allocated_bytes + slab.page_bytes > self.max_bytes:
+            donor = max(self._classes.values(), key=lambda c: len(c.pages) * c.page_bytes)
+            if not donor.pages:
+                return None
+            self._release_last_page(donor)
+        slab.add_page()
+        self._allocated_bytes += slab.page_bytes
+        return slab.free.pop()
+
+    def _evict_one(self, slab: _SlabClass) -> int:
+        """Evict one entry of `slab` and return its (now free) slot."""
+        if self.eviction == "lru":
+            key, slot = slab.recency.popitem(last=False)
+        else:
+            n_slots = len(slab.keys)
+            while True:
+                slot = slab.hand
+                slab.hand = (slab.hand + 1) % n_slots
+                if slab.keys[slot] is None:
+                    break
+                if slab.referenced[slot]:
+                    slab.referenced[slot] = 0
+                    continue
+                break
+            key = slab.keys[slot]
+        if key is not None:
+            del self._index[key]
+            slab.keys[slot] = None
+            self._evictions += 1
+        slab.referenced[slot] = 0
+        return slot
+
+    def _release_last_page(self, slab: _SlabClass) -> None:
+        first_slot = (len(slab.pages) - 1) * slab.rows_per_page
+        for slot in range(first_slot, len(slab.keys)):
+            key = slab.keys[slot]
+            if key is not None:
+                del self._index[key]
+                slab.recency.pop(key, None)
+                self._evictions += 1
+        slab.pages.pop()
+        del slab.keys[first_slot:]
+        del slab.referenced[first_slot:]
+        slab.free = [slot for slot in slab.free if slot < first_slot]
+        slab.hand = 0
+        self._allocated_bytes -= slab.page_bytes
+
+    def _remove_locked(self, key: str) -> None:
+        slab, slot = self._index.pop(key)
+        slab.keys[slot] = None
+        slab.referenced[slot] = 0
+        slab.recency.pop(key, None)
+        slab.free.append(slot)
+
+    # -----------------------------------------------------------------------
+    # Maintenance and stats
+    # -----------------------------------------------------------------------
+
+    def clear(self) -> None:
+        """Remove every entry and release all slab memory."""
+        with self._lock:
+            self._classes.clear()
+            self._index.clear()
+            self._allocated_bytes = 0
+
+    def size(self) -> int:
+        """Get current number of cached entries."""
+        with self._lock:
+            return len(self._index)
+
+    def stats(self) -> dict:
+        """Get cache statistics (bytes are actual slab memory, not estimates)."""
+        with self._lock:
+            used = sum(
+                (len(slab.keys) - len(slab.free)) * slab.dim * self.dtype.itemsize
+                for slab in self._classes.values()
+            )
+            lookups = self._hits + self._misses
+            return {
+                "type": "slab",
+                "size": len(self._index),
+                "dtype": self.dtype.name,
+                "eviction": self.eviction,
+                "dimensions": sorted(self._classes),
+                "bytes_allocated": self._allocated_bytes,
+                "bytes_used": used,
+                "max_bytes": self.max_bytes,
+                "utilization": self._allocated_bytes / self.max_bytes if self.max_bytes > 0 else 0,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+            }
@@ -5,11 +5,13 @@ Contains helper functions for model setup and configuration.
 """
 
 import os
+from typing import Iterable, Optional
 
 
 def setup_onnx_model(
     model_id: str = "sentence-transformers/all-MiniLM-L6-v2",
-    output_dir: str = "./onnx-model"
+    output_dir: str = "./onnx-model",
+    variants: Iterable[str] = ("fp32",)
 ) -> None:
     """
     Setup ONNX model for local inference (run this once to export the model).
@@ -17,6 +19,8 @@ def setup_onnx_model(
     Args:
         model_id: Sentence transformer model ID to export
         output_dir: Directory to save the ONNX model
+        variants: Precision variants to produce ('fp32', 'int8', 'fp16');
+            the FP32 model is always exported since the others derive from it
     """
     try:
         from transformers import AutoTokenizer
@@ -40,20 +44,74 @@ def setup_onnx_model(
     print(f"ONNX model exported to {output_dir}")
     print("Note: This model requires mean pooling in the encode() method for sentence embeddings.")
 
+    create_onnx_variants(output_dir, [v for v in variants if v != "fp32"])
 
-def get_embedding_config_from_env() -> dict:
+
+def create_onnx_variants(model_dir: str, variants: Iterable[str]) -> None:
+    """
+    Derive reduced-precision variants from an exported FP32 `model.onnx`.
+    
+    - int8: dynamic quantization (INT8 weights, activations quantized at runtime)
+    - fp16: FP16 weights with FP32 inputs/outputs (halves the file size; on CPU
+      it mostly saves memory, not time)
+    
+    Args:
+        model_dir: Directory containing the FP32 model.onnx
+        variants: Variants to create ('int8', 'fp16')
+    """
+    from .providers.onnx import MODEL_VARIANT_FILES
+
+    source = os.path.join(model_dir, MODEL_VARIANT_FILES["fp32"])
+    for variant in variants:
+        if variant not in MODEL_VARIANT_FILES:
+            raise ValueError(f"Unknown model variant '{variant}'. Choose from: {', '.join(MODEL_VARIANT_FILES)}")
+        target = os.path.join(model_dir, MODEL_VARIANT_FILES[variant])
+
+        if variant == "int8":
+            try:
+                from onnxruntime.quantization import quantize_dynamic, QuantType
+            except ImportError:
+                raise ImportError("INT8 quantization requires onnxruntime. Install with: pip install onnxruntime")
+            quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+        elif variant == "fp16":
+            try:
+                import onnx
+                from onnxruntime.transformers.float16 import convert_float_to_float16
+            except ImportError:
+                raise ImportError(
+                    "FP16 conversion requires onnx and onnxruntime. "
+                    "Install with: pip install onnx onnxruntime"
+                )
+            model = convert_float_to_float16(onnx.load(source), keep_io_types=True)
+            onnx.save(model, target)
+        else:
+            continue  # fp32 is the source model
+
+        size_mb = os.path.getsize(target) / (1024 * 1024)
+        print(f"Created {variant} variant: {target} ({size_mb:.1f} MB)")
+
+
+def get_embedding_config_from_env(provider_type: Optional[str] = None) -> dict:
     """
     Get embedding service configuration from environment variables.
     
+    Args:
+        provider_type: Provider to configure (default: EMBEDDING_PROVIDER)
+    
     Returns:
         Configuration dictionary for EmbeddingProviderFactory
     """
-    provider_type = os.getenv("EMBEDDING_PROVIDER", "huggingface").lower()
+    provider_type = (provider_type or os.getenv("EMBEDDING_PROVIDER", "huggingface")).lower()
     
     base_config = {
         "cache_config": {
+            "type": os.getenv("EMBEDDING_CACHE_TYPE", "lru").lower(),
             "capacity": int(os.getenv("EMBEDDING_CACHE_CAPACITY", "10000")),
-            "ttl_seconds": int(os.getenv("EMBEDDING_CACHE_TTL", "3600"))
+            "ttl_seconds": int(os.getenv("EMBEDDING_CACHE_TTL", "3600")),
+            "path": os.getenv("EMBEDDING_CACHE_PATH", "./embedding-cache/embeddings.sqlite"),
+            "max_bytes": int(os.getenv("EMBEDDING_CACHE_MAX_MB", "1024")) * 1024 * 1024,
+            "dtype": os.getenv("EMBEDDING_CACHE_DTYPE", "float32").lower(),
+            "eviction": os.getenv("EMBEDDING_CACHE_EVICTION", "clock").lower()
         }
     }
     
@@ -62,16 +120,38 @@ def get_embedding_config_from_env() -> dict:
         base_config.update({
             "model": os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
             "api_key": os.getenv("HF_TOKEN"),
-            "batch_size": int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+            "batch_size": int(os.getenv("EMBEDDING_BATCH_SIZE", "32")),
+            "max_concurrency": int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4")),
+            "max_retries": int(os.getenv("EMBEDDING_MAX_RETRIES", "3")),
+            "base_url": os.getenv("HF_INFERENCE_URL") or None
         })
     elif provider_type == "openrouter":
         base_config.update({
             "model_name": os.getenv("EMBEDDING_MODEL", "openai/text-embedding-3-small"),
-            "api_key": os.getenv("OPENROUTER_API_KEY")
+            "api_key": os.getenv("OPENROUTER_API_KEY"),
+            "batch_size": int(os.getenv("EMBEDDING_BATCH_SIZE", "64")),
+            "max_concurrency": int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4")),
+            "max_retries": int(os.getenv("EMBEDDING_MAX_RETRIES", "3")),
+            "api_base": os.getenv("OPENROUTER_API_BASE", "https://openrouter.ai/api/v1")
+        })
+    elif provider_type in ("onnx", "onnx_minilm"):
+        base_config.update({
+            "model_dir": os.getenv("ONNX_MODEL_DIR", "./onnx-model"),
+            "batch_size": int(os.getenv("EMBEDDING_BATCH_SIZE", "32")),
+            "max_length": int(os.getenv("ONNX_MAX_LENGTH", "256")),
+            # ONNX Runtime session tuning (0 threads = ONNX Runtime default, one per core)
+            "intra_op_threads": int(os.getenv("ONNX_INTRA_OP_THREADS", "0")),
+            "inter_op_threads": int(os.getenv("ONNX_INTER_OP_THREADS", "0")),
+            "graph_optimization": os.getenv("ONNX_GRAPH_OPTIMIZATION", "all").lower(),
+            "execution_mode": os.getenv("ONNX_EXECUTION_MODE", "sequential").lower(),
+            "enable_mem_arena": os.getenv("ONNX_MEM_ARENA", "true").lower() in ("1", "true", "yes"),
+            "optimized_model_dir": os.getenv("ONNX_OPTIMIZED_MODEL_DIR", "./onnx-cache") or None,
+            "variant": os.getenv("ONNX_MODEL_VARIANT", "fp32").lower(),
+            "tokenizer_backend": os.getenv("ONNX_TOKENIZER", "auto").lower()
         })
-    elif provider_type == "onnx":
+    elif provider_type == "stub":
         base_config.update({
-            "model_dir": os.getenv("ONNX_MODEL_DIR", "./onnx-model")
+            "dim": int(os.getenv("EMBEDDING_STUB_DIM", "384"))
         })
     
     return provider_type, base_config
\ No newline at end of file
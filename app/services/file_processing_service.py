@@ -104,7 +104,7 @@ class FileProcessingService:
         
         return chunks
     
-    def generate_embeddings_efficiently(self, document: DocumentLibrary, db: Session) -> None:
+    async def generate_embeddings_efficiently(self, document: DocumentLibrary, db: Session) -> None:
         """Generate embeddings for document content using the provider's built-in batching."""
         
         document.embedding_status = "processing"
@@ -118,16 +118,12 @@ class FileProcessingService:
             # Chunk document if needed
             chunks = self.chunk_text(document.content, max_chunk_size=1000)
             
-            # Generate embeddings efficiently - the embed method handles batching internally
-            all_embeddings = embedding_service.encode(chunks)
+            # Generate embeddings without blocking the event loop - large documents
+            # are sharded across the bulk worker processes (ONNX), small ones batched in-process
+            all_embeddings = await embedding_service.embed_bulk_async(chunks)
             
-            # Convert to list format for storage
-            if len(chunks) == 1:
-                # Single chunk case - encode returns 2D array with 1 row
-                embeddings_list = [all_embeddings[0].tolist()]
-            else:
-                # Multiple chunks - encode returns 2D array with multiple rows
-                embeddings_list = [embedding.tolist() for embedding in all_embeddings]
+            # Convert to list format for storage (one vector per chunk, reduced if configured)
+            embeddings_list = [embedding.tolist() for embedding in embedding_service.to_storage(all_embeddings)]
             
             # Store all embeddings in batch
             embedding_objects = []
@@ -140,7 +136,7 @@ class FileProcessingService:
                     owner_agent=None,  # Unassigned
                     run_id=None,  # Unassigned
                     embedding=embedding_vector,
-                    embedding_model=embedding_service.model_name,
+                    embedding_model=embedding_service.storage_model_name,
                     chunk_index=i if len(chunks) > 1 else None,
                     chunk_start=None,  # Could calculate if needed
                     chunk_end=None,
@@ -1,6 +1,9 @@
 import os
 import asyncio
-from typing import Dict, Tuple, List
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Tuple, List, Optional
 from uuid import UUID
 from datetime import datetime
 import numpy as np
@@ -11,7 +14,97 @@ import dspy
 from app.classes.simulation import Simulation, InternalAgentConfig
 from app.models import Run, Intervention, ToolUsage, Embedding
 from app.api.schemas import CreateSimRequest
-from app.services.embedding_service import get_embedding_service
+from app.services.embedding_service import (
+    acquire_run_embedding_service,
+    get_embedding_service,
+    release_run_embedding_service,
+)
+
+
+@dataclass
+class StepRecord:
+    """Everything needed to persist one simulation step, captured before the next step mutates agent state."""
+    iteration: int
+    step_result: Dict[str, Any]
+    tool_usage: Optional[Dict[str, Any]]
+    prediction_metadata: Optional[Dict[str, Any]]
+    embeddings: Optional[np.ndarray] = None  # Filled in by the writer before persisting
+    embedding_model: Optional[str] = None
+
+    def texts_to_embed(self) -> List[str]:
+        """Intervention text followed by each tool query and output, in persistence order."""
+        texts = [self.step_result["opinion"]]
+        if self.tool_usage and self.tool_usage.get("tools_used"):
+            for tool_data in self.tool_usage["tools_used"]:
+                texts.append(tool_data.get("query", ""))
+                texts.append(str(tool_data.get("result", "")))
+        return texts
+
+
+class StepWriter:
+    """
+    Write-behind persistence for simulation steps.
+
+    Features:
+    - A dedicated writer task persists step N while step N+1 is generating
+    - Writes run on a single writer thread, so commits happen in step order
+    - Bounded buffering: at most `max_pending` steps are unpersisted at any time,
+      so a crash loses at most that many steps (default: the in-flight one)
+    - Optional async `prepare` hook (e.g. embedding) awaited before each write,
+      so no work that can be done up front happens inside the DB transaction
+    """
+
+    def __init__(
+        self,
+        persist: Callable[[StepRecord], None],
+        max_pending: int = 1,
+        prepare: Optional[Callable[[StepRecord], Awaitable[None]]] = None,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            persist: Blocking function that persists and commits one step
+            max_pending: Maximum number of submitted steps not yet committed
+            prepare: Optional coroutine function run on the writer task before `persist`
+        """
+        self._persist = persist
+        self._prepare = prepare
+        self._slots = asyncio.Semaphore(max(1, max_pending))
+        self._queue: "asyncio.Queue[Optional[StepRecord]]" = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="step-writer")
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, record: StepRecord) -> None:
+        """Buffer a step for persistence, waiting while the buffer is full."""
+        await self._slots.acquire()
+        if self._task.done():
+            self._slots.release()
+            self._task.result()  # Re-raise the writer's failure
+            raise RuntimeError("Step writer is closed")
+        self._queue.put_nowait(record)
+
+    async def close(self) -> None:
+        """Flush all buffered steps and stop the writer."""
+        if not self._task.done():
+            self._queue.put_nowait(None)
+        try:
+            await self._task
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            record = await self._queue.get()
+            if record is None:
+                return
+            try:
+                if self._prepare is not None:
+                    await self._prepare(record)
+                await loop.run_in_executor(self._executor, self._persist, record)
+            finally:
+                self._slots.release()
 
 
 class SimulationService:
@@ -60,6 +153,9 @@ class SimulationService:
 
     async def run_simulation_background(self, run_id: UUID, config: CreateSimRequest):
         """Run simulation in background, storing events in database"""
+        writer: Optional[StepWriter] = None
+        simulation: Optional[Simulation] = None
+        embedding_service = None
         try:
             print(f"Starting simulation {run_id}")
             
@@ -93,6 +189,12 @@ class SimulationService:
                     recall_tools=recall_config
                 ))
             
+            # Resolve and hold the run's embedding model (creating it may load a model, so off the loop)
+            embedding_service = await asyncio.to_thread(
+                acquire_run_embedding_service, config.embedding_model, config.embedding_config
+            )
+            print(f"Simulation {run_id} embeddings: {embedding_service.provider_type} ({embedding_service.model_name})")
+            
             # Create simulation
             simulation = Simulation(
                 topic=config.topic,
@@ -106,13 +208,20 @@ class SimulationService:
                 bias=config.bias,
                 stance=config.stance,
                 max_interventions_per_agent=config.max_interventions_per_agent,
+                speculative=config.speculative_speaker,
+                embedding_service=embedding_service,
             )
             
-            # Start simulation
-            simulation.start()
+            # Start simulation (document assignment may re-embed chunks for the run's model)
+            await asyncio.to_thread(simulation.start)
             print(f"Simulation {run_id} initialized with {len(agent_configs)} agents")
             
-            # Run step by step, storing each event
+            # Run step by step, storing each event through the write-behind writer
+            writer = StepWriter(
+                lambda record: self._persist_step(run_id, record),
+                max_pending=int(os.getenv("SIMULATION_MAX_PENDING_WRITES", "1")),
+                prepare=functools.partial(self._embed_step, embedding_service=embedding_service),
+            )
             iteration_counter = 0
             while not simulation._finished:
                 # Check if user requested stop (use short-lived session)
@@ -148,126 +257,20 @@ class SimulationService:
 
                 print(f"Simulation {run_id} - Step {iteration_counter}: {step_result['speaker']}")
 
-                # Store intervention and tool usage in database
-                with Session(self._engine) as db:
-                    # Create new Intervention with tool usage and reasoning data
-                    intervention = Intervention(
-                        run_id=run_id,
-                        iteration=iteration_counter,
-                        speaker=step_result["speaker"],
-                        content=step_result["opinion"],  # "opinion" -> "content" 
-                        engaged_agents=step_result["engaged"],
-                        reasoning_steps=tool_usage.get("reasoning_steps", []) if tool_usage else None,
-                        prediction_metadata=prediction_metadata,  # Store extra metadata as JSON
-                        finished=step_result["finished"],
-                        stopped_reason=step_result["stopped_reason"]
-                    )
-                    
-                    try:
-                        db.add(intervention)
-                        db.flush()  # Get the intervention ID without committing
-                        
-                        # Store tool usage if present
-                        tool_usage_records = []
-                        if tool_usage and tool_usage.get("tools_used"):
-                            for tool_data in tool_usage["tools_used"]:
-                                tool_usage_record = ToolUsage(
-                                    intervention_id=intervention.id,
-                                    agent_name=step_result["speaker"],
-                                    tool_name=tool_data.get("tool_name", "unknown"),
-                                    query=tool_data.get("query", ""),
-                                    output=str(tool_data.get("result", "")),
-                                    raw_results=tool_data,  # Store full tool data for debugging
-                                    execution_time=tool_data.get("execution_time")
-                                )
-                                db.add(tool_usage_record)
-                                tool_usage_records.append(tool_usage_record)
-                        
-                        db.flush()  # Get tool usage IDs without committing
-                        
-                        # Generate and store embeddings
-                        try:
-                            embedding_service = get_embedding_service()
-                            
-                            # Collect all texts for batch embedding
-                            texts_to_embed = []
-                            embedding_metadata = []
-                            
-                            # 1. Add intervention text (PUBLIC)
-                            texts_to_embed.append(intervention.content)
-                            embedding_metadata.append({
-                                'type': 'intervention',
-                                'source_id': intervention.id,
-                                'text_content': intervention.content,
-                                'visibility': 'public',
-                                'owner_agent': None,
-                                'run_id': intervention.run_id
-                            })
-                            
-                            # 2. Add tool usage texts (PRIVATE)
-                            for tool_usage_record in tool_usage_records:
-                                # Tool query
-                                texts_to_embed.append(tool_usage_record.query)
-                                embedding_metadata.append({
-                                    'type': 'tool_query',
-                                    'source_id': tool_usage_record.id,
-                                    'text_content': tool_usage_record.query,
-                                    'visibility': 'private',
-                                    'owner_agent': tool_usage_record.agent_name,
-                                    'run_id': intervention.run_id
-                                })
-                                
-                                # Tool output
-                                texts_to_embed.append(tool_usage_record.output)
-                                embedding_metadata.append({
-                                    'type': 'tool_output',
-                                    'source_id': tool_usage_record.id,
-                                    'text_content': tool_usage_record.output,
-                                    'visibility': 'private',
-                                    'owner_agent': tool_usage_record.agent_name,
-                                    'run_id': intervention.run_id
-                                })
-                            
-                            # Generate all embeddings in one batch
-                            if texts_to_embed:
-                                embeddings = embedding_service.encode(texts_to_embed)
-                                
-                                # Create embedding records with batch results
-                                for i, metadata in enumerate(embedding_metadata):
-                                    embedding_vector = embeddings[i].tolist() if embeddings.ndim > 1 else embeddings.tolist()
-                                    
-                                    db.add(Embedding(
-                                        source_type=metadata['type'],
-                                        source_id=metadata['source_id'],
-                                        text_content=metadata['text_content'],
-                                        visibility=metadata['visibility'],
-                                        owner_agent=metadata['owner_agent'],
-                                        run_id=metadata['run_id'],
-                                        embedding=embedding_vector,
-                                        embedding_model=embedding_service.model_name
-                                    ))
-                                
-                        except Exception as embed_err:
-                            print(f"Warning: Could not generate embeddings: {embed_err}")
-                        
-                        # Update run progress
-                        run = db.get(Run, run_id)
-                        run.iters = iteration_counter
-                        run.finished = step_result["finished"]
-                        run.stopped_reason = step_result["stopped_reason"]
-                        db.add(run)
-                        
-                        db.commit()
-                    except Exception as db_err:
-                        print(f"Database error in simulation {run_id}: {db_err}")
-                        db.rollback()
-                        # Continue with the simulation even if one event fails
+                # Hand persistence to the writer; generation of the next step starts
+                # as soon as the write is buffered (blocks only when the buffer is full)
+                await writer.submit(StepRecord(
+                    iteration=iteration_counter,
+                    step_result=step_result,
+                    tool_usage=tool_usage,
+                    prediction_metadata=prediction_metadata,
+                ))
                 
                 if step_result["finished"]:
                     break
-                
-                # Yield control back to the event loop to handle other requests
-                await asyncio.sleep(0.1)
+            
+            # Wait for buffered steps to be committed before finalizing the run
+            await writer.close()
             
             # Mark as finished (use short-lived session)
             with Session(self._engine) as db:
@@ -278,12 +281,17 @@ class SimulationService:
                 db.commit()
             
             print(f"Simulation {run_id} completed")
-            
-            # Cleanup
-            del simulation
+            if simulation.speculative:
+                print(f"Simulation {run_id} speculation: {simulation.speculation_report()}")
             
         except Exception as e:
             print(f"Error in simulation {run_id}: {str(e)}")
+            # Keep the steps that were already generated
+            if writer is not None:
+                try:
+                    await writer.close()
+                except Exception as writer_error:
+                    print(f"Failed to flush pending steps for simulation {run_id}: {writer_error}")
             # Mark as failed with proper error handling (use short-lived session)
             try:
                 with Session(self._engine) as db:
@@ -296,6 +304,144 @@ class SimulationService:
                         db.commit()
             except Exception as db_error:
                 print(f"Failed to update failed simulation status: {db_error}")
+        finally:
+            # User stops and errors leave the debate unfinished: stop any speculative generation
+            if simulation is not None:
+                simulation.close()
+            if embedding_service is not None:
+                release_run_embedding_service(embedding_service)
+
+    async def _embed_step(self, record: StepRecord, embedding_service=None) -> None:
+        """Embed the step's texts on the embedding executor, before any DB transaction is opened."""
+        try:
+            embedding_service = embedding_service or get_embedding_service()
+            vectors = await embedding_service.encode_async(record.texts_to_embed())
+            record.embeddings = embedding_service.to_storage(vectors)  # Reduced if EMBEDDING_REDUCTION is set
+            record.embedding_model = embedding_service.storage_model_name
+        except Exception as embed_err:
+            print(f"Warning: Could not generate embeddings: {embed_err}")
+
+    def _persist_step(self, run_id: UUID, record: StepRecord) -> None:
+        """
+        Persist one simulation step: intervention, tool usages, embeddings and run progress.
+        Called from the `StepWriter` thread, one step at a time and in step order.
+        """
+        step_result = record.step_result
+        tool_usage = record.tool_usage
+        prediction_metadata = record.prediction_metadata
+        iteration_counter = record.iteration
+
+        # Store intervention and tool usage in database
+        with Session(self._engine) as db:
+            # Create new Intervention with tool usage and reasoning data
+            intervention = Intervention(
+                run_id=run_id,
+                iteration=iteration_counter,
+                speaker=step_result["speaker"],
+                content=step_result["opinion"],  # "opinion" -> "content" 
+                engaged_agents=step_result["engaged"],
+                reasoning_steps=tool_usage.get("reasoning_steps", []) if tool_usage else None,
+                prediction_metadata=prediction_metadata,  # Store extra metadata as JSON
+                finished=step_result["finished"],
+                stopped_reason=step_result["stopped_reason"]
+            )
+
+            try:
+                db.add(intervention)
+                db.flush()  # Get the intervention ID without committing
+
+                # Store tool usage if present
+                tool_usage_records = []
+                if tool_usage and tool_usage.get("tools_used"):
+                    for tool_data in tool_usage["tools_used"]:
+                        tool_usage_record = ToolUsage(
+                            intervention_id=intervention.id,
+                            agent_name=step_result["speaker"],
+                            tool_name=tool_data.get("tool_name", "unknown"),
+                            query=tool_data.get("query", ""),
+                            output=str(tool_data.get("result", "")),
+                            raw_results=tool_data,  # Store full tool data for debugging
+                            execution_time=tool_data.get("execution_time")
+                        )
+                        db.add(tool_usage_record)
+                        tool_usage_records.append(tool_usage_record)
+
+                db.flush()  # Get tool usage IDs without committing
+
+                # Store embeddings
+                try:
+                    # Collect all texts for batch embedding
+                    texts_to_embed = []
+                    embedding_metadata = []
+
+                    # 1. Add intervention text (PUBLIC)
+                    texts_to_embed.append(intervention.content)
+                    embedding_metadata.append({
+                        'type': 'intervention',
+                        'source_id': intervention.id,
+                        'text_content': intervention.content,
+                        'visibility': 'public',
+                        'owner_agent': None,
+                        'run_id': intervention.run_id
+                    })
+
+                    # 2. Add tool usage texts (PRIVATE)
+                    for tool_usage_record in tool_usage_records:
+                        # Tool query
+                        texts_to_embed.append(tool_usage_record.query)
+                        embedding_metadata.append({
+                            'type': 'tool_query',
+                            'source_id': tool_usage_record.id,
+                            'text_content': tool_usage_record.query,
+                            'visibility': 'private',
+                            'owner_agent': tool_usage_record.agent_name,
+                            'run_id': intervention.run_id
+                        })
+
+                        # Tool output
+                        texts_to_embed.append(tool_usage_record.output)
+                        embedding_metadata.append({
+                            'type': 'tool_output',
+                            'source_id': tool_usage_record.id,
+                            'text_content': tool_usage_record.output,
+                            'visibility': 'private',
+                            'owner_agent': tool_usage_record.agent_name,
+                            'run_id': intervention.run_id
+                        })
+
+                    # Embeddings were computed ahead of the transaction (see `_embed_step`)
+                    embeddings = record.embeddings
+                    if embeddings is not None and len(embeddings) == len(texts_to_embed):
+                        # Create embedding records with batch results
+                        for i, metadata in enumerate(embedding_metadata):
+                            embedding_vector = embeddings[i].tolist() if embeddings.ndim > 1 else embeddings.tolist()
+
+                            db.add(Embedding(
+                                source_type=metadata['type'],
+                                source_id=metadata['source_id'],
+                                text_content=metadata['text_content'],
+                                visibility=metadata['visibility'],
+                                owner_agent=metadata['owner_agent'],
+                                run_id=metadata['run_id'],
+                                embedding=embedding_vector,
+                                embedding_model=record.embedding_model
+                            ))
+
+                except Exception as embed_err:
+                    print(f"Warning: Could not store embeddings: {embed_err}")
+
+                # Update run progress
+                run = db.get(Run, run_id)
+                run.iters = iteration_counter
+                run.finished = step_result["finished"]
+                run.stopped_reason = step_result["stopped_reason"]
+                db.add(run)
+
+                db.commit()
+            except Exception as db_err:
+                print(f"Database error in simulation {run_id}: {db_err}")
+                db.rollback()
+                # Continue with the simulation even if one event fails
 
     async def trigger_voting(self, run_id: UUID, db: Session) -> Tuple[int, int, List[str]]:
         """Trigger voting for a completed simulation using stored Interventions"""
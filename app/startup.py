@@ -0,0 +1,114 @@
+"""
+Background startup work and readiness.
+
+Loading the embedding model, creating tables and prefetching the OpenRouter
+model list used to run inside the lifespan before the server accepted
+connections. They now run as background tasks: `/healthz` (liveness) answers
+as soon as the process serves requests, while `/readyz` (readiness) only
+succeeds once every required task has finished, so orchestrators can route
+traffic and restart hung processes independently.
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+
+@dataclass
+class _Task:
+    func: Callable[[], Any]
+    required: bool
+    state: str = "pending"  # pending | running | done | failed
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+class StartupTasks:
+    """
+    Named startup tasks, run concurrently after the server starts.
+
+    Features:
+    - Sync tasks run in worker threads, async tasks on the event loop, so
+      a slow model load never blocks request handling
+    - Required tasks gate readiness; optional ones (e.g. a cache prefetch)
+      are only reported
+    - Per-task state, duration and error for `/readyz`
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, _Task] = {}
+        self._started_at = time.perf_counter()
+        self._ready_after: Optional[float] = None
+        self._runner: Optional[asyncio.Task] = None
+
+    def add(self, name: str, func: Callable[[], Any], required: bool = True) -> None:
+        """
+        Register a task (before `start()`).
+
+        Args:
+            name: Task name shown in `/readyz`
+            func: Callable or coroutine function doing the work
+            required: Whether readiness waits for this task
+        """
+        self._tasks[name] = _Task(func, required)
+
+    async def _run_one(self, task: _Task) -> None:
+        task.state = "running"
+        started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(task.func):
+                await task.func()
+            else:
+                await asyncio.to_thread(task.func)
+            task.state = "done"
+        except Exception as e:
+            task.state = "failed"
+            task.error = str(e)
+        task.seconds = round(time.perf_counter() - started, 3)
+
+    async def run(self) -> None:
+        """Run all tasks concurrently and wait for them."""
+        await asyncio.gather(*(self._run_one(task) for task in self._tasks.values()))
+        if self.ready:
+            self._ready_after = round(time.perf_counter() - self._started_at, 3)
+
+    def start(self) -> asyncio.Task:
+        """Run the tasks in the background."""
+        self._runner = asyncio.create_task(self.run())
+        return self._runner
+
+    async def wait(self) -> None:
+        """Wait until the background tasks have finished."""
+        if self._runner is not None:
+            await asyncio.shield(self._runner)
+
+    async def stop(self) -> None:
+        """Stop waiting for unfinished tasks (worker threads finish on their own)."""
+        if self._runner is not None and not self._runner.done():
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def ready(self) -> bool:
+        return all(task.state == "done" for task in self._tasks.values() if task.required)
+
+    def status(self) -> dict:
+        """Readiness and per-task state, duration and error."""
+        return {
+            "ready": self.ready,
+            "ready_after_s": self._ready_after,
+            "tasks": {
+                name: {
+                    "state": task.state,
+                    "required": task.required,
+                    "seconds": task.seconds,
+                    "error": task.error,
+                }
+                for name, task in self._tasks.items()
+            },
+        }
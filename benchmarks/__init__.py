@@ -0,0 +1 @@
+"""Performance benchmarks for the debate engine (see benchmarks/README.md)."""
@@ -0,0 +1,129 @@
+"""
+Shared helpers for the debate engine benchmarks.
+
+Builds database-less `Simulation` instances driven by a zero-latency `StubLM`
+and the hash-seeded `stub` embedding provider, so that measurements reflect
+engine overhead only (no network, no model inference).
+
+Also runnable as a module to profile one configuration in a fresh process,
+which is how the suite obtains a clean peak RSS per debate size:
+
+    python -m benchmarks._engine --agents 50 --steps 6
+"""
+
+import os
+
+os.environ.setdefault("EMBEDDING_PROVIDER", "stub")
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import resource
+import sys
+import time
+import tracemalloc
+import uuid
+from typing import Any, Dict
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+import dspy
+
+from app.classes.simulation import Simulation, InternalAgentConfig
+from app.classes.stub_lm import StubLM
+
+
+DEFAULT_STEPS = 6
+
+
+def build_simulation(n_agents: int, steps: int = DEFAULT_STEPS, seed: int = 0) -> Simulation:
+    """
+    Build and start a simulation that runs exactly `steps` steps.
+
+    Every agent always raises its hand, so the debate only stops on the
+    `max_iters` limit (stub embeddings are near-orthogonal, so the
+    convergence check never fires).
+    """
+    lm = StubLM(seed=seed, raise_hand_rate=1.0)
+    dspy.configure(lm=lm)
+    random.seed(seed)
+
+    sim = Simulation(
+        topic="Should cities ban private cars from their historic centres?",
+        agent_configs=[
+            InternalAgentConfig(name=f"Agent{i}", profile=f"Citizen {i} with a distinct point of view")
+            for i in range(n_agents)
+        ],
+        lm=lm,
+        api_base="",
+        api_key="",
+        run_id=uuid.uuid4(),
+        db_engine=None,
+        max_iters=steps,
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim.start()
+    return sim
+
+
+def run_simulation(sim: Simulation) -> int:
+    """Run a started simulation to completion and return the number of steps executed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim.run()
+    return len(sim.opiniones)
+
+
+def profile_run(n_agents: int, steps: int = DEFAULT_STEPS, seed: int = 0) -> Dict[str, Any]:
+    """
+    Profile one full debate in the current process.
+
+    Returns:
+        Dict with steps/sec, net allocations per step (tracemalloc) and peak RSS
+    """
+    sim = build_simulation(n_agents, steps=steps, seed=seed)
+
+    started = time.perf_counter()
+    executed = run_simulation(sim)
+    elapsed = time.perf_counter() - started
+
+    # Second, traced run: tracemalloc slows execution, so it is kept out of the timing
+    sim = build_simulation(n_agents, steps=steps, seed=seed)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    traced_steps = run_simulation(sim)
+    after = tracemalloc.take_snapshot()
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    diff = after.compare_to(before, "filename")
+    net_blocks = sum(stat.count_diff for stat in diff)
+    net_bytes = sum(stat.size_diff for stat in diff)
+
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mib = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+
+    return {
+        "agents": n_agents,
+        "steps": executed,
+        "seconds": round(elapsed, 4),
+        "steps_per_sec": round(executed / elapsed, 3) if elapsed > 0 else 0.0,
+        "alloc_blocks_per_step": round(net_blocks / max(traced_steps, 1), 1),
+        "alloc_kib_per_step": round(net_bytes / 1024 / max(traced_steps, 1), 1),
+        "traced_peak_mib": round(traced_peak / (1024 * 1024), 2),
+        "peak_rss_mib": round(peak_rss_mib, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile one debate size with the stub LM")
+    parser.add_argument("--agents", type=int, required=True)
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(profile_run(args.agents, steps=args.steps, seed=args.seed)))
+
+
+if __name__ == "__main__":
+    main()
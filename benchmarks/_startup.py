@@ -0,0 +1,82 @@
+"""
+Server startup profile, measured in a fresh process.
+
+Imports `app.main` and enters the FastAPI lifespan exactly as uvicorn does,
+recording when the process would start accepting connections and when
+`/readyz` would turn ready:
+
+- `import_s`: `import app.main` (heavy, lazily imported dependencies show up here)
+- `accepting_s`: import plus lifespan startup, i.e. until the server listens
+- `ready_s`: until every required startup task (embedding model, tables) is done
+
+Runs with the `stub` embedding provider, the stub LM and no OpenRouter key,
+so nothing touches the network; table creation is skipped (no database).
+Set STARTUP_BENCH_PROVIDER to profile a real embedding provider instead:
+
+    python -m benchmarks._startup
+    python -m benchmarks._startup --blocking       # STARTUP_BACKGROUND=false
+"""
+
+import os
+import time
+
+_started = time.perf_counter()
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+from typing import Any, Dict
+
+
+def profile_startup(started: float) -> Dict[str, Any]:
+    """Import the app and run its lifespan startup; timings are relative to `started`."""
+    from app.main import app
+
+    imported = time.perf_counter()
+
+    async def run() -> Dict[str, float]:
+        async with app.router.lifespan_context(app):
+            accepting = time.perf_counter()
+            await app.state.startup.wait()
+            ready = time.perf_counter()
+            status = app.state.startup.status()
+        if not status["ready"]:
+            raise RuntimeError(f"startup did not become ready: {status['tasks']}")
+        return {"accepting": accepting, "ready": ready}
+
+    marks = asyncio.run(run())
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mib = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+
+    return {
+        "import_s": round(imported - started, 3),
+        "accepting_s": round(marks["accepting"] - started, 3),
+        "ready_s": round(marks["ready"] - started, 3),
+        "peak_rss_mib": round(peak_rss_mib, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile server startup in this process")
+    parser.add_argument("--blocking", action="store_true", help="Run startup tasks before accepting connections")
+    args = parser.parse_args()
+
+    os.environ["EMBEDDING_PROVIDER"] = os.getenv("STARTUP_BENCH_PROVIDER", "stub")
+    os.environ["DEBATE_LM_MODE"] = "stub"
+    os.environ["OPENROUTER_API_KEY"] = ""
+    os.environ["STARTUP_CREATE_TABLES"] = "false"
+    os.environ["EMBEDDING_DB_REUSE"] = "false"
+    os.environ["STARTUP_BACKGROUND"] = "false" if args.blocking else "true"
+
+    # Startup logging goes to stderr so stdout carries only the profile
+    sys.stdout = sys.stderr
+    profile = profile_startup(_started)
+    sys.stdout = sys.__stdout__
+    print(json.dumps(profile))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Bulk embedding of a large document: in-process batching vs the ONNX process pool.
+
+The pool only pays off with several cores; on a single core the extra
+processes add overhead. Requires onnxruntime, transformers and an exported
+model in ONNX_MODEL_DIR (default ./onnx-model); skipped otherwise.
+
+    pytest benchmarks -k bulk
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("transformers")
+
+from app.services.embedding_service import EmbeddingService
+from app.services.embedding_service.process_pool import default_bulk_workers
+from app.services.embedding_service.providers import ONNXProvider
+
+
+MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "./onnx-model")
+N_CHUNKS = 2000  # About a 2 MB document at 1,000 characters per chunk
+
+
+@pytest.fixture(scope="module")
+def provider():
+    if not os.path.exists(os.path.join(MODEL_DIR, "model.onnx")):
+        pytest.skip(f"No ONNX model in {MODEL_DIR} (run scripts/setup_onnx_model.py)")
+    return ONNXProvider(model_dir=MODEL_DIR)  # No cache: every call runs inference
+
+
+@pytest.fixture(scope="module")
+def chunks():
+    return [f"Chunk {i} of the uploaded policy document. " + "Cars and buses. " * (i % 60) for i in range(N_CHUNKS)]
+
+
+@pytest.mark.parametrize("mode", ["in_process", "process_pool"])
+def bench_embed_bulk(benchmark, provider, chunks, mode):
+    workers = default_bulk_workers() if mode == "process_pool" else 1
+    service = EmbeddingService(provider, bulk_workers=workers)
+    if mode == "process_pool":
+        service.embed_bulk(chunks[:service._bulk_min_texts])  # Start the workers outside the timing
+
+    vectors = benchmark.pedantic(service.embed_bulk, args=(chunks,), rounds=3, iterations=1)
+
+    np.testing.assert_allclose(vectors[0], provider.embed(chunks[0]), atol=1e-5)
+    benchmark.extra_info["workers"] = workers
+    benchmark.extra_info["texts_per_sec"] = round(N_CHUNKS / benchmark.stats.stats.mean, 1)
+    service.shutdown()
@@ -0,0 +1,65 @@
+"""
+Embedding cache overhead for a 1,000-chunk document.
+
+Compares per-item `get`/`set` (one lock round trip and one key hash call
+per chunk) against the batched `get_many`/`set_many` path the providers use,
+and the per-entry LRU cache against the slab cache (float32 and float16).
+
+    pytest benchmarks -k embedding_cache
+"""
+
+import numpy as np
+import pytest
+
+from app.services.embedding_service.cache import InMemoryLRUCache, create_cache_key, create_cache_keys
+from app.services.embedding_service.slab_cache import SlabEmbeddingCache
+
+
+MODEL = "onnx:./onnx-model"
+N_CHUNKS = 1000
+
+
+@pytest.fixture(scope="module")
+def chunks():
+    return [f"Chunk {i} of the uploaded policy document. " * 20 for i in range(N_CHUNKS)]
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    rng = np.random.default_rng(0)
+    return list(rng.standard_normal((N_CHUNKS, 384), dtype=np.float32))
+
+
+def bench_cache_per_item(benchmark, chunks, vectors):
+    cache = InMemoryLRUCache(capacity=2 * N_CHUNKS)
+
+    def roundtrip():
+        for text, vec in zip(chunks, vectors):
+            cache.set(create_cache_key(MODEL, text), vec)
+        return [cache.get(create_cache_key(MODEL, text)) for text in chunks]
+
+    assert all(v is not None for v in benchmark(roundtrip))
+
+
+def bench_cache_batched(benchmark, chunks, vectors):
+    cache = InMemoryLRUCache(capacity=2 * N_CHUNKS)
+
+    def roundtrip():
+        cache.set_many(create_cache_keys(MODEL, chunks), vectors)
+        return cache.get_many(create_cache_keys(MODEL, chunks))
+
+    assert all(v is not None for v in benchmark(roundtrip))
+
+
+@pytest.mark.parametrize("cache_type", ["lru", "slab_float32", "slab_float16"])
+def bench_cache_hits(benchmark, chunks, vectors, cache_type):
+    if cache_type == "lru":
+        cache = InMemoryLRUCache(capacity=2 * N_CHUNKS)
+    else:
+        cache = SlabEmbeddingCache(max_bytes=16 * 1024 * 1024, dtype=cache_type.split("_")[1])
+    keys = create_cache_keys(MODEL, chunks)
+    cache.set_many(keys, vectors)
+
+    assert all(v is not None for v in benchmark(cache.get_many, keys))
+    if cache_type != "lru":
+        benchmark.extra_info["bytes_used"] = cache.stats()["bytes_used"]
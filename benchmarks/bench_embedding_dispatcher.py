@@ -0,0 +1,60 @@
+"""
+Embedding throughput under 32 concurrent callers, with and without micro-batching.
+
+Each caller embeds one or two short texts per call, like refiner rewards,
+diversity checks and recall queries do. Requires onnxruntime, transformers
+and an exported model in ONNX_MODEL_DIR (default ./onnx-model); skipped otherwise.
+
+    pytest benchmarks -k dispatcher
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("transformers")
+
+from app.services.embedding_service import EmbeddingService
+from app.services.embedding_service.providers import ONNXProvider
+
+
+MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "./onnx-model")
+N_CALLERS = 32
+CALLS_PER_CALLER = 8
+
+
+@pytest.fixture(scope="module")
+def provider():
+    if not os.path.exists(os.path.join(MODEL_DIR, "model.onnx")):
+        pytest.skip(f"No ONNX model in {MODEL_DIR} (run scripts/setup_onnx_model.py)")
+    return ONNXProvider(model_dir=MODEL_DIR)  # No cache: every call runs inference
+
+
+def _run_callers(service: EmbeddingService) -> int:
+    def caller(caller_id: int) -> int:
+        embedded = 0
+        for call in range(CALLS_PER_CALLER):
+            texts = [f"Caller {caller_id} opinion {call} on the proposed car ban in the city centre"]
+            if call % 2:
+                texts.append(f"Caller {caller_id} rebuttal {call} about public transport reliability")
+            embedded += len(service.encode(texts))
+        return embedded
+
+    with ThreadPoolExecutor(max_workers=N_CALLERS) as pool:
+        return sum(pool.map(caller, range(N_CALLERS)))
+
+
+@pytest.mark.parametrize("micro_batching", [False, True], ids=["direct", "micro_batched"])
+def bench_concurrent_encode(benchmark, provider, micro_batching):
+    service = EmbeddingService(provider)
+    if micro_batching:
+        service.enable_micro_batching(max_wait_ms=3, max_batch=64)
+
+    texts = benchmark.pedantic(_run_callers, args=(service,), rounds=3, iterations=1, warmup_rounds=1)
+
+    benchmark.extra_info["texts_per_sec"] = round(texts / benchmark.stats.stats.mean, 1)
+    if micro_batching:
+        benchmark.extra_info.update(service.cache_stats()["micro_batching"])
+    service.shutdown()
@@ -0,0 +1,58 @@
+"""
+Remote embedding of a 2,000-chunk document against the local HTTP stub.
+
+HuggingFace: 63 batches of 32 with 20 ms of simulated API latency each, one
+batch at a time (the former behaviour) vs bounded concurrent dispatch, for
+the sync thread-pool path and the async client path. OpenRouter: chunks of
+64, sequential vs concurrent.
+
+    pytest benchmarks -k http
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.embedding_service.http_stub import EmbeddingHTTPStub
+from app.services.embedding_service.providers import HuggingFaceProvider, OpenRouterProvider
+
+
+N_CHUNKS = 2000
+LATENCY_MS = 20
+
+
+@pytest.fixture(scope="module")
+def stub():
+    with EmbeddingHTTPStub(latency_ms=LATENCY_MS) as server:
+        yield server
+
+
+@pytest.fixture(scope="module")
+def chunks():
+    return [f"Chunk {i} of the uploaded policy document. " * 20 for i in range(N_CHUNKS)]
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 4, 8])
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def bench_huggingface_document(benchmark, stub, chunks, mode, max_concurrency):
+    provider = HuggingFaceProvider(base_url=stub.url, api_key="bench", batch_size=32, max_concurrency=max_concurrency)
+
+    if mode == "sync":
+        vectors = benchmark.pedantic(provider.embed, args=(chunks,), rounds=3, iterations=1)
+    else:
+        vectors = benchmark.pedantic(lambda: asyncio.run(provider.embed_async(chunks)), rounds=3, iterations=1)
+
+    assert len(vectors) == N_CHUNKS
+    benchmark.extra_info["texts_per_sec"] = round(N_CHUNKS / benchmark.stats.stats.mean, 1)
+    provider.close()
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 4, 8])
+def bench_openrouter_document(benchmark, stub, chunks, max_concurrency):
+    provider = OpenRouterProvider(api_base=stub.url, api_key="bench", batch_size=64, max_concurrency=max_concurrency)
+
+    vectors = benchmark.pedantic(provider.embed, args=(chunks,), rounds=3, iterations=1)
+
+    assert len(vectors) == N_CHUNKS
+    benchmark.extra_info.update(provider.stats())
+    provider.close()
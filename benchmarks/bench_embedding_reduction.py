@@ -0,0 +1,96 @@
+"""
+Recall quality against storage and scan time for reduced embedding storage.
+
+A 50,000-vector corpus is stored as it would be in the `embeddings` table
+(full float32, halfvec, PCA to 256/128/64 dimensions, Matryoshka
+truncation) and searched with 32 queries. Each configuration records the
+stored bytes per vector and recall@10 against exact full-dimension search;
+the timed part is the top-k scan.
+
+The default corpus is synthetic: a decaying spectrum in a random basis,
+like sentence embeddings, with queries that are perturbed corpus vectors.
+Truncation is only meaningful for Matryoshka-trained models, so it scores
+poorly here. To measure real vectors, dump stored embeddings of one model
+to a (n, dim) .npy file and point REDUCTION_BENCH_VECTORS at it.
+
+    pytest benchmarks -k reduction
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from app.services.embedding_service.reduction import EmbeddingStorage, PCAReducer, TruncationReducer
+from app.services.embedding_service.similarity import normalize_rows, top_k
+
+
+N_DOCS = 50_000
+DIM = 384
+N_QUERIES = 32
+K = 10
+MODEL = "bench-model"
+
+CONFIGS = {
+    "full": (DIM, "vector", None),
+    "halfvec": (DIM, "halfvec", None),
+    "pca256": (256, "vector", "pca"),
+    "pca128": (128, "vector", "pca"),
+    "pca128-halfvec": (128, "halfvec", "pca"),
+    "pca64": (64, "vector", "pca"),
+    "truncate128": (128, "vector", "truncate"),
+}
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    path = os.getenv("REDUCTION_BENCH_VECTORS")
+    if path:
+        return normalize_rows(np.load(path))
+    rng = np.random.default_rng(0)
+    spectrum = 1.0 / np.arange(1, DIM + 1) ** 0.75
+    basis, _ = np.linalg.qr(rng.standard_normal((DIM, DIM)))
+    return normalize_rows((rng.standard_normal((N_DOCS, DIM)) * spectrum) @ basis.T)
+
+
+@pytest.fixture(scope="module")
+def queries(vectors):
+    rng = np.random.default_rng(1)
+    picked = vectors[rng.choice(len(vectors), N_QUERIES, replace=False)]
+    return normalize_rows(picked + 0.3 * rng.standard_normal(picked.shape) / np.sqrt(picked.shape[1]))
+
+
+@pytest.fixture(scope="module")
+def exact(vectors, queries):
+    return top_k(queries, vectors, K)[0]
+
+
+def _storage(name, vectors):
+    dim, storage_type, reduction = CONFIGS[name]
+    reducer = None
+    if reduction == "pca":
+        sample = vectors[np.random.default_rng(2).choice(len(vectors), 10_000, replace=False)]
+        reducer = PCAReducer.fit(sample, dim, MODEL)
+    elif reduction == "truncate":
+        reducer = TruncationReducer(dim)
+    return EmbeddingStorage(dim, storage_type, reducer)
+
+
+@pytest.mark.parametrize("config", list(CONFIGS))
+def bench_reduced_recall(benchmark, vectors, queries, exact, config):
+    if CONFIGS[config][0] > vectors.shape[1]:
+        pytest.skip("corpus is narrower than the configuration")
+    storage = _storage(config, vectors)
+    stored = storage.project(vectors, MODEL)
+    if storage.storage_type == "halfvec":
+        stored = stored.astype(np.float16)
+    projected_queries = storage.project(queries, MODEL)
+
+    idx, _ = benchmark(top_k, projected_queries, stored, K)
+
+    recall = np.mean([len(set(a) & set(b)) / K for a, b in zip(idx, exact)])
+    benchmark.extra_info["recall_at_k"] = float(recall)
+    benchmark.extra_info["bytes_per_vector"] = storage.bytes_per_vector
+    benchmark.extra_info["storage_ratio"] = storage.bytes_per_vector / (vectors.shape[1] * 4)
+    if config == "full":
+        assert recall == 1.0
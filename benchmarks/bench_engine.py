@@ -0,0 +1,116 @@
+"""
+Debate engine benchmarks.
+
+- Full debates of 4 to 200 agents against a zero-latency `StubLM`
+- Micro-benchmarks for the hot helpers of a step: `Moderator.update`,
+  `FixedMemory` and `PoliAgent._extract_tool_usage_from_prediction`
+
+Run from the repository root:
+
+    pytest benchmarks                                  # timing + profiles vs baseline
+    pytest benchmarks --benchmark-autosave             # keep pytest-benchmark history
+    pytest benchmarks --benchmark-compare              # diff against last autosave
+    pytest benchmarks --save-engine-baseline           # refresh baselines/engine.json
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks._engine import DEFAULT_STEPS, build_simulation, run_simulation
+from app.classes.agents import PoliAgent
+from app.classes.memory import FixedMemory
+from app.classes.moderator import Moderator
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+AGENT_COUNTS = [4, 16, 50, 200]
+
+
+# ---------------------------------------------------------------------------
+#  Full debates
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("n_agents", AGENT_COUNTS)
+def bench_debate(benchmark, engine_profiles, n_agents):
+    """Time a full debate (agent construction excluded) and profile it in a fresh process."""
+    state = {}
+
+    def setup():
+        state["sim"] = build_simulation(n_agents)
+        return (state["sim"],), {}
+
+    steps = benchmark.pedantic(run_simulation, setup=setup, rounds=3, iterations=1)
+    assert steps == DEFAULT_STEPS
+
+    # Allocations and peak RSS are measured in a subprocess so that each size
+    # gets its own high-water mark instead of inheriting the previous one
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks._engine", "--agents", str(n_agents)],
+        cwd=REPO_ROOT,
+        env={**os.environ, "EMBEDDING_PROVIDER": "stub"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = json.loads(result.stdout.strip().splitlines()[-1])
+    profile["steps_per_sec"] = round(steps / benchmark.stats.stats.mean, 3)
+
+    benchmark.extra_info.update(profile)
+    engine_profiles[f"{n_agents}_agents"] = profile
+
+
+# ---------------------------------------------------------------------------
+#  Step internals
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("n_agents", [16, 200])
+def bench_moderator_round(benchmark, n_agents):
+    """One round of hand-raising, weight update and speaker selection."""
+    agents = [SimpleNamespace(id=i, name=f"Agent{i}") for i in range(n_agents)]
+    moderator = Moderator(agents)
+    rng = random.Random(0)
+    desires = [rng.random() for _ in agents]
+
+    def round_():
+        moderator.reset_requests()
+        for agent, desire in zip(agents, desires):
+            moderator.add_request(agent, weight=desire)
+        moderator.update()
+        return moderator.select_next_speaker()
+
+    assert benchmark(round_) is not None
+
+
+def bench_fixed_memory(benchmark):
+    """Enqueue plus the two context renderings done per step (propose and talk)."""
+    memory = FixedMemory(3)
+    opinion = "word " * 80
+
+    def cycle():
+        memory.enqueue(opinion)
+        memory.to_text(limit=2)
+        return memory.to_text()
+
+    benchmark(cycle)
+
+
+def bench_extract_tool_usage(benchmark):
+    """Trajectory parsing after a ReAct call that used tools on most steps."""
+    trajectory = {}
+    for i in range(6):
+        trajectory[f"thought_{i}"] = f"Thinking about step {i} " * 5
+        trajectory[f"tool_name_{i}"] = "web_search_wikipedia" if i < 5 else "finish"
+        trajectory[f"tool_args_{i}"] = {"query": f"query {i}"} if i < 5 else {}
+        trajectory[f"observation_{i}"] = "observation text " * 20
+    prediction = SimpleNamespace(trajectory=trajectory)
+    agent = SimpleNamespace(respond_module=SimpleNamespace(tools={"web_search_wikipedia": None, "finish": None}))
+
+    result = benchmark(PoliAgent._extract_tool_usage_from_prediction, agent, prediction)
+    assert len(result["tools_used"]) == 5
@@ -0,0 +1,59 @@
+"""
+ONNX embedding throughput on mixed-length document chunks.
+
+Compares length-bucketed batching at several batch sizes against a single
+padded batch (the previous behaviour, reproduced with batch_size=len(texts)).
+Requires onnxruntime, transformers and an exported model in ONNX_MODEL_DIR
+(default ./onnx-model); skipped otherwise.
+
+    pytest benchmarks -k onnx_batching
+"""
+
+import os
+import random
+
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("transformers")
+
+from app.services.embedding_service.providers import ONNXProvider
+
+
+MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "./onnx-model")
+N_CHUNKS = 256
+
+# Document chunk lengths in words: mostly short paragraphs, some full 256-token chunks
+CHUNK_WORDS = [(12, 0.35), (40, 0.30), (90, 0.20), (220, 0.15)]
+VOCABULARY = (
+    "the city council debated whether private cars should be banned from the historic centre "
+    "while residents argued about public transport emissions tourism commerce and accessibility "
+    "for elderly people cyclists delivery drivers and local businesses"
+).split()
+
+
+def _mixed_length_chunks(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    lengths, weights = zip(*CHUNK_WORDS)
+    return [
+        " ".join(rng.choice(VOCABULARY) for _ in range(rng.choices(lengths, weights)[0]))
+        for _ in range(n)
+    ]
+
+
+@pytest.fixture(scope="module")
+def provider():
+    if not os.path.exists(os.path.join(MODEL_DIR, "model.onnx")):
+        pytest.skip(f"No ONNX model in {MODEL_DIR} (run scripts/setup_onnx_model.py)")
+    return ONNXProvider(model_dir=MODEL_DIR)
+
+
+@pytest.mark.parametrize("batch_size", [N_CHUNKS, 64, 32, 8], ids=lambda b: "single_batch" if b == N_CHUNKS else f"bucketed_{b}")
+def bench_onnx_batching(benchmark, provider, batch_size):
+    texts = _mixed_length_chunks(N_CHUNKS)
+
+    # Bypass the cache so every round runs inference
+    result = benchmark.pedantic(provider._embed_batch, args=(texts, batch_size), rounds=3, iterations=1, warmup_rounds=1)
+
+    assert len(result) == N_CHUNKS
+    benchmark.extra_info["texts_per_sec"] = round(N_CHUNKS / benchmark.stats.stats.mean, 1)
@@ -0,0 +1,106 @@
+"""
+ONNX provider tokenization and inference: Rust `tokenizers` fast path vs
+`AutoTokenizer`.
+
+Two workloads: 256 short debate sentences (what agents embed every step)
+and 64 long document chunks truncated at 256 tokens (document ingestion).
+`tokenize` times tokenization alone; `embed` times the whole uncached path
+(tokenize, fill the reused input buffers, `session.run`, pooling).
+
+Uses the exported model in ONNX_MODEL_DIR (default ./onnx-model) when
+present. Otherwise inference runs on a tiny generated graph (an embedding
+lookup) next to the committed tokenizer files, so `embed` then measures the
+Python and tokenizer overhead around `session.run` rather than the model
+(`extra_info["model"]` says which).
+
+    pytest benchmarks -k onnx_tokenizer
+"""
+
+import os
+import random
+import shutil
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+pytest.importorskip("transformers")
+
+from app.services.embedding_service.providers import ONNXProvider
+
+
+MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "./onnx-model")
+VOCABULARY = (
+    "the city council debated whether private cars should be banned from the historic centre "
+    "while residents argued about public transport emissions tourism commerce and accessibility "
+    "for elderly people cyclists delivery drivers and local businesses"
+).split()
+WORKLOADS = {
+    "sentences": (256, 18),  # (texts, words per text)
+    "chunks": (64, 240),
+}
+
+
+def _texts(workload: str, seed: int = 0):
+    n, words = WORKLOADS[workload]
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(VOCABULARY) for _ in range(words)) + "." for _ in range(n)]
+
+
+def _tiny_model_dir(path) -> str:
+    """Tokenizer files from MODEL_DIR plus a 384-dim embedding-lookup graph."""
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+
+    for name in os.listdir(MODEL_DIR):
+        if name.endswith((".json", ".txt")):
+            shutil.copy(os.path.join(MODEL_DIR, name), path)
+    graph = helper.make_graph(
+        [helper.make_node("Gather", ["tokens", "input_ids"], ["last_hidden_state"])],
+        "tiny_encoder",
+        [
+            helper.make_tensor_value_info(name, TensorProto.INT64, ["batch", "sequence"])
+            for name in ("input_ids", "attention_mask", "token_type_ids")
+        ],
+        [helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, ["batch", "sequence", 384])],
+        initializer=[numpy_helper.from_array(np.random.default_rng(0).random((30522, 384), dtype=np.float32), "tokens")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, os.path.join(path, "model.onnx"))
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def model(tmp_path_factory):
+    if os.path.exists(os.path.join(MODEL_DIR, "model.onnx")):
+        return MODEL_DIR, "exported"
+    if not os.path.exists(os.path.join(MODEL_DIR, "tokenizer.json")):
+        pytest.skip(f"No tokenizer files in {MODEL_DIR}")
+    return _tiny_model_dir(tmp_path_factory.mktemp("onnx-model")), "tiny"
+
+
+@pytest.fixture(scope="module")
+def providers(model):
+    model_dir, _ = model
+    return {
+        backend: ONNXProvider(model_dir=model_dir, tokenizer_backend=backend, optimized_model_dir=None)
+        for backend in ("tokenizers", "transformers")
+    }
+
+
+@pytest.mark.parametrize("backend", ["tokenizers", "transformers"])
+@pytest.mark.parametrize("workload", list(WORKLOADS))
+@pytest.mark.parametrize("phase", ["tokenize", "embed"])
+def bench_onnx_tokenizer(benchmark, model, providers, phase, workload, backend):
+    provider = providers[backend]
+    texts = _texts(workload)
+    # Bypass the cache so every round tokenizes and runs inference
+    func = provider.tokenize if phase == "tokenize" else provider._embed_batch
+
+    result = benchmark.pedantic(func, args=(texts,), rounds=10, iterations=1, warmup_rounds=1)
+
+    assert len(result[0] if phase == "tokenize" else result) == len(texts)
+    benchmark.extra_info["model"] = model[1]
+    benchmark.extra_info["texts_per_sec"] = round(len(texts) / benchmark.stats.stats.mean, 1)
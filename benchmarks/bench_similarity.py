@@ -0,0 +1,63 @@
+"""
+Similarity search over a 100,000 x 384 corpus.
+
+Compares the former per-document `cosine_many` loop (norm checks and one
+dot product per document) against the shared kernel, float32 against
+float16 corpus storage, and top-k selection for one and 32 queries.
+
+    pytest benchmarks -k similarity
+"""
+
+import numpy as np
+import pytest
+
+from app.services.embedding_service.base import safe_cosine_similarity
+from app.services.embedding_service.similarity import cosine_scores, normalize_rows, top_k
+
+
+N_DOCS = 100_000
+DIM = 384
+K = 10
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    rng = np.random.default_rng(0)
+    return normalize_rows(rng.standard_normal((N_DOCS, DIM), dtype=np.float32))
+
+
+@pytest.fixture(scope="module")
+def queries():
+    rng = np.random.default_rng(1)
+    return normalize_rows(rng.standard_normal((32, DIM), dtype=np.float32))
+
+
+def bench_cosine_many_legacy(benchmark, corpus, queries):
+    subset = corpus[:10_000]  # The per-document loop is too slow for the full corpus
+
+    def legacy():
+        return np.array([safe_cosine_similarity(queries[0], d) for d in subset], dtype=np.float32)
+
+    scores = benchmark(legacy)
+    np.testing.assert_allclose(scores, cosine_scores(queries[0], subset), atol=1e-5)
+    benchmark.extra_info["docs"] = len(subset)
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def bench_cosine_scores(benchmark, corpus, queries, dtype):
+    stored = corpus.astype(dtype)
+    scores = benchmark(cosine_scores, queries[0], stored)
+    assert scores.shape == (N_DOCS,)
+    benchmark.extra_info["corpus_bytes"] = stored.nbytes
+
+
+@pytest.mark.parametrize("n_queries", [1, 32])
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def bench_top_k(benchmark, corpus, queries, n_queries, dtype):
+    stored = corpus.astype(dtype)
+    idx, _ = benchmark(top_k, queries[:n_queries], stored, K)
+
+    expected = np.argsort(-(queries[:n_queries] @ corpus.T), axis=1)[:, :K]
+    recall = np.mean([len(set(a) & set(b)) / K for a, b in zip(idx, expected)])
+    assert recall >= 0.9  # float16 rounding may swap near-ties
+    benchmark.extra_info["recall_at_k"] = float(recall)
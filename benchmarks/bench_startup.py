@@ -0,0 +1,47 @@
+"""
+Server startup time.
+
+Each round starts a fresh interpreter (`python -m benchmarks._startup`) that
+imports the app and runs its lifespan; the timed part is the whole process.
+The per-mode profile (median of the rounds) is compared against
+`baselines/startup.json` in the terminal summary:
+
+- `background`: slow startup work runs after the server accepts connections
+- `blocking`: STARTUP_BACKGROUND=false, the previous behaviour
+
+    pytest benchmarks -k startup
+    pytest benchmarks -k startup --save-startup-baseline
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+ROUNDS = 5
+
+
+def _profile(blocking: bool) -> dict:
+    command = [sys.executable, "-m", "benchmarks._startup"] + (["--blocking"] if blocking else [])
+    result = subprocess.run(command, cwd=REPO_ROOT, env=dict(os.environ), capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("mode", ["background", "blocking"])
+def bench_startup(benchmark, startup_profiles, mode):
+    """Fresh-process startup, from interpreter launch to ready."""
+    runs = []
+
+    benchmark.pedantic(lambda: runs.append(_profile(mode == "blocking")), rounds=ROUNDS, iterations=1)
+
+    profile = {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+    assert profile["accepting_s"] <= profile["ready_s"]
+
+    benchmark.extra_info.update(profile)
+    startup_profiles[mode] = profile
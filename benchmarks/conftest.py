@@ -0,0 +1,137 @@
+"""
+Pytest configuration for the engine benchmarks.
+
+Besides pytest-benchmark's own timing table, the suite collects per-size
+engine profiles (steps/sec, allocations per step, peak RSS) and server
+startup profiles (time to accepting connections and to ready) and compares
+them against committed JSON baselines, so regressions show up both in the
+terminal summary and as a diff of `benchmarks/baselines/engine.json` and
+`benchmarks/baselines/startup.json`.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "engine.json"
+STARTUP_BASELINE_PATH = Path(__file__).parent / "baselines" / "startup.json"
+
+# Metrics where a larger value is an improvement
+HIGHER_IS_BETTER = {"steps_per_sec"}
+REPORTED_METRICS = ["steps_per_sec", "alloc_blocks_per_step", "alloc_kib_per_step", "peak_rss_mib"]
+STARTUP_METRICS = ["import_s", "accepting_s", "ready_s", "peak_rss_mib"]
+
+_profiles: Dict[str, Dict[str, Any]] = {}
+_startup_profiles: Dict[str, Dict[str, Any]] = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("engine", "debate engine benchmarks")
+    group.addoption(
+        "--engine-baseline",
+        default=str(BASELINE_PATH),
+        help="JSON baseline to compare engine profiles against",
+    )
+    group.addoption(
+        "--save-engine-baseline",
+        action="store_true",
+        default=False,
+        help="Overwrite the engine baseline with the profiles from this run",
+    )
+    group.addoption(
+        "--startup-baseline",
+        default=str(STARTUP_BASELINE_PATH),
+        help="JSON baseline to compare startup profiles against",
+    )
+    group.addoption(
+        "--save-startup-baseline",
+        action="store_true",
+        default=False,
+        help="Overwrite the startup baseline with the profiles from this run",
+    )
+
+
+@pytest.fixture(scope="session")
+def engine_profiles() -> Dict[str, Dict[str, Any]]:
+    """Session-wide store of engine profiles, keyed by debate size."""
+    return _profiles
+
+
+@pytest.fixture(scope="session")
+def startup_profiles() -> Dict[str, Dict[str, Any]]:
+    """Session-wide store of server startup profiles, keyed by startup mode."""
+    return _startup_profiles
+
+
+def _load_baseline(path: Path) -> Dict[str, Dict[str, Any]]:
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        return json.load(f).get("profiles", {})
+
+
+def _format_change(metric: str, current: float, baseline: float) -> str:
+    if not baseline:
+        return ""
+    change = (current - baseline) / baseline * 100
+    worse = change < 0 if metric in HIGHER_IS_BETTER else change > 0
+    marker = " !" if worse and abs(change) >= 10 else ""
+    return f" ({change:+.1f}%{marker})"
+
+
+def _save_baseline(terminalreporter, path: Path, baseline: Dict[str, Any], profiles: Dict[str, Any], label: str) -> None:
+    merged = dict(baseline)
+    merged.update(profiles)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"profiles": merged}, f, indent=2, sort_keys=True)
+        f.write("\n")
+    terminalreporter.write_line(f"Saved {label} baseline to {path}")
+
+
+def _startup_summary(terminalreporter, config):
+    baseline_path = Path(config.getoption("--startup-baseline"))
+    baseline = _load_baseline(baseline_path)
+
+    terminalreporter.section("server startup profiles")
+    for key in sorted(_startup_profiles):
+        profile = _startup_profiles[key]
+        previous = baseline.get(key, {})
+        parts = [
+            f"{metric}={profile[metric]}{_format_change(metric, profile[metric], previous.get(metric))}"
+            for metric in STARTUP_METRICS
+        ]
+        terminalreporter.write_line(f"{key:>10}: " + "  ".join(parts))
+    if baseline:
+        terminalreporter.write_line(f"(compared with {baseline_path}; '!' marks a regression of 10% or more)")
+
+    if config.getoption("--save-startup-baseline"):
+        _save_baseline(terminalreporter, baseline_path, baseline, _startup_profiles, "startup")
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if _startup_profiles:
+        _startup_summary(terminalreporter, config)
+    if not _profiles:
+        return
+
+    baseline_path = Path(config.getoption("--engine-baseline"))
+    baseline = _load_baseline(baseline_path)
+
+    terminalreporter.section("debate engine profiles")
+    for key in sorted(_profiles, key=lambda k: _profiles[k]["agents"]):
+        profile = _profiles[key]
+        previous = baseline.get(key, {})
+        parts = [
+            f"{metric}={profile[metric]}{_format_change(metric, profile[metric], previous.get(metric))}"
+            for metric in REPORTED_METRICS
+        ]
+        terminalreporter.write_line(f"{key:>10}: " + "  ".join(parts))
+    if baseline:
+        terminalreporter.write_line(f"(compared with {baseline_path}; '!' marks a regression of 10% or more)")
+
+    if config.getoption("--save-engine-baseline"):
+        _save_baseline(terminalreporter, baseline_path, baseline, _profiles, "engine")
@@ -0,0 +1,52 @@
+"""
+Shared fixtures for the root test suite.
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+TOKENIZER_DIR = "./onnx-model"
+
+
+@pytest.fixture(scope="session")
+def tiny_onnx_model(tmp_path_factory):
+    """
+    Directory with a tiny ONNX encoder (token + type embedding lookup, 8 dimensions)
+    next to the tokenizer files of ./onnx-model, so ONNX tests need no exported model.
+    """
+    pytest.importorskip("onnxruntime")
+    onnx = pytest.importorskip("onnx")
+    if not os.path.exists(os.path.join(TOKENIZER_DIR, "tokenizer.json")):
+        pytest.skip(f"No tokenizer files in {TOKENIZER_DIR}")
+    path = tmp_path_factory.mktemp("onnx-model")
+    for name in os.listdir(TOKENIZER_DIR):
+        if name.endswith((".json", ".txt")):
+            shutil.copy(os.path.join(TOKENIZER_DIR, name), path)
+
+    from onnx import TensorProto, helper, numpy_helper
+
+    rng = np.random.default_rng(0)
+    graph = helper.make_graph(
+        [
+            helper.make_node("Gather", ["tokens", "input_ids"], ["token_vectors"]),
+            helper.make_node("Gather", ["types", "token_type_ids"], ["type_vectors"]),
+            helper.make_node("Add", ["token_vectors", "type_vectors"], ["last_hidden_state"]),
+        ],
+        "tiny_encoder",
+        [
+            helper.make_tensor_value_info(name, TensorProto.INT64, ["batch", "sequence"])
+            for name in ("input_ids", "attention_mask", "token_type_ids")
+        ],
+        [helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, ["batch", "sequence", 8])],
+        initializer=[
+            numpy_helper.from_array(rng.standard_normal((30522, 8)).astype(np.float32), "tokens"),
+            numpy_helper.from_array(rng.standard_normal((2, 8)).astype(np.float32), "types"),
+        ],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path / "model.onnx"))
+    return str(path)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Compare ONNX model precision variants (fp32, int8, fp16) on debate text.
+
+For every variant found in the model directory, reports:
+- agreement with FP32: mean/min cosine between the two embeddings of each text
+- similarity-structure agreement: max absolute error and Spearman correlation
+  of all pairwise similarities, and how often the nearest neighbour is unchanged
+- throughput (texts/sec, length-bucketed batching) and model file size
+
+Usage:
+    python scripts/evaluate_onnx_variants.py
+    python scripts/evaluate_onnx_variants.py --model-dir ./onnx-model --texts my_debate.txt --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.embedding_service.providers.onnx import ONNXProvider, MODEL_VARIANT_FILES
+
+
+# Representative debate interventions (short claims, rebuttals and long arguments)
+SAMPLE_DEBATE_TEXTS = [
+    "Banning private cars from the historic centre will cut emissions and make the streets safer for pedestrians.",
+    "A ban hurts small shop owners who depend on customers arriving by car.",
+    "Public transport in our city is not reliable enough to replace private cars overnight.",
+    "Every city that pedestrianised its centre saw retail revenue recover within two years.",
+    "Elderly and disabled residents need exemptions, otherwise the policy is discriminatory.",
+    "I agree with the previous speaker that exemptions are necessary, but they must be narrowly defined.",
+    "Delivery vans could be restricted to early morning windows instead of an outright ban.",
+    "The data on air quality is clear: nitrogen dioxide levels exceed the legal limits most days.",
+    "Tourism will benefit because visitors prefer quiet, walkable streets.",
+    "This is an attack on personal freedom; people should choose how they travel.",
+    "Freedom to drive does not include the freedom to pollute other people's lungs.",
+    "We should run a one-year pilot and measure the effects before deciding.",
+    "Congestion charges raise revenue that can be reinvested in buses and bike lanes.",
+    "Congestion pricing is regressive and falls hardest on low-income commuters.",
+    "Bike lanes are useless in a hilly city with long, cold winters.",
+    "Electric scooters and e-bikes have made hills a much smaller obstacle than before.",
+    "La prohibición de autos en el centro reducirá la contaminación y el ruido.",
+    "Los comerciantes temen perder clientes si no pueden llegar en automóvil.",
+    "El transporte público debe mejorar antes de imponer cualquier restricción.",
+    "Propongo una prueba piloto de un año con evaluación independiente de resultados.",
+    "Should artificial intelligence be regulated by an international agency?",
+    "Regulation will slow innovation and push research to less careful jurisdictions.",
+    "Without regulation, the harms of AI will fall on people who never consented to the risks.",
+    "Open-source models make enforcement of any regulation practically impossible.",
+    "Licensing regimes work for aviation and medicine; there is no reason they cannot work for AI.",
+    (
+        "Let me summarise the debate so far. Supporters of the ban emphasise health, safety and long-term "
+        "economic gains from tourism and retail, while opponents focus on the transition costs for businesses, "
+        "the accessibility needs of elderly residents and the current weakness of public transport. Both sides "
+        "seem to accept a phased approach with exemptions, so the real disagreement is about timing."
+    ),
+    (
+        "My position has shifted slightly after hearing the evidence on retail revenue. I still believe that an "
+        "immediate ban is premature, but a phased plan that starts with weekends and expands as bus frequency "
+        "improves would address most of my concerns about commuters and small businesses."
+    ),
+    "I disagree.",
+    "That claim is not supported by the evidence presented.",
+    "Could you clarify what you mean by 'narrowly defined' exemptions?",
+]
+
+
+def _load_texts(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _spearman(a: np.ndarray, b: np.ndarray) -> float:
+    ranks_a = np.argsort(np.argsort(a)).astype(np.float64)
+    ranks_b = np.argsort(np.argsort(b)).astype(np.float64)
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+
+def _throughput(provider: ONNXProvider, texts: List[str], repeats: int) -> float:
+    provider._embed_batch(texts)  # Warm-up
+    started = time.perf_counter()
+    for _ in range(repeats):
+        provider._embed_batch(texts)
+    elapsed = time.perf_counter() - started
+    return len(texts) * repeats / elapsed
+
+
+def evaluate(model_dir: str, texts: List[str], repeats: int) -> Dict[str, Dict[str, float]]:
+    variants = [
+        v for v, filename in MODEL_VARIANT_FILES.items()
+        if os.path.exists(os.path.join(model_dir, filename))
+    ]
+    if "fp32" not in variants:
+        raise FileNotFoundError(f"No FP32 model.onnx in {model_dir}; run scripts/setup_onnx_model.py first")
+
+    embeddings: Dict[str, np.ndarray] = {}
+    results: Dict[str, Dict[str, float]] = {}
+    for variant in variants:
+        provider = ONNXProvider(model_dir=model_dir, variant=variant)
+        embeddings[variant] = np.vstack(provider._embed_batch(texts))
+        results[variant] = {
+            "size_mb": round(os.path.getsize(os.path.join(model_dir, MODEL_VARIANT_FILES[variant])) / (1024 * 1024), 1),
+            "texts_per_sec": round(_throughput(provider, texts, repeats), 1),
+        }
+
+    reference = embeddings["fp32"]
+    upper = np.triu_indices(len(texts), k=1)
+    ref_sims = reference @ reference.T
+    np.fill_diagonal(ref_sims, -np.inf)
+    ref_neighbours = ref_sims.argmax(axis=1)
+    ref_pairs = (reference @ reference.T)[upper]
+
+    for variant, emb in embeddings.items():
+        agreement = np.sum(emb * reference, axis=1)  # Vectors are L2-normalized
+        sims = emb @ emb.T
+        pairs = sims[upper]
+        np.fill_diagonal(sims, -np.inf)
+        results[variant].update({
+            "cosine_to_fp32_mean": round(float(agreement.mean()), 5),
+            "cosine_to_fp32_min": round(float(agreement.min()), 5),
+            "pairwise_max_abs_error": round(float(np.abs(pairs - ref_pairs).max()), 5),
+            "pairwise_spearman": round(_spearman(pairs, ref_pairs), 5),
+            "nearest_neighbour_agreement": round(float(np.mean(sims.argmax(axis=1) == ref_neighbours)), 3),
+            "speedup_vs_fp32": round(results[variant]["texts_per_sec"] / results["fp32"]["texts_per_sec"], 2),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ONNX model variants on debate text")
+    parser.add_argument("--model-dir", default=os.getenv("ONNX_MODEL_DIR", "./onnx-model"))
+    parser.add_argument("--texts", help="Text file with one sample per line (default: bundled debate sample)")
+    parser.add_argument("--repeats", type=int, default=10, help="Timed passes over the texts per variant")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    texts = _load_texts(args.texts) if args.texts else SAMPLE_DEBATE_TEXTS
+    results = evaluate(args.model_dir, texts, args.repeats)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    columns = [
+        "size_mb", "texts_per_sec", "speedup_vs_fp32", "cosine_to_fp32_mean", "cosine_to_fp32_min",
+        "pairwise_max_abs_error", "pairwise_spearman", "nearest_neighbour_agreement",
+    ]
+    print(f"ONNX variants in {args.model_dir} ({len(texts)} texts)\n")
+    print(f"{'metric':<30}" + "".join(f"{v:>12}" for v in results))
+    for column in columns:
+        print(f"{column:<30}" + "".join(f"{results[v][column]:>12}" for v in results))
+
+
+if __name__ == "__main__":
+    main()
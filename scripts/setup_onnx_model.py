@@ -1,9 +1,17 @@
 #!/usr/bin/env python3
 """
 Setup script to export and prepare ONNX model for local inference.
-Run this once to set up the ONNX model before using the 'onnx_minilm' embedding option.
+Run this once to set up the ONNX model before using the 'onnx' embedding option.
+
+Optionally produces reduced-precision variants next to the FP32 model
+(select one at runtime with ONNX_MODEL_VARIANT):
+
+    python scripts/setup_onnx_model.py --variants fp32,int8,fp16
+
+Use --variants-only to derive variants from an already exported model.
 """
 
+import argparse
 import os
 import sys
 
@@ -11,33 +19,51 @@ import sys
 if os.path.exists('/app/app'):
     # Docker context
     sys.path.insert(0, '/app')
-    from app.classes.nlp import setup_onnx_model
 else:
     # Local context
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from app.classes.nlp import setup_onnx_model
+
+from app.services.embedding_service.utils import setup_onnx_model, create_onnx_variants
 
 
 def main():
     """Main setup function"""
-    print("Setting up ONNX MiniLM model for local inference...")
-    
-    # Default configuration - adjust paths for Docker if needed
-    model_id = "sentence-transformers/all-MiniLM-L6-v2"
-    
     # Determine output directory based on environment
     if os.path.exists('/app'):
         # Docker context
-        output_dir = "/app/onnx-model"
+        default_output_dir = "/app/onnx-model"
     else:
         # Local context
-        output_dir = "./onnx-model"
+        default_output_dir = "./onnx-model"
+
+    parser = argparse.ArgumentParser(description="Export MiniLM to ONNX for local inference")
+    parser.add_argument("--model-id", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--output-dir", default=default_output_dir)
+    parser.add_argument(
+        "--variants",
+        default="fp32",
+        help="Comma-separated precision variants to produce: fp32, int8, fp16 (default: fp32)",
+    )
+    parser.add_argument(
+        "--variants-only",
+        action="store_true",
+        help="Skip the export and only derive variants from an existing model.onnx",
+    )
+    args = parser.parse_args()
+    variants = [v.strip().lower() for v in args.variants.split(",") if v.strip()]
+
+    print("Setting up ONNX MiniLM model for local inference...")
     
     try:
-        setup_onnx_model(model_id=model_id, output_dir=output_dir)
+        if args.variants_only:
+            create_onnx_variants(args.output_dir, variants)
+        else:
+            setup_onnx_model(model_id=args.model_id, output_dir=args.output_dir, variants=variants)
         print("\n✅ ONNX model setup complete!")
-        print(f"Model exported to: {os.path.abspath(output_dir)}")
-        print("\nYou can now use embedding_model='onnx_minilm' in your API requests.")
+        print(f"Model exported to: {os.path.abspath(args.output_dir)}")
+        print("\nYou can now use embedding_model='onnx' in your API requests.")
+        if any(v != "fp32" for v in variants):
+            print("Select a variant with ONNX_MODEL_VARIANT and compare them with scripts/evaluate_onnx_variants.py")
         
     except ImportError as e:
         print(f"\n❌ Missing dependencies: {e}")
@@ -0,0 +1,48 @@
+"""
+Tests for the admin-only routes.
+
+`/admin/*` exposes server-wide data, so authenticated users that are not
+listed in ADMIN_EMAILS must be rejected before the handler runs.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main
+from app.dependencies import get_current_user
+from app.services.embedding_service import get_embedding_service, reset_embedding_service
+
+
+@pytest.fixture
+def client_as(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "stub")
+    reset_embedding_service()
+    get_embedding_service()
+
+    def login(email: str) -> TestClient:
+        user = SimpleNamespace(email=email, is_active=True)
+        app.main.app.dependency_overrides[get_current_user] = lambda: user
+        return TestClient(app.main.app)  # No lifespan: the stub service is already loaded
+
+    yield login
+    app.main.app.dependency_overrides.clear()
+    reset_embedding_service()
+
+
+def test_non_admin_users_are_rejected(client_as, monkeypatch):
+    monkeypatch.setenv("ADMIN_EMAILS", "admin@example.com")
+    assert client_as("user@example.com").get("/admin/embedding/stats").status_code == 403
+
+
+def test_no_admins_configured_rejects_everyone(client_as, monkeypatch):
+    monkeypatch.delenv("ADMIN_EMAILS", raising=False)
+    assert client_as("admin@example.com").get("/admin/embedding/stats").status_code == 403
+
+
+def test_listed_admins_are_allowed(client_as, monkeypatch):
+    monkeypatch.setenv("ADMIN_EMAILS", "ops@example.com, Admin@Example.com")
+    response = client_as("admin@example.com").get("/admin/embedding/stats")
+    assert response.status_code == 200
+    assert response.json()["provider"] == "StubProvider"
@@ -0,0 +1,32 @@
+"""
+Tests for embedding cache keys.
+
+Keys must be deterministic, separate models and texts, and name their hash
+algorithm, so processes with and without `xxhash` never compare hashes from
+different algorithms (e.g. in a shared disk cache).
+"""
+
+import hashlib
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.embedding_service import cache as cache_module
+from app.services.embedding_service.cache import CACHE_KEY_ALGORITHM, create_cache_key, create_cache_keys
+
+
+def test_keys_are_deterministic_and_namespaced():
+    keys = create_cache_keys("model-a", ["one", "two", "one"])
+
+    assert keys[0] == keys[2] != keys[1]
+    assert keys == create_cache_keys("model-a", ["one", "two", "one"])
+    assert create_cache_key("model-a", "two") == keys[1]
+    assert create_cache_key("model-b", "one") != keys[0]
+    assert all(key.startswith(CACHE_KEY_ALGORITHM + ":") for key in keys)
+
+
+def test_blake2b_fallback_is_namespaced(monkeypatch):
+    monkeypatch.setattr(cache_module, "xxhash", None)
+    monkeypatch.setattr(cache_module, "CACHE_KEY_ALGORITHM", "b2")
+
+    [key] = create_cache_keys("model-a", ["one"])
+
+    assert key == "b2:" + hashlib.blake2b(b"model-a\x00one", digest_size=16).hexdigest()
@@ -0,0 +1,124 @@
+"""
+Tests for the SQLite disk embedding cache.
+
+Covers round trips and statistics, size-bounded LRU eviction (including the
+deferred access times written by later writes), reads that must not wait for
+another connection's write lock, and two processes sharing one file.
+"""
+
+import sqlite3
+import subprocess
+import sys
+import textwrap
+import time
+
+import numpy as np
+import pytest
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.embedding_service.disk_cache import DiskEmbeddingCache
+
+
+def _vector(i: int, dim: int = 384) -> np.ndarray:
+    return np.full(dim, i, dtype=np.float32)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache" / "embeddings.sqlite")
+
+
+def test_round_trip_and_stats(path):
+    cache = DiskEmbeddingCache(path)
+    cache.set("a", np.arange(384, dtype=np.float64))
+    cache.set_many(["b", "c"], [_vector(1), _vector(2)])
+
+    a, missing, c = cache.get_many(["a", "missing", "c"])
+
+    np.testing.assert_array_equal(a, np.arange(384, dtype=np.float32))
+    assert a.dtype == np.float32 and missing is None
+    np.testing.assert_array_equal(c, _vector(2))
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert stats["type"] == "disk" and stats["size"] == 3
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+    assert stats["hit_rate"] == 0.5
+    assert 0 < stats["bytes_used"] and stats["utilization"] > 0
+
+
+def test_eviction_keeps_the_size_bound(path):
+    cache = DiskEmbeddingCache(path, max_bytes=1024 * 1024)
+    for start in range(0, 1024, 64):
+        cache.set_many([f"k{i}" for i in range(start, start + 64)], [_vector(i) for i in range(start, start + 64)])
+
+    stats = cache.stats()
+    assert stats["evictions"] > 0
+    assert stats["size"] < 1024
+    assert stats["bytes_used"] <= cache.max_bytes
+    # The newest entries survive
+    np.testing.assert_array_equal(cache.get("k1023"), _vector(1023))
+    assert cache.get("k0") is None
+
+
+def test_read_access_times_are_written_by_the_next_write(path):
+    # Two batches of 64 entries slightly exceed the bound, so only the oldest few are evicted
+    cache = DiskEmbeddingCache(path, max_bytes=550 * 1024)
+    cache._TOUCH_INTERVAL_SECONDS = -1  # Every hit refreshes its access time
+    cache.set_many([f"old{i}" for i in range(64)], [_vector(i) for i in range(64)])
+    time.sleep(0.01)
+    cache.get("old0")
+    conn = sqlite3.connect(path)
+    access = dict(conn.execute("SELECT key, last_access FROM embeddings WHERE key IN ('old0', 'old1')"))
+    assert access["old0"] == access["old1"]  # The read did not write
+
+    cache.set_many([f"new{i}" for i in range(64)], [_vector(i) for i in range(64)])
+
+    assert cache.stats()["evictions"] > 0
+    assert cache.get("old1") is None
+    assert cache.get("old0") is not None  # Its access time was saved before the eviction
+    assert cache.get("new0") is not None
+    conn.close()
+
+
+def test_reads_do_not_wait_for_another_writer(path):
+    cache = DiskEmbeddingCache(path)
+    cache._TOUCH_INTERVAL_SECONDS = -1
+    keys = [f"k{i}" for i in range(cache._TOUCH_FLUSH_AT)]
+    cache.set_many(keys, [_vector(i) for i in range(len(keys))])
+
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")  # Hold the write lock
+    try:
+        started = time.perf_counter()
+        results = cache.get_many(keys)  # Enough pending access times to attempt a flush
+        elapsed = time.perf_counter() - started
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+    assert all(result is not None for result in results)
+    assert elapsed < 1.0  # busy_timeout is 5 s
+    assert len(cache._pending_touches) == len(keys)  # Kept for the next write
+    cache.set("new", _vector(0))
+    assert not cache._pending_touches
+
+
+def test_two_processes_share_the_file(path):
+    parent = DiskEmbeddingCache(path)
+    parent.set("from-parent", _vector(1))
+
+    child = textwrap.dedent(f"""
+        import numpy as np
+        import app.main
+        from app.services.embedding_service.disk_cache import DiskEmbeddingCache
+
+        cache = DiskEmbeddingCache({path!r})
+        assert cache.get("from-parent")[0] == 1.0
+        cache.set_many(["from-child-{{}}".format(i) for i in range(100)],
+                       [np.full(384, i, dtype=np.float32) for i in range(100)])
+    """)
+    completed = subprocess.run([sys.executable, "-c", child], capture_output=True, text=True, timeout=120)
+
+    assert completed.returncode == 0, completed.stderr
+    assert parent.size() == 101
+    np.testing.assert_array_equal(parent.get("from-child-42"), _vector(42))
@@ -0,0 +1,81 @@
+"""
+Tests for bulk embedding with the ONNX process pool.
+
+The pool is opt-in (EMBEDDING_BULK_WORKERS). When enabled it must return the
+in-process provider's vectors in input order through shared memory, and
+bulk jobs must still be served from the cache and the `embeddings` table
+before any worker runs.
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.embedding_service import EmbeddingService, InMemoryLRUCache
+from app.services.embedding_service.db_reuse import DatabaseReadThroughProvider
+from app.services.embedding_service.providers import ONNXProvider, StubProvider
+from app.services.embedding_service.shared import build_embedding_service
+
+TEXTS = [f"chunk {i} of the uploaded report on urban mobility" for i in range(30)]
+TEXTS.append(TEXTS[3])  # Repeated chunk
+
+
+class RecordingPool:
+    """In-process stand-in for ONNXProcessPool that records the texts it embeds."""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return np.asarray(self.provider.embed(list(texts)))
+
+    def close(self):
+        pass
+
+
+def test_bulk_workers_are_opt_in(monkeypatch):
+    monkeypatch.delenv("EMBEDDING_BULK_WORKERS", raising=False)
+    service = build_embedding_service(StubProvider())
+    assert service._bulk_workers == 1
+
+    monkeypatch.setenv("EMBEDDING_BULK_WORKERS", "3")
+    assert build_embedding_service(StubProvider())._bulk_workers == 3
+
+
+def test_process_pool_end_to_end(tiny_onnx_model):
+    provider = ONNXProvider(model_dir=tiny_onnx_model, cache=InMemoryLRUCache(), max_length=64)
+    service = EmbeddingService(provider, bulk_workers=2, bulk_min_texts=4)
+    reference = ONNXProvider(model_dir=tiny_onnx_model, max_length=64)
+    try:
+        vectors = service.embed_bulk(TEXTS)
+
+        np.testing.assert_allclose(np.asarray(vectors), np.asarray(reference.embed(TEXTS)), atol=1e-5)
+        stats = service._bulk_pool.stats()
+        assert stats["jobs"] == 1 and stats["texts"] == len(set(TEXTS))  # Duplicates embedded once
+
+        service.embed_bulk(TEXTS)  # Served from the cache
+        assert service._bulk_pool.stats()["jobs"] == 1
+    finally:
+        service.shutdown()
+
+
+def test_bulk_jobs_use_database_reuse(tiny_onnx_model, monkeypatch):
+    provider = ONNXProvider(model_dir=tiny_onnx_model, cache=InMemoryLRUCache(), max_length=64)
+    service = EmbeddingService(provider, bulk_workers=2, bulk_min_texts=4)
+    service.provider = DatabaseReadThroughProvider(provider, engine=None)
+    stored = {TEXTS[0]: np.full(8, 7.0, dtype=np.float32)}
+    monkeypatch.setattr(service.provider, "lookup", lambda texts: {t: stored[t] for t in texts if t in stored})
+    pool = RecordingPool(ONNXProvider(model_dir=tiny_onnx_model, max_length=64))
+    monkeypatch.setattr(service, "_get_bulk_pool", lambda: pool)
+
+    vectors = service.embed_bulk(TEXTS)
+
+    np.testing.assert_array_equal(vectors[0], stored[TEXTS[0]])
+    [sent] = pool.calls
+    assert TEXTS[0] not in sent and len(sent) == len(set(TEXTS)) - 1
+    assert all(vector is not None for vector in vectors)
@@ -0,0 +1,124 @@
+"""
+Tests for reusing vectors stored in the `embeddings` table.
+
+Runs against an in-memory SQLite copy of the table (the lookup only needs
+text_hash, embedding and embedding_model), so the read-through order,
+model filtering, cache fill, error fallback and the text_hash insert
+listener are covered without Postgres.
+"""
+
+import uuid
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.models import Embedding, hash_embedding_text
+from app.services.embedding_service import EmbeddingService, InMemoryLRUCache
+from app.services.embedding_service.db_reuse import DatabaseReadThroughProvider
+from app.services.embedding_service.providers import StubProvider
+
+
+class CountingProvider(StubProvider):
+    """Stub provider that records the texts it had to embed."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.computed = []
+
+    def embed(self, texts):
+        self.computed.extend([texts] if isinstance(texts, str) else texts)
+        return super().embed(texts)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE embeddings (id CHAR(32) PRIMARY KEY, source_type TEXT, source_id CHAR(32), "
+            "text_content TEXT, text_hash TEXT, visibility TEXT, owner_agent TEXT, run_id CHAR(32), "
+            "embedding TEXT, embedding_model TEXT, chunk_index INT, chunk_start INT, chunk_end INT, "
+            "extra_metadata TEXT, created_at TIMESTAMP)"
+        ))
+    return engine
+
+
+def _store(engine, texts, model_name, provider=None):
+    provider = provider or StubProvider()
+    with Session(engine) as db:
+        for text_content in texts:
+            db.add(Embedding(
+                source_type="intervention",
+                source_id=uuid.uuid4(),
+                text_content=text_content,
+                visibility="public",
+                embedding=provider.embed(text_content),
+                embedding_model=model_name,
+            ))
+        db.commit()
+
+
+def test_insert_fills_text_hash(engine):
+    _store(engine, ["Cars should be banned."], "stub:384")
+    with engine.connect() as conn:
+        stored = conn.execute(text("SELECT text_hash FROM embeddings")).scalar_one()
+    assert stored == hash_embedding_text("Cars should be banned.")
+
+
+def test_lookup_only_reuses_the_same_model(engine):
+    _store(engine, ["shared text"], "stub:384")
+    _store(engine, ["other model text"], "another-model")
+    reuse = DatabaseReadThroughProvider(StubProvider(), engine)
+
+    found = reuse.lookup(["shared text", "other model text", "unknown"])
+
+    assert list(found) == ["shared text"]
+    np.testing.assert_allclose(found["shared text"], StubProvider().embed("shared text"), atol=1e-6)
+    stats = reuse.stats()
+    assert (stats["hits"], stats["misses"], stats["errors"]) == (1, 2, 0)
+
+
+def test_read_through_order_and_cache_fill(engine):
+    _store(engine, ["stored"], "stub:384")
+    provider = CountingProvider(cache=InMemoryLRUCache())
+    provider.embed("cached")
+    provider.computed.clear()
+    reuse = DatabaseReadThroughProvider(provider, engine)
+
+    texts = ["cached", "stored", "new", "stored", "new"]
+    result = reuse.embed(texts)
+
+    assert provider.computed == ["new"]  # Duplicates embedded once, cache and database hits skipped
+    reference = StubProvider()
+    for text_content, vector in zip(texts, result):
+        np.testing.assert_allclose(vector, reference.embed(text_content), atol=1e-6)
+    # Database hits are copied into the provider's cache: no second lookup
+    assert reuse.stats()["hits"] == 1
+    reuse.embed(["stored"])
+    assert reuse.stats()["hits"] == 1
+
+
+def test_database_errors_fall_back_to_the_model():
+    broken = create_engine("sqlite://")  # No embeddings table
+    provider = CountingProvider()
+    reuse = DatabaseReadThroughProvider(provider, broken)
+
+    result = reuse.embed(["a", "b"])
+
+    assert provider.computed == ["a", "b"]
+    assert len(result) == 2
+    assert reuse.stats()["errors"] == 1
+
+
+def test_service_wraps_provider_once(engine):
+    service = EmbeddingService(StubProvider())
+    service.enable_database_reuse(engine)
+    service.enable_database_reuse(engine)
+
+    assert isinstance(service.provider, DatabaseReadThroughProvider)
+    assert not isinstance(service.provider.provider, DatabaseReadThroughProvider)
+    service.shutdown()
@@ -0,0 +1,95 @@
+"""
+Hedging and failover tests for the fallback embedding provider.
+
+A slow primary must not delay callers beyond the hedge delay, a failing
+primary must fail over, and only compatible providers may be chained.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.embedding_service import EmbeddingProviderFactory
+from app.services.embedding_service.providers import StubProvider
+
+
+class SlowProvider(StubProvider):
+    """Stub provider that takes `delay` seconds per call."""
+
+    def __init__(self, delay: float, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+
+    def embed(self, texts):
+        time.sleep(self.delay)
+        return super().embed(texts)
+
+
+class FailingProvider(StubProvider):
+    """Stub provider that raises while `failing` is set."""
+
+    failing = True
+
+    def embed(self, texts):
+        if self.failing:
+            raise ConnectionError("provider unavailable")
+        return super().embed(texts)
+
+
+def test_slow_primary_is_hedged():
+    fallback = EmbeddingProviderFactory.create_fallback_provider(
+        [SlowProvider(delay=1.0), StubProvider()], initial_hedge_delay_ms=20
+    )
+    started = time.perf_counter()
+    vectors = fallback.embed(["a hedged request", "another one"])
+    elapsed = time.perf_counter() - started
+    async_vectors = asyncio.run(fallback.embed_async(["a hedged request", "another one"]))
+
+    assert elapsed < 0.5
+    np.testing.assert_allclose(np.array(vectors), np.array(StubProvider().embed(["a hedged request", "another one"])))
+    np.testing.assert_allclose(np.array(async_vectors), np.array(vectors))
+    primary, secondary = fallback.stats()["providers"]
+    assert secondary["wins"] == 2 and secondary["hedged_calls"] == 2 and primary["wins"] == 0
+
+
+def test_fast_primary_is_not_hedged():
+    fallback = EmbeddingProviderFactory.create_fallback_provider([StubProvider(), SlowProvider(delay=1.0)])
+    fallback.embed("answered by the primary")
+
+    primary, secondary = fallback.stats()["providers"]
+    assert primary["wins"] == 1 and primary["latency_ms_p95"] is not None
+    assert secondary["calls"] == 0
+
+
+def test_failing_primary_fails_over():
+    fallback = EmbeddingProviderFactory.create_fallback_provider(
+        [FailingProvider(), StubProvider()], initial_hedge_delay_ms=5000
+    )
+    started = time.perf_counter()
+    fallback.embed("fails over without waiting for the hedge delay")
+
+    assert time.perf_counter() - started < 1.0
+    primary, secondary = fallback.stats()["providers"]
+    assert primary["errors"] == 1 and secondary["wins"] == 1
+
+
+def test_incompatible_providers_are_rejected():
+    with pytest.raises(ValueError):
+        EmbeddingProviderFactory.create_fallback_provider([StubProvider(dim=384), StubProvider(dim=768)])
+
+
+def test_mismatched_dimension_disables_provider():
+    primary = FailingProvider(dim=384)
+    fallback = EmbeddingProviderFactory.create_fallback_provider(
+        [primary, StubProvider(dim=768)], same_embedding_space=True
+    )
+    primary.failing = False
+    fallback.embed("sets the chain's dimension")
+    primary.failing = True  # The 768-d provider answers next
+
+    with pytest.raises(Exception):
+        fallback.embed("wrong dimension")
+    assert fallback.stats()["providers"][1]["disabled"] is not None
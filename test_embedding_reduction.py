@@ -0,0 +1,79 @@
+"""
+Tests for reduced-dimension embedding storage.
+
+Stored and query vectors must go through the same projection, reduced rows
+must carry a tagged model name, and vectors that do not fit the column
+must be rejected rather than silently stored.
+"""
+
+import numpy as np
+import pytest
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.embedding_service.providers import StubProvider
+from app.services.embedding_service.reduction import (
+    EmbeddingReducer,
+    EmbeddingStorage,
+    PCAReducer,
+    TruncationReducer,
+    create_reducer,
+)
+from app.services.embedding_service.similarity import top_k
+
+TEXTS = [f"intervention {i} about the regulation of artificial intelligence" for i in range(400)]
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    return np.array(StubProvider(dim=384).embed(TEXTS))
+
+
+def test_full_storage_passes_vectors_through(vectors):
+    storage = EmbeddingStorage(384)
+    np.testing.assert_array_equal(storage.project(vectors, "m"), vectors)
+    assert storage.model_name("m") == "m"
+    assert storage.project([], "m").shape == (0, 384)
+    with pytest.raises(ValueError):
+        storage.project(vectors[:, :128], "m")
+
+
+def test_pca_round_trip_and_projection(vectors, tmp_path):
+    reducer = PCAReducer.fit(vectors, 64, "stub:384")
+    path = str(tmp_path / "pca.npz")
+    reducer.save(path)
+    loaded = create_reducer("pca", 64, path)
+
+    storage = EmbeddingStorage(64, "halfvec", loaded)
+    stored = storage.project(vectors, "stub:384")
+    assert stored.shape == (len(TEXTS), 64)
+    np.testing.assert_allclose(np.linalg.norm(stored, axis=1), 1.0, atol=1e-5)
+    np.testing.assert_allclose(stored, reducer.transform(vectors), atol=1e-6)
+    assert storage.model_name("stub:384") == "stub:384+pca64"
+    assert storage.bytes_per_vector == 128
+
+    # A query identical to a stored text still finds it first
+    idx, _ = top_k(storage.project(vectors[7], "stub:384"), stored, 1)
+    assert idx[0] == 7
+
+    with pytest.raises(ValueError):
+        storage.project(vectors, "another-model")  # Projection was fitted on stub:384
+
+
+def test_truncation_keeps_leading_components(vectors):
+    storage = EmbeddingStorage(128, reducer=TruncationReducer(128))
+    stored = storage.project(vectors, "any")
+    expected = vectors[:, :128] / np.linalg.norm(vectors[:, :128], axis=1, keepdims=True)
+    np.testing.assert_allclose(stored, expected, atol=1e-6)
+    assert storage.model_name("any") == "any+mrl128"
+
+
+def test_reducer_must_match_storage_dim():
+    with pytest.raises(ValueError):
+        EmbeddingStorage(64, reducer=TruncationReducer(128))
+    with pytest.raises(ValueError):
+        create_reducer("pca", 64, "/nonexistent/pca.npz")
+
+
+def test_reducers_must_implement_transform():
+    with pytest.raises(TypeError):
+        EmbeddingReducer(128)
@@ -0,0 +1,113 @@
+"""
+Tests for per-run embedding model selection.
+
+Runs choosing the same model must share one pooled service, the server
+default (and the legacy `onnx_minilm` default) must resolve to the shared
+service, request-supplied settings must not reach credentials or endpoints,
+models whose vectors do not fit the column are rejected, and an evicted
+service is only shut down once no run holds it.
+"""
+
+import pytest
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.embedding_service import (
+    EmbeddingServiceRegistry,
+    EmbeddingStorage,
+    TruncationReducer,
+    get_embedding_service,
+    reset_embedding_service,
+)
+from app.services.embedding_service import reduction
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "stub")
+    monkeypatch.setenv("EMBEDDING_STUB_DIM", "384")
+    # A 32-wide column takes any model of at least 32 dimensions
+    monkeypatch.setattr(reduction, "_storage", EmbeddingStorage(32, "vector", TruncationReducer(32)))
+    reset_embedding_service()
+    registry = EmbeddingServiceRegistry(max_services=2)
+    yield registry
+    registry.clear()
+    reset_embedding_service()
+
+
+def test_default_selection_uses_shared_service(registry):
+    shared = get_embedding_service()
+    assert registry.resolve(None) is shared
+    assert registry.resolve("stub") is shared  # Same provider and settings as the server default
+    assert registry.resolve("no-such-provider") is shared
+    assert registry.stats()["pooled"] == 0
+
+
+def test_same_selection_shares_one_pooled_service(registry):
+    small = registry.resolve("stub", {"dim": 64})
+    assert small is registry.resolve("stub", {"dim": 64})
+    assert small is not get_embedding_service()
+    assert small.model_name == "stub:64"
+    assert small.encode(["hello"]).shape == (1, 64)
+
+    other = registry.resolve("stub", {"dim": 128})
+    assert other is not small and other.model_name == "stub:128"
+    assert registry.stats()["created"] == 2
+
+
+def test_credentials_and_unknown_settings_are_ignored(registry):
+    shared = get_embedding_service()
+    assert registry.resolve("stub", {"api_key": "leak", "base_url": "http://example.com"}) is shared
+    assert registry.stats()["pooled"] == 0
+
+
+def test_least_recently_used_service_is_evicted(registry):
+    first = registry.resolve("stub", {"dim": 32})
+    registry.resolve("stub", {"dim": 64})
+    registry.resolve("stub", {"dim": 32})  # Refresh the first
+    registry.resolve("stub", {"dim": 128})  # Evicts dim 64
+
+    assert registry.resolve("stub", {"dim": 32}) is first
+    stats = registry.stats()
+    assert stats["evicted"] == 1
+    assert sorted(s["model"] for s in stats["services"]) == ["stub:128", "stub:32"]
+
+
+def test_legacy_onnx_minilm_default_uses_shared_service(registry):
+    assert registry.resolve("onnx_minilm") is get_embedding_service()
+    assert registry.resolve("ONNX_MiniLM", {"variant": "int8"}) is get_embedding_service()
+    assert registry.stats()["created"] == 0
+
+
+def test_models_that_do_not_fit_the_column_are_rejected(registry):
+    assert registry.resolve("stub", {"dim": 16}) is get_embedding_service()
+    stats = registry.stats()
+    assert stats["pooled"] == 0 and stats["failures"] == 1
+
+
+def test_evicted_service_is_shut_down_after_its_last_release(registry, monkeypatch):
+    shut_down = []
+    held = registry.acquire("stub", {"dim": 32})
+    monkeypatch.setattr(held, "shutdown", lambda wait=True: shut_down.append(held))
+    assert registry.acquire("stub", {"dim": 32}) is held  # A second run on the same model
+
+    registry.resolve("stub", {"dim": 64})
+    registry.resolve("stub", {"dim": 128})  # Evicts dim 32 while two runs hold it
+    assert registry.stats()["retired"] == 1
+    assert registry.resolve("stub", {"dim": 32}) is not held  # New runs get a fresh service
+
+    registry.release(held)
+    assert shut_down == []
+    registry.release(held)
+    assert shut_down == [held]
+    stats = registry.stats()
+    assert stats["retired"] == 0 and stats["held"] == 0
+
+
+def test_released_pooled_service_stays_pooled(registry, monkeypatch):
+    shut_down = []
+    service = registry.acquire("stub", {"dim": 32})
+    monkeypatch.setattr(service, "shutdown", lambda wait=True: shut_down.append(service))
+    registry.release(service)
+    assert registry.resolve("stub", {"dim": 32}) is service
+    assert shut_down == []
+    registry.release(get_embedding_service())  # Releasing the shared service is a no-op
@@ -0,0 +1,114 @@
+"""
+Event-loop lag regression test for the simulation persistence path.
+
+Embedding a step must happen on the embedding executor, never on the event
+loop thread, so a slow provider cannot stall other requests while a run
+persists its steps. Providers without a native async API get the same
+guarantee from the default `embed_async`.
+"""
+
+import asyncio
+import threading
+import time
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.embedding_service import EmbeddingService
+from app.services.embedding_service.providers import StubProvider
+from app.services.embedding_service.shared import SharedEmbeddingService
+from app.services.simulation_service import SimulationService, StepRecord, StepWriter
+
+BLOCK_SECONDS = 0.3   # Simulated inference time per batch
+MAX_LAG_SECONDS = 0.1  # Anything close to BLOCK_SECONDS means inference ran on the loop
+
+
+class SlowProvider(StubProvider):
+    """Stub provider whose inference blocks the calling thread, like ONNX on CPU."""
+
+    def embed(self, texts):
+        time.sleep(BLOCK_SECONDS)
+        return super().embed(texts)
+
+
+def _record(iteration: int) -> StepRecord:
+    return StepRecord(
+        iteration=iteration,
+        step_result={"speaker": "A", "opinion": f"opinion {iteration}", "engaged": [], "finished": False, "stopped_reason": None},
+        tool_usage={"tools_used": [{"tool_name": "web_search_wikipedia", "query": "q", "result": "r"}]},
+        prediction_metadata=None,
+    )
+
+
+async def _persist_steps_measuring_lag(service: SimulationService, persisted: list) -> float:
+    max_lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal max_lag
+        interval = 0.01
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            max_lag = max(max_lag, time.perf_counter() - started - interval)
+
+    tick_task = asyncio.create_task(ticker())
+    writer = StepWriter(persisted.append, max_pending=2, prepare=service._embed_step)
+    for i in range(3):
+        await writer.submit(_record(i))
+    await writer.close()
+    done.set()
+    await tick_task
+    return max_lag
+
+
+def test_persistence_path_does_not_block_event_loop():
+    SharedEmbeddingService.reset()
+    SharedEmbeddingService._instance = EmbeddingService(SlowProvider())
+    try:
+        persisted = []
+        lag = asyncio.run(_persist_steps_measuring_lag(SimulationService(lm=None, engine=None), persisted))
+    finally:
+        SharedEmbeddingService.reset()
+
+    assert lag < MAX_LAG_SECONDS, f"event loop stalled for {lag:.3f}s while persisting steps"
+    assert [r.iteration for r in persisted] == [0, 1, 2]
+    for record in persisted:
+        # Vectors are ready before the write: intervention + tool query + tool output
+        assert record.embeddings is not None and record.embeddings.shape == (3, 384)
+        assert record.embedding_model == "stub:384"
+
+
+class ThreadRecordingProvider(StubProvider):
+    """Stub provider that records the thread each inference ran on."""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def embed(self, texts):
+        self.threads.append(threading.current_thread().name)
+        return super().embed(texts)
+
+
+def test_default_embed_async_runs_off_the_event_loop():
+    provider = ThreadRecordingProvider()
+
+    vectors = asyncio.run(provider.embed_async(["a", "b"]))
+
+    assert len(vectors) == 2
+    assert provider.threads and provider.threads[0] != threading.main_thread().name
+
+
+def test_service_async_api_uses_its_embedding_executor():
+    provider = ThreadRecordingProvider()
+    service = EmbeddingService(provider)
+
+    async def embed_everything():
+        await service.encode_async(["a", "b"])
+        await service.embed_batch_async(["c"])
+        await service.embed_batch_async(["d"], batch_size=1)
+
+    asyncio.run(embed_everything())
+    service.shutdown()
+
+    assert len(provider.threads) == 3
+    assert all(name.startswith("embedding") for name in provider.threads)
@@ -0,0 +1,64 @@
+"""
+Tests for the in-memory LRU embedding cache.
+
+Entries expire `ttl_seconds` after they were written, measured on the
+monotonic clock (`_now`, patched here), and the hit, miss, eviction and
+expiration counters must account for every lookup and removal.
+"""
+
+import numpy as np
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.embedding_service import InMemoryLRUCache
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _vector(value: float) -> np.ndarray:
+    return np.full(4, value, dtype=np.float32)
+
+
+def test_entries_expire_after_ttl_on_the_monotonic_clock(monkeypatch):
+    clock = Clock()
+    cache = InMemoryLRUCache(capacity=10, ttl_seconds=60)
+    monkeypatch.setattr(cache, "_now", clock)
+
+    cache.set("a", _vector(1))
+    clock.now += 30
+    cache.set_many(["b", "c"], [_vector(2), _vector(3)])
+
+    clock.now += 30  # "a" is exactly 60 s old: still valid
+    np.testing.assert_array_equal(cache.get("a"), _vector(1))
+    clock.now += 1
+    assert cache.get("a") is None
+    assert cache.size() == 2  # Expired entries are dropped on lookup
+
+    cache.set("b", _vector(20))  # Rewriting restarts the entry's TTL
+    clock.now += 59
+    b, c = cache.get_many(["b", "c"])
+    np.testing.assert_array_equal(b, _vector(20))
+    assert c is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"], stats["evictions"]) == (2, 2, 2, 0)
+
+
+def test_counters_track_hits_misses_and_evictions(monkeypatch):
+    cache = InMemoryLRUCache(capacity=2)
+    monkeypatch.setattr(cache, "_now", Clock())
+
+    cache.set_many(["a", "b"], [_vector(1), _vector(2)])
+    assert cache.get("a") is not None  # "a" becomes most recently used
+    cache.set("c", _vector(3))  # Evicts "b", the least recently used
+    a, b, c, d = cache.get_many(["a", "b", "c", "d"])
+
+    assert a is not None and c is not None and b is None and d is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["expirations"]) == (3, 2, 1, 0)
+    assert stats["hit_rate"] == 3 / 5 and stats["size"] == 2
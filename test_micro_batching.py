@@ -0,0 +1,131 @@
+"""
+Tests for the micro-batching embedding dispatcher.
+
+Concurrent small requests must share provider calls, every caller must get
+its own vectors back in its own order, a failed batch must raise in every
+caller of that batch, and close() must stop the dispatcher thread before a
+new one can start.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.embedding_service import InMemoryLRUCache
+from app.services.embedding_service.dispatcher import MicroBatchingProvider
+from app.services.embedding_service.providers import StubProvider
+
+
+class GatedProvider(StubProvider):
+    """Stub provider that records its calls and can hold them until released."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self.fail = False
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        self.release.wait(timeout=10)
+        if self.fail:
+            raise RuntimeError("model crashed")
+        return super().embed(texts)
+
+
+def _wait_for_inflight(batcher: MicroBatchingProvider, n: int) -> None:
+    deadline = time.monotonic() + 10
+    while batcher._inflight < n:
+        assert time.monotonic() < deadline, "requests never reached the dispatcher"
+        time.sleep(0.001)
+
+
+def _hold_first_batch(batcher: MicroBatchingProvider, provider: GatedProvider, pool: ThreadPoolExecutor):
+    """Occupy the dispatcher with one request so the following ones queue up behind it."""
+    provider.release.clear()
+    blocker = pool.submit(batcher.embed, ["blocker"])
+    deadline = time.monotonic() + 10
+    while not provider.calls:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    return blocker
+
+
+def test_concurrent_requests_share_one_call_and_keep_caller_order():
+    provider = GatedProvider()
+    batcher = MicroBatchingProvider(provider, max_wait_ms=1000, max_batch=64)
+    reference = StubProvider()
+    requests = [[f"text {i}", "shared", f"text {i} again"] for i in range(6)] + [["shared"]]
+
+    with ThreadPoolExecutor(max_workers=len(requests) + 1) as pool:
+        blocker = _hold_first_batch(batcher, provider, pool)
+        futures = [pool.submit(batcher.embed, texts) for texts in requests]
+        _wait_for_inflight(batcher, len(requests) + 1)
+        provider.release.set()
+        blocker.result()
+        results = [future.result() for future in futures]
+
+    assert len(provider.calls) == 2  # The blocker, then every queued request together
+    assert provider.calls[1].count("shared") == 1  # Duplicates across callers embedded once
+    for texts, vectors in zip(requests, results):
+        assert len(vectors) == len(texts)
+        for text, vector in zip(texts, vectors):
+            np.testing.assert_array_equal(vector, reference.embed(text))
+    stats = batcher.stats()
+    assert stats["requests"] == len(requests) + 1 and stats["batches"] == 2
+    batcher.close()
+
+
+def test_errors_reach_every_caller_of_the_batch():
+    provider = GatedProvider()
+    batcher = MicroBatchingProvider(provider, max_wait_ms=1000, max_batch=64)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        blocker = _hold_first_batch(batcher, provider, pool)
+        futures = [pool.submit(batcher.embed, [f"text {i}"]) for i in range(3)]
+        _wait_for_inflight(batcher, 4)
+        provider.fail = True
+        provider.release.set()
+        for future in [blocker] + futures:
+            with pytest.raises(RuntimeError, match="model crashed"):
+                future.result()
+
+    provider.fail = False
+    assert len(batcher.embed(["after the failure"])) == 1  # The dispatcher keeps serving
+    batcher.close()
+
+
+def test_cache_hits_and_large_requests_skip_the_queue():
+    provider = GatedProvider(cache=InMemoryLRUCache())
+    batcher = MicroBatchingProvider(provider, max_batch=4)
+    provider.embed(["cached"])
+    provider.calls.clear()
+
+    batcher.embed(["cached"])
+    batcher.embed([f"text {i}" for i in range(4)])
+
+    assert provider.calls == [[f"text {i}" for i in range(4)]]
+    assert batcher.stats()["requests"] == 0
+
+
+def test_close_joins_the_dispatcher_before_restarting():
+    provider = GatedProvider()
+    batcher = MicroBatchingProvider(provider, max_wait_ms=0)
+    batcher.embed(["first"])
+    old_thread = batcher._thread
+
+    batcher.close()
+
+    assert not old_thread.is_alive()
+    assert batcher._thread is None
+    batcher.embed(["second"])
+    new_thread = batcher._thread
+    assert new_thread is not old_thread and new_thread.is_alive()
+    batcher.close()
+    batcher.close()  # Idempotent
+    assert not new_thread.is_alive()
@@ -0,0 +1,133 @@
+"""
+Tests for ONNXProvider inference batching and session setup.
+
+Texts are sorted by token length into buckets of `batch_size`; each bucket
+must be padded only to its own longest text, and results must come back in
+input order, identical to embedding each text alone. Session settings must
+reach ONNX Runtime, and the optimized graph must be cached once, reused on
+the next start and rebuilt when the source model changes. INT8 and FP16
+variants derived with `create_onnx_variants` must be selected by `variant`
+and stay close to the FP32 model. Inference runs on the tiny generated graph
+(`tiny_onnx_model` in conftest.py).
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+ort = pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.embedding_service import create_onnx_variants
+from app.services.embedding_service.providers import ONNXProvider
+from app.services.embedding_service.similarity import cosine_scores
+
+TEXTS = [
+    "Cars should be banned from the historic centre.",
+    "No.",
+    "Public transport emissions matter, but so do the delivery vans that keep local shops open.",
+    "I agree with the previous speaker.",
+    "Bikes.",
+]
+
+
+def test_buckets_pad_to_their_own_longest_text(tiny_onnx_model, monkeypatch):
+    provider = ONNXProvider(model_dir=tiny_onnx_model, batch_size=2, max_length=64)
+    expected = [provider._embed_batch([text])[0] for text in TEXTS]
+    lengths = sorted(len(ids) for ids in provider.tokenize(TEXTS)[0])
+
+    shapes = []
+    run = provider.session.run
+
+    def recording_run(output_names, input_feed):
+        shapes.append(input_feed["input_ids"].shape)
+        return run(output_names, input_feed)
+
+    monkeypatch.setattr(provider.session, "run", recording_run)
+    vectors = provider._embed_batch(TEXTS)
+
+    # Shortest texts first, two per bucket, each padded to its bucket's longest text
+    assert shapes == [(2, lengths[1]), (2, lengths[3]), (1, lengths[4])]
+    for vector, single in zip(vectors, expected):
+        np.testing.assert_allclose(vector, single, atol=1e-6)
+
+
+@pytest.fixture
+def model_copy(tiny_onnx_model, tmp_path):
+    """A private copy of the tiny model, for tests that modify the model directory."""
+    path = tmp_path / "model"
+    shutil.copytree(tiny_onnx_model, path)
+    return str(path)
+
+
+def test_session_options_are_applied(tiny_onnx_model):
+    provider = ONNXProvider(
+        model_dir=tiny_onnx_model,
+        intra_op_threads=2,
+        inter_op_threads=3,
+        graph_optimization="basic",
+        execution_mode="parallel",
+        enable_mem_arena=False,
+    )
+    options = provider.session.get_session_options()
+
+    assert options.intra_op_num_threads == 2 and options.inter_op_num_threads == 3
+    assert options.graph_optimization_level == ort.GraphOptimizationLevel.ORT_ENABLE_BASIC
+    assert options.execution_mode == ort.ExecutionMode.ORT_PARALLEL
+    assert not options.enable_cpu_mem_arena
+    with pytest.raises(ValueError, match="graph_optimization"):
+        ONNXProvider(model_dir=tiny_onnx_model, graph_optimization="fastest")
+
+
+def test_optimized_graph_is_cached_and_invalidated(model_copy, tmp_path):
+    cache_dir = str(tmp_path / "optimized")
+    first = ONNXProvider(model_dir=model_copy, optimized_model_dir=cache_dir)
+    [cached] = os.listdir(cache_dir)
+    assert cached.startswith("model.all.")
+
+    reused = ONNXProvider(model_dir=model_copy, optimized_model_dir=cache_dir)
+    assert os.listdir(cache_dir) == [cached]
+    # Loaded from the cache: the graph is already optimized
+    assert reused.session.get_session_options().graph_optimization_level == ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+    np.testing.assert_allclose(reused.embed(TEXTS[0]), first.embed(TEXTS[0]), atol=1e-6)
+
+    # A changed source model (new mtime) or optimization level gets its own graph
+    model_path = os.path.join(model_copy, "model.onnx")
+    stat = os.stat(model_path)
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    ONNXProvider(model_dir=model_copy, optimized_model_dir=cache_dir)
+    ONNXProvider(model_dir=model_copy, optimized_model_dir=cache_dir, graph_optimization="basic")
+    files = sorted(os.listdir(cache_dir))
+    assert len(files) == 3 and cached in files
+    assert sum(name.startswith("model.basic.") for name in files) == 1
+
+
+def test_variants_are_created_and_selected(model_copy):
+    onnx = pytest.importorskip("onnx")
+    with pytest.raises(FileNotFoundError, match="--variants int8"):
+        ONNXProvider(model_dir=model_copy, variant="int8")
+
+    create_onnx_variants(model_copy, ["int8", "fp16"])
+    reference = ONNXProvider(model_dir=model_copy)
+    int8 = ONNXProvider(model_dir=model_copy, variant="int8")
+    fp16 = ONNXProvider(model_dir=model_copy, variant="fp16")
+
+    assert reference.model_name == f"onnx:{model_copy}"
+    assert int8.model_name == f"onnx:{model_copy}:int8" and fp16.model_name == f"onnx:{model_copy}:fp16"
+    int8_graph = onnx.load(os.path.join(model_copy, "model_int8.onnx")).graph
+    assert any(node.op_type == "DequantizeLinear" for node in int8_graph.node)  # 8-bit weights, dequantized at runtime
+    fp16_graph = onnx.load(os.path.join(model_copy, "model_fp16.onnx")).graph
+    assert all(init.data_type == onnx.TensorProto.FLOAT16 for init in fp16_graph.initializer)
+    assert fp16_graph.output[0].type.tensor_type.elem_type == onnx.TensorProto.FLOAT  # FP32 outputs kept
+
+    expected = np.stack(reference.embed(TEXTS))
+    for provider in (int8, fp16):
+        vectors = np.stack(provider.embed(TEXTS))
+        assert vectors.dtype == np.float32
+        assert np.diag(cosine_scores(vectors, expected, assume_normalized=False)).min() > 0.99
+
+    with pytest.raises(ValueError, match="Unknown model variant"):
+        create_onnx_variants(model_copy, ["int4"])
@@ -0,0 +1,83 @@
+"""
+Tests for the ONNX provider's `tokenizers` fast path.
+
+The Rust tokenizer must produce exactly the token ids of `AutoTokenizer`
+(including truncation), and embeddings must not depend on the backend or on
+reusing the input buffers across batches and threads. Inference runs on a
+tiny generated graph (`tiny_onnx_model` in conftest.py), so no exported
+model is needed.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+pytest.importorskip("transformers")
+pytest.importorskip("onnx")
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.embedding_service.providers import ONNXProvider
+
+TEXTS = [
+    "Cars should be banned from the historic centre.",
+    "",
+    "Public transport emissions " * 80,  # Truncated at max_length
+    "Délivery drivers and local businesses need access ✓",
+    "I agree.",
+]
+
+
+@pytest.fixture(scope="module")
+def model_dir(tiny_onnx_model):
+    return tiny_onnx_model
+
+
+def _provider(model_dir, backend, **kwargs):
+    return ONNXProvider(model_dir=model_dir, tokenizer_backend=backend, max_length=64, **kwargs)
+
+
+def test_fast_tokenizer_matches_auto_tokenizer(model_dir):
+    fast = _provider(model_dir, "tokenizers")
+    slow = _provider(model_dir, "transformers")
+    assert fast.tokenizer_backend == "tokenizers"
+    assert slow.tokenizer_backend == "transformers"
+    assert _provider(model_dir, "auto").tokenizer_backend == "tokenizers"
+
+    fast_ids, fast_types = fast.tokenize(TEXTS)
+    slow_ids, slow_types = slow.tokenize(TEXTS)
+    assert [list(ids) for ids in fast_ids] == [list(ids) for ids in slow_ids]
+    assert [list(types) for types in fast_types] == [list(types) for types in slow_types]
+    assert max(len(ids) for ids in fast_ids) == 64
+
+
+def test_embeddings_match_across_backends_and_buffer_reuse(model_dir):
+    fast = _provider(model_dir, "tokenizers", batch_size=2)
+    slow = _provider(model_dir, "transformers", batch_size=2)
+
+    expected = slow._embed_batch(TEXTS)
+    first = fast._embed_batch(TEXTS)
+    buffer = fast._buffers.ids
+    second = fast._embed_batch(list(reversed(TEXTS)))[::-1]
+
+    assert fast._buffers.ids is buffer  # Reused across calls, not reallocated
+    for a, b, c in zip(expected, first, second):
+        np.testing.assert_allclose(a, b, atol=1e-6)
+        np.testing.assert_allclose(b, c, atol=1e-6)
+
+    # A batch_size override beyond the preallocated capacity grows the buffers
+    np.testing.assert_allclose(np.stack(fast._embed_batch(TEXTS * 4, 20)[:5]), np.stack(expected), atol=1e-6)
+
+
+def test_concurrent_calls_use_separate_buffers(model_dir):
+    provider = _provider(model_dir, "tokenizers", batch_size=4)
+    texts = [f"{text} {i}" for i in range(8) for text in TEXTS]
+    expected = provider._embed_batch(texts)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: provider._embed_batch(texts), range(8)))
+
+    for result in results:
+        np.testing.assert_allclose(np.stack(result), np.stack(expected), atol=1e-6)
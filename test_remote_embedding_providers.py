@@ -0,0 +1,100 @@
+"""
+Concurrency and retry tests for the remote embedding providers.
+
+Runs against the local HTTP stub, so no network access or API keys are
+needed. Batches must go out concurrently, come back in input order, and
+rate-limit/server errors must be retried.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.embedding_service.cache import InMemoryLRUCache
+from app.services.embedding_service.http_stub import EmbeddingHTTPStub
+from app.services.embedding_service.providers import HuggingFaceProvider, OpenRouterProvider, StubProvider
+
+TEXTS = [f"chunk {i} of the uploaded document" for i in range(50)]
+
+
+def _expected(texts):
+    return StubProvider(dim=384).embed(texts)  # The stub serves the same (unnormalized) vectors
+
+
+def _hf(stub: EmbeddingHTTPStub, **kwargs) -> HuggingFaceProvider:
+    return HuggingFaceProvider(base_url=stub.url, api_key="test", batch_size=4, retry_base_delay=0.01, **kwargs)
+
+
+def _openrouter(stub: EmbeddingHTTPStub, **kwargs) -> OpenRouterProvider:
+    return OpenRouterProvider(api_base=stub.url, api_key="test", batch_size=4, retry_base_delay=0.01, **kwargs)
+
+
+def test_huggingface_batches_are_concurrent_and_ordered():
+    with EmbeddingHTTPStub(latency_ms=30) as stub:
+        provider = _hf(stub, max_concurrency=4)
+        vectors = provider.embed(TEXTS)
+        provider.close()
+
+    assert stub.requests == 13  # ceil(50 / 4)
+    assert stub.max_concurrent > 1
+    np.testing.assert_allclose(np.array(vectors), np.array(_expected(TEXTS)), atol=1e-6)
+
+
+def test_huggingface_async_batches_are_concurrent_and_ordered():
+    with EmbeddingHTTPStub(latency_ms=30) as stub:
+        vectors = asyncio.run(_hf(stub, max_concurrency=4).embed_async(TEXTS))
+
+    assert stub.max_concurrent > 1
+    np.testing.assert_allclose(np.array(vectors), np.array(_expected(TEXTS)), atol=1e-6)
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_huggingface_retries_transient_errors(status):
+    with EmbeddingHTTPStub(fail_first=2, fail_status=status) as stub:
+        vectors = _hf(stub, max_concurrency=1).embed(TEXTS[:4])
+
+    assert stub.failures == 2 and stub.requests == 3
+    np.testing.assert_allclose(np.array(vectors), np.array(_expected(TEXTS[:4])), atol=1e-6)
+
+
+def test_huggingface_gives_up_after_max_retries():
+    with EmbeddingHTTPStub(fail_first=10, fail_status=503) as stub:
+        with pytest.raises(Exception):
+            _hf(stub, max_concurrency=1, max_retries=2).embed(TEXTS[:4])
+
+    assert stub.requests == 3  # First attempt + 2 retries
+
+
+def test_openrouter_chunks_are_concurrent_ordered_and_recorded():
+    with EmbeddingHTTPStub(latency_ms=30) as stub:
+        provider = _openrouter(stub, max_concurrency=4)
+        vectors = provider.embed(TEXTS)
+        async_vectors = asyncio.run(_openrouter(stub, max_concurrency=4).embed_async(TEXTS))
+        provider.close()
+
+    assert stub.max_concurrent > 1
+    expected = np.array(_expected(TEXTS))
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    np.testing.assert_allclose(np.array(vectors), expected, atol=1e-6)
+    np.testing.assert_allclose(np.array(async_vectors), expected, atol=1e-6)
+
+    stats = provider.stats()
+    assert stats["requests"] == 13 and stats["texts"] == len(TEXTS)
+    assert stats["prompt_tokens"] == sum(len(text.split()) for text in TEXTS)
+    assert stats["latency_ms_mean"] >= 30
+
+
+def test_openrouter_keeps_completed_chunks_when_one_fails():
+    with EmbeddingHTTPStub(fail_first=1, fail_status=503) as stub:
+        provider = _openrouter(stub, max_concurrency=1, max_retries=0, cache=InMemoryLRUCache(capacity=100))
+        with pytest.raises(Exception):
+            provider.embed(TEXTS[:12])  # 3 chunks, the first fails
+        assert provider.cache.size() == 8
+
+        provider.embed(TEXTS[:12])  # Resumes: only the failed chunk is requested again
+        provider.close()
+
+    assert stub.requests == 4
+    assert provider.stats()["failed_requests"] == 1
@@ -0,0 +1,116 @@
+"""
+Tests for the vectorized similarity kernels.
+
+`cosine_scores` and `top_k` must agree with a plain float64 reference for
+single and many queries, for float16 corpora split into float32 blocks, for
+`k` at or beyond the corpus size and for zero vectors. Providers'
+`cosine_many` must normalize caller vectors unless told they already are.
+"""
+
+import numpy as np
+import pytest
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.embedding_service import similarity
+from app.services.embedding_service.providers import StubProvider
+from app.services.embedding_service.similarity import cosine_scores, normalize_rows, top_k
+
+DIM = 16
+
+
+def _reference(queries: np.ndarray, corpus: np.ndarray) -> np.ndarray:
+    q = np.asarray(queries, dtype=np.float64).reshape(-1, DIM)
+    c = np.asarray(corpus, dtype=np.float64)
+    q_norms = np.linalg.norm(q, axis=1, keepdims=True)
+    c_norms = np.linalg.norm(c, axis=1, keepdims=True)
+    q = np.divide(q, q_norms, out=np.zeros_like(q), where=q_norms > 0)
+    c = np.divide(c, c_norms, out=np.zeros_like(c), where=c_norms > 0)
+    return q @ c.T
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((5, DIM)).astype(np.float32), rng.standard_normal((50, DIM)).astype(np.float32)
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(similarity, "_BLOCK_ROWS", 7)  # 50 rows -> 8 blocks, the last one partial
+
+
+def test_many_queries_match_single_queries(vectors):
+    queries, corpus = vectors
+    scores = cosine_scores(queries, corpus, assume_normalized=False)
+
+    assert scores.shape == (5, 50)
+    np.testing.assert_allclose(scores, _reference(queries, corpus), atol=1e-5)
+    for i, query in enumerate(queries):
+        np.testing.assert_allclose(cosine_scores(query, corpus, assume_normalized=False), scores[i], atol=1e-6)
+
+    idx, top = top_k(queries, corpus, 4, assume_normalized=False)
+    assert idx.shape == top.shape == (5, 4)
+    np.testing.assert_array_equal(idx, np.argsort(-_reference(queries, corpus), axis=1)[:, :4])
+
+
+@pytest.mark.parametrize("assume_normalized", [True, False])
+def test_float16_corpus_uses_float32_blocks(vectors, small_blocks, assume_normalized):
+    queries, corpus = vectors
+    if assume_normalized:
+        queries, corpus = normalize_rows(queries), normalize_rows(corpus)
+    half = corpus.astype(np.float16)
+
+    scores = cosine_scores(queries, half, assume_normalized=assume_normalized)
+    idx, top = top_k(queries, half, 3, assume_normalized=assume_normalized)
+
+    assert scores.dtype == np.float32 and top.dtype == np.float32
+    expected = _reference(queries, half)
+    np.testing.assert_allclose(scores, expected, atol=1e-3)
+    np.testing.assert_array_equal(idx, np.argsort(-expected, axis=1)[:, :3])
+    assert half.dtype == np.float16  # Inputs are never converted in place
+
+
+def test_k_at_or_beyond_corpus_size(vectors, small_blocks):
+    queries, corpus = vectors
+    expected = np.argsort(-_reference(queries[0], corpus)[0])
+
+    for k in (50, 51, 1000):
+        idx, scores = top_k(queries[0], corpus, k, assume_normalized=False)
+        np.testing.assert_array_equal(idx, expected)
+        assert np.all(np.diff(scores) <= 0)
+
+    idx, scores = top_k(queries, corpus, 0)
+    assert idx.shape == scores.shape == (5, 0)
+    idx, scores = top_k(queries[0], corpus[:0], 3)
+    assert idx.shape == scores.shape == (0,)
+
+
+def test_zero_vectors_score_zero(vectors):
+    queries, corpus = vectors
+    corpus = corpus.copy()
+    corpus[[0, 10]] = 0.0
+    zero_query = np.zeros(DIM, dtype=np.float32)
+
+    scores = cosine_scores(queries, corpus, assume_normalized=False)
+    assert np.all(np.isfinite(scores))
+    np.testing.assert_array_equal(scores[:, [0, 10]], 0.0)
+    np.testing.assert_array_equal(cosine_scores(zero_query, corpus, assume_normalized=False), 0.0)
+
+    idx, top = top_k(zero_query, corpus, 3, assume_normalized=False)
+    assert np.all(np.isfinite(top)) and len(set(idx)) == 3
+
+
+def test_provider_cosine_many_normalizes_caller_vectors(vectors):
+    queries, corpus = vectors
+    provider = StubProvider(dim=DIM)
+    scaled = corpus * 3.0
+
+    np.testing.assert_allclose(provider.cosine_many(queries[0] * 5.0, scaled), _reference(queries[0], corpus)[0], atol=1e-5)
+    np.testing.assert_allclose(provider.cosine_many(queries, list(scaled)), _reference(queries, corpus), atol=1e-5)
+
+    unit_query, unit_corpus = normalize_rows(queries[0]), normalize_rows(corpus)
+    np.testing.assert_allclose(
+        provider.cosine_many(unit_query, unit_corpus, assume_normalized=True),
+        _reference(queries[0], corpus)[0],
+        atol=1e-5,
+    )
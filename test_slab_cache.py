@@ -0,0 +1,68 @@
+"""
+Tests for the slab embedding cache.
+
+Returned vectors must stay correct when their slots are evicted and reused
+(within one provider call and across calls), memory must stay within the
+byte budget, and both eviction policies must keep recently used entries.
+"""
+
+import numpy as np
+import pytest
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.embedding_service.providers import StubProvider
+from app.services.embedding_service.slab_cache import SlabEmbeddingCache
+
+ROW_BYTES = 384 * 4
+
+
+@pytest.mark.parametrize("eviction", ["clock", "lru"])
+def test_hits_survive_eviction_within_one_call(eviction):
+    cache = SlabEmbeddingCache(max_bytes=4 * ROW_BYTES, page_bytes=4 * ROW_BYTES, eviction=eviction)
+    provider = StubProvider(dim=384, cache=cache)
+    reference = StubProvider(dim=384)
+
+    provider.embed(["a", "b", "c", "d"])
+    # 'a' and 'b' are hits; storing the four misses evicts every slot of the 4-row slab
+    texts = ["a", "b", "e", "f", "g", "h"]
+    result = provider.embed(texts)
+
+    for text, vector in zip(texts, result):
+        np.testing.assert_array_equal(vector, reference.embed(text))
+    assert cache.stats()["evictions"] >= 2
+
+
+def test_returned_vectors_are_independent_of_the_slab():
+    cache = SlabEmbeddingCache(max_bytes=ROW_BYTES, page_bytes=ROW_BYTES)
+    cache.set("x", np.ones(384, dtype=np.float32))
+    hit = cache.get("x")
+    cache.set("y", np.zeros(384, dtype=np.float32))  # Evicts 'x' and reuses its slot
+
+    assert cache.get("x") is None
+    np.testing.assert_array_equal(hit, np.ones(384, dtype=np.float32))
+    [again] = cache.get_many(["y"])
+    again[:] = 5  # Callers may modify their copy
+    np.testing.assert_array_equal(cache.get("y"), np.zeros(384, dtype=np.float32))
+
+
+def test_byte_budget_across_dimensions():
+    cache = SlabEmbeddingCache(max_bytes=8 * ROW_BYTES, page_bytes=4 * ROW_BYTES, dtype="float16")
+    for i in range(40):
+        cache.set(f"a{i}", np.full(384, i, dtype=np.float32))
+        cache.set(f"b{i}", np.full(128, i, dtype=np.float32))
+
+    stats = cache.stats()
+    assert stats["bytes_allocated"] <= stats["max_bytes"]
+    assert stats["dimensions"] == [128, 384]
+    np.testing.assert_array_equal(cache.get("b39"), np.full(128, 39, dtype=np.float16))
+
+
+def test_lru_keeps_recently_read_entries():
+    cache = SlabEmbeddingCache(max_bytes=2 * ROW_BYTES, page_bytes=2 * ROW_BYTES, eviction="lru")
+    cache.set("a", np.ones(384))
+    cache.set("b", np.ones(384))
+    cache.get("a")
+    cache.set("c", np.ones(384))
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
@@ -0,0 +1,235 @@
+"""
+Tests for speculative next-speaker generation.
+
+Debates run against the zero-latency StubLM and the stub embedding provider.
+A speculation that matches the selected speaker must be committed with the
+same result a normal turn would produce; any other speculation must be
+discarded with its tokens counted as wasted, and none may start when the
+next turn would see different state (last step, memory summarization).
+Runs that stop early (user stop, errors) must shut speculation down.
+"""
+
+import asyncio
+import contextlib
+import importlib
+import io
+import random
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import SimpleNamespace
+
+import dspy
+import pytest
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.api.schemas import AgentConfig, CreateSimRequest
+from app.classes.moderator import Moderator
+from app.classes.simulation import InternalAgentConfig, Simulation, _Speculation
+from app.classes.stub_lm import StubLM
+from app.services import simulation_service
+from app.services.simulation_service import SimulationService
+
+dspy_settings = importlib.import_module("dspy.dsp.utils.settings")
+
+
+@pytest.fixture(autouse=True)
+def stub_embeddings(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "stub")
+
+
+@pytest.fixture(autouse=True)
+def release_dspy_settings(monkeypatch):
+    # dspy lets only the first configuring thread reconfigure it; hand it back for later app tests
+    monkeypatch.setattr(dspy_settings, "config_owner_thread_id", dspy_settings.config_owner_thread_id)
+
+
+def _simulation(n_agents: int, max_iters: int, speculative: bool, seed: int = 0) -> Simulation:
+    lm = StubLM(seed=seed, raise_hand_rate=1.0)
+    dspy.configure(lm=lm)
+    random.seed(seed)
+    sim = Simulation(
+        topic="Should cities ban private cars from their historic centres?",
+        agent_configs=[
+            InternalAgentConfig(name=f"Agent{i}", profile=f"Citizen {i} with a distinct point of view")
+            for i in range(n_agents)
+        ],
+        lm=lm,
+        api_base="",
+        api_key="",
+        run_id=uuid.uuid4(),
+        db_engine=None,
+        max_iters=max_iters,
+        speculative=speculative,
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim.start()
+    return sim
+
+
+def _run(sim: Simulation) -> None:
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim.run()
+
+
+def test_speculation_hits_are_committed():
+    # With two agents the only other agent is always the leader and the next speaker
+    baseline = _simulation(2, max_iters=6, speculative=False)
+    _run(baseline)
+    speculative = _simulation(2, max_iters=6, speculative=True)
+    _run(speculative)
+
+    report = speculative.speculation_report()
+    # Next turns 1, 2, 4 and 5: not the last step, not after summarization (every 3rd)
+    assert report["attempts"] == 4
+    assert report["hits"] == 4 and report["misses"] == 0
+    assert report["used_tokens"] > 0 and report["wasted_tokens"] == 0
+    assert speculative.intervenciones == baseline.intervenciones
+    assert speculative.opiniones == baseline.opiniones
+
+
+def test_missed_speculation_is_discarded_and_counted_as_waste(monkeypatch):
+    sim = _simulation(3, max_iters=6, speculative=True)
+    speaker = sim._locutor
+    others = [agent for agent in sim._agents if agent is not speaker]
+    # Speculate on one agent, then select the other
+    monkeypatch.setattr(sim._mod, "leading_candidate", lambda requests, pending: others[0])
+    monkeypatch.setattr(sim._mod, "select_next_speaker", lambda: others[1])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim.step()
+
+    assert sim._speculation is None
+    assert sim._locutor is others[1]
+    report = sim.speculation_report()
+    assert report["attempts"] == 1 and report["hits"] == 0 and report["misses"] == 1
+    sim.close()
+
+
+def test_discard_counts_tokens_of_finished_generation():
+    sim = _simulation(2, max_iters=6, speculative=True)
+    future = Future()
+    future.set_result(({"response": "unused"}, 42, 0.1))
+    sim._speculation = _Speculation(agent=sim._agents[0], last_speaker="", last_opinion="", future=future)
+
+    sim._discard_speculation()
+
+    assert sim.speculation_stats["misses"] == 1
+    assert sim.speculation_stats["wasted_tokens"] == 42
+
+
+def test_stale_speculation_is_not_used():
+    sim = _simulation(2, max_iters=6, speculative=True)
+    future = Future()
+    future.set_result(({"response": "stale"}, 7, 0.1))
+    sim._speculation = _Speculation(agent=sim._locutor, last_speaker="x", last_opinion="old", future=future)
+
+    assert sim._take_speculation("x", "new") is None
+    assert sim.speculation_stats["misses"] == 1
+    assert sim.speculation_stats["wasted_tokens"] == 7
+
+
+def test_no_speculation_on_last_step_or_before_summarization():
+    sim = _simulation(2, max_iters=6, speculative=True)
+    allowed = {}
+    for iters in range(6):
+        sim.iters = iters
+        allowed[iters + 1] = sim._can_speculate()
+
+    assert allowed == {1: True, 2: True, 3: False, 4: True, 5: True, 6: False}
+    sim.speculative = False
+    sim.iters = 0
+    assert not sim._can_speculate()
+
+
+def test_leading_candidate_waits_while_a_pending_agent_could_overtake():
+    agents = [SimpleNamespace(id=i, name=f"Agent{i}") for i in range(3)]
+    moderator = Moderator(agents)
+
+    # Equal fairness: a pending agent with desire 1.0 could still beat 0.6
+    assert moderator.leading_candidate([(agents[0], 0.6)], [agents[1]]) is None
+    # Nothing pending: the leader is final
+    assert moderator.leading_candidate([(agents[0], 0.6), (agents[1], 0.9)], []) is agents[1]
+    # A pending agent that already spoke a lot cannot catch up
+    moderator.interventions[2] = 5
+    assert moderator.leading_candidate([(agents[0], 0.6)], [agents[2]]) is agents[0]
+    # No requests yet
+    assert moderator.leading_candidate([], [agents[1]]) is None
+
+
+def test_close_stops_pending_speculation():
+    sim = _simulation(2, max_iters=6, speculative=True)
+    sim._speculation_executor = ThreadPoolExecutor(max_workers=1)
+    release = threading.Event()
+    sim._speculation_executor.submit(release.wait, 10)  # Occupies the only worker
+    future = sim._speculation_executor.submit(lambda: ({}, 5, 0.1))
+    sim._speculation = _Speculation(agent=sim._agents[0], last_speaker="", last_opinion="", future=future)
+
+    sim.close()
+    release.set()
+
+    assert sim._speculation is None and sim._speculation_executor is None
+    assert future.cancelled()
+    assert sim.speculation_stats["misses"] == 1 and sim.speculation_stats["wasted_tokens"] == 0
+    sim.close()  # Idempotent
+
+
+class _FakeSession:
+    """Stands in for the database session: one run whose status the test controls."""
+
+    run = None
+
+    def __init__(self, engine):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get(self, model, key):
+        return self.run
+
+    def add(self, obj):
+        pass
+
+    def commit(self):
+        pass
+
+
+def test_user_stop_shuts_down_speculation(monkeypatch):
+    lm = StubLM(seed=0, raise_hand_rate=1.0)
+    dspy.configure(lm=lm)
+    _FakeSession.run = SimpleNamespace(status="pending", stopped_reason=None)
+    monkeypatch.setattr(simulation_service, "Session", _FakeSession)
+    created = []
+
+    class RecordingSimulation(Simulation):
+        def start(self):
+            created.append(self)
+            super().start()
+
+    monkeypatch.setattr(simulation_service, "Simulation", RecordingSimulation)
+    service = SimulationService(lm=lm, engine=None)
+
+    def persist(run_id, record):
+        _FakeSession.run.status = "stopped"  # The user stops the run after its first step
+
+    monkeypatch.setattr(service, "_persist_step", persist)
+    config = CreateSimRequest(
+        topic="Should cities ban private cars from their historic centres?",
+        agents=[AgentConfig(name=f"Agent{i}", profile=f"Citizen {i}") for i in range(2)],
+        max_iters=6,
+        speculative_speaker=True,
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(service.run_simulation_background(uuid.uuid4(), config))
+
+    [sim] = created
+    assert sim.iters < 5  # Stopped by the user, not by max_iters
+    assert sim._speculation is None and sim._speculation_executor is None
+    report = sim.speculation_report()
+    assert report["attempts"] >= 1
+    assert report["hits"] + report["misses"] == report["attempts"]
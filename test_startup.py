@@ -0,0 +1,95 @@
+"""
+Tests for background startup and the liveness/readiness split.
+
+The server must answer `/healthz` while slow startup work is still running,
+and `/readyz` must only succeed once every required task has finished.
+"""
+
+import asyncio
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.startup import StartupTasks
+
+
+def test_required_tasks_gate_readiness():
+    async def scenario():
+        release = threading.Event()
+        tasks = StartupTasks()
+        tasks.add("model", release.wait)
+        tasks.add("prefetch", lambda: 1 / 0, required=False)
+        tasks.start()
+
+        await asyncio.sleep(0.05)
+        assert not tasks.ready
+        assert tasks.status()["tasks"]["model"]["state"] == "running"
+
+        release.set()
+        await tasks.wait()
+        return tasks.status()
+
+    status = asyncio.run(scenario())
+    assert status["ready"]
+    assert status["tasks"]["prefetch"]["state"] == "failed"
+    assert "division by zero" in status["tasks"]["prefetch"]["error"]
+
+
+def test_failed_required_task_keeps_server_unready():
+    def create_tables():
+        raise ConnectionError("no database")
+
+    async def scenario():
+        tasks = StartupTasks()
+        tasks.add("database", create_tables)
+        await tasks.run()
+        return tasks
+
+    tasks = asyncio.run(scenario())
+    assert not tasks.ready
+    assert tasks.status()["tasks"]["database"]["error"] == "no database"
+
+
+def test_healthz_and_readyz(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "stub")
+    monkeypatch.setenv("DEBATE_LM_MODE", "stub")
+    monkeypatch.setenv("OPENROUTER_API_KEY", "")
+    monkeypatch.setenv("STARTUP_CREATE_TABLES", "false")
+    monkeypatch.setenv("EMBEDDING_DB_REUSE", "false")
+
+    with TestClient(app.main.app) as client:
+        assert client.get("/healthz").json() == {"ok": True}
+
+        deadline = time.monotonic() + 10
+        response = client.get("/readyz")
+        while response.status_code == 503 and time.monotonic() < deadline:
+            time.sleep(0.05)
+            response = client.get("/readyz")
+
+        assert response.status_code == 200
+        status = response.json()
+        assert status["ready"]
+        assert status["tasks"]["embedding"]["state"] == "done"
+        assert "database" not in status["tasks"]
+
+
+def test_embedding_stats_does_not_wait_for_the_model(monkeypatch):
+    from app.dependencies import get_current_admin
+    from app.services.embedding_service import get_embedding_service, reset_embedding_service
+
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "stub")
+    reset_embedding_service()
+    app.main.app.dependency_overrides[get_current_admin] = lambda: None
+    try:
+        client = TestClient(app.main.app)  # No lifespan: nothing loads the model
+        assert client.get("/admin/embedding/stats").status_code == 503
+
+        get_embedding_service()
+        response = client.get("/admin/embedding/stats")
+        assert response.status_code == 200
+        assert response.json()["provider"] == "StubProvider"
+    finally:
+        app.main.app.dependency_overrides.clear()
+        reset_embedding_service()
@@ -0,0 +1,119 @@
+"""
+Tests for the write-behind step writer.
+
+Steps must be committed in step order, no more than `max_pending` steps may
+be unpersisted at any time (SIMULATION_MAX_PENDING_WRITES, default 1), and a
+failed write must resurface on the next `submit` or on `close`.
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+import pytest
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.services.simulation_service import StepRecord, StepWriter
+
+
+def _record(iteration: int) -> StepRecord:
+    return StepRecord(
+        iteration=iteration,
+        step_result={"speaker": "A", "opinion": f"opinion {iteration}", "engaged": [], "finished": False},
+        tool_usage=None,
+        prediction_metadata=None,
+    )
+
+
+def test_steps_commit_in_step_order():
+    committed = []
+    prepared = []
+    rng = random.Random(0)
+
+    def persist(record):
+        time.sleep(rng.uniform(0, 0.005))
+        committed.append(record.iteration)
+
+    async def prepare(record):
+        await asyncio.sleep(rng.uniform(0, 0.005))
+        prepared.append(record.iteration)
+
+    async def run():
+        writer = StepWriter(persist, max_pending=4, prepare=prepare)
+        for i in range(20):
+            await writer.submit(_record(i))
+        await writer.close()
+
+    asyncio.run(run())
+
+    assert committed == list(range(20))
+    assert prepared == list(range(20))
+
+
+@pytest.mark.parametrize("max_pending", [1, 3])
+def test_submit_blocks_at_max_pending(max_pending):
+    release = threading.Event()
+    committed = []
+    submitted = []
+    unpersisted_seen = []
+
+    def persist(record):
+        unpersisted_seen.append(len(submitted) - len(committed))
+        release.wait(timeout=10)
+        committed.append(record.iteration)
+
+    async def run():
+        writer = StepWriter(persist, max_pending=max_pending)
+        for i in range(max_pending):
+            await writer.submit(_record(i))
+            submitted.append(i)
+
+        blocked = asyncio.ensure_future(writer.submit(_record(max_pending)))
+        await asyncio.sleep(0.1)
+        assert not blocked.done()  # The buffer is full until a write commits
+
+        release.set()
+        await asyncio.wait_for(blocked, timeout=5)
+        submitted.append(max_pending)
+        await writer.close()
+
+    asyncio.run(run())
+
+    assert committed == list(range(max_pending + 1))
+    assert max(unpersisted_seen) <= max_pending
+
+
+def test_failed_write_resurfaces_on_next_submit():
+    def persist(record):
+        raise RuntimeError("database is down")
+
+    async def run():
+        writer = StepWriter(persist, max_pending=1)
+        await writer.submit(_record(0))
+        with pytest.raises(RuntimeError, match="database is down"):
+            await writer.submit(_record(1))
+        with pytest.raises(RuntimeError, match="database is down"):
+            await writer.close()
+
+    asyncio.run(run())
+
+
+def test_failed_write_resurfaces_on_close():
+    committed = []
+
+    def persist(record):
+        if record.iteration == 1:
+            raise RuntimeError("constraint violation")
+        committed.append(record.iteration)
+
+    async def run():
+        writer = StepWriter(persist, max_pending=2)
+        await writer.submit(_record(0))
+        await writer.submit(_record(1))
+        with pytest.raises(RuntimeError, match="constraint violation"):
+            await writer.close()
+
+    asyncio.run(run())
+
+    assert committed == [0]
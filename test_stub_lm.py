@@ -0,0 +1,46 @@
+"""
+Tests for the cassette record/replay LM.
+
+Exchanges recorded through `aforward` must be written to the cassette and
+replayed without the inner LM, through both `aforward` and `forward`, and a
+request that was never recorded must raise CassetteMissError.
+"""
+
+import asyncio
+
+import pytest
+
+import app.main  # noqa: F401  (resolves the app.classes <-> app.services import order)
+from app.classes.stub_lm import CassetteLM, CassetteMissError, StubLM
+
+MESSAGES = [
+    [{"role": "user", "content": "Should cities ban private cars from their historic centres?"}],
+    [{"role": "user", "content": "Summarize the debate so far."}],
+]
+
+
+def _contents(response):
+    return [choice.message.content for choice in response.choices]
+
+
+def test_async_record_then_replay(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    inner = StubLM(seed=3)
+    recorder = CassetteLM(path, mode="record", inner=inner)
+
+    async def record():
+        return [await recorder.aforward(messages=messages) for messages in MESSAGES]
+
+    recorded = [_contents(response) for response in asyncio.run(record())]
+    assert inner.calls == len(MESSAGES)
+
+    player = CassetteLM(path, mode="replay")
+
+    async def replay():
+        return [await player.aforward(messages=messages) for messages in MESSAGES]
+
+    assert [_contents(response) for response in asyncio.run(replay())] == recorded
+    assert [_contents(player.forward(messages=messages)) for messages in MESSAGES] == recorded
+    assert player.model == inner.model
+    with pytest.raises(CassetteMissError):
+        asyncio.run(player.aforward(messages=[{"role": "user", "content": "Never recorded."}]))